@@ -1,34 +1,45 @@
 # backend/app.py
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, Response, request, jsonify, abort, send_file
 from flask_cors import CORS
 from flask_pymongo import PyMongo
+from pymongo import InsertOne, UpdateOne, UpdateMany, DeleteOne, DeleteMany
+from pymongo.errors import BulkWriteError, DuplicateKeyError
 from bson import ObjectId
-import bcrypt
 import jwt
+from collections import Counter
 from datetime import datetime, timedelta
 from functools import wraps
 import re
 import os
 import io
+import json
+import base64
+import hashlib
+import mimetypes
+import uuid
+import time
 from config import Config
+from services.token_cache import TokenCache
+from services.password_hasher import PasswordHasher, PasswordHasherBusy
+from services.chunked_upload import ChunkedUploads, UploadError
+from services.blob_store import BlobStore, parse_blob_name
+from services.image_variants import ImageVariantPool, remove_variants
+from services.json_stream import stream_json
+from services.task_export import EXPORT_PROJECTION, stream_csv
+from services.report_jobs import ReportJobs, FORMATS as REPORT_FORMATS
+from services.reminders import due_tomorrow_window, iter_due_reminders, build_reminder_email
+from services.outbox import EmailOutbox, SMTPPool, SharedRateLimiter
+from services.leader_scheduler import LeaderScheduler
+from services.weekly_summary import run_weekly_summary
+from services.compression import Compressor, ETAG_SUFFIXES, encoded_etag
 
 # ==================== NEW IMPORTS FOR ENHANCED FEATURES ====================
-# Email notifications
-from flask_mail import Mail, Message
-from apscheduler.schedulers.background import BackgroundScheduler
-
 # ==================== FIXED: File uploads with werkzeug compatibility ====================
 # Instead of flask_uploads which has import issues, use direct werkzeug
 from werkzeug.utils import secure_filename
+from werkzeug.security import safe_join
 from werkzeug.datastructures import FileStorage
 
-# Export features
-# import pandas as pd
-# from reportlab.lib import colors
-# from reportlab.lib.pagesizes import letter, A4
-# from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph
-# from reportlab.lib.styles import getSampleStyleSheet
-
 # ==================== INITIALIZE FLASK APP ====================
 app = Flask(__name__)
 app.config.from_object(Config)
@@ -36,19 +47,17 @@ app.config.from_object(Config)
 # Initialize CORS - Allow all origins for development
 CORS(app, origins="*", supports_credentials=True)
 
-# ==================== INITIALIZE NEW SERVICES ====================
-
-# Initialize Mail
-mail = Mail()
-mail.init_app(app)
-
-# Initialize Scheduler for background jobs
-scheduler = BackgroundScheduler()
-scheduler.start()
+# Compress JSON/text responses (gzip, or brotli if installed) above a size threshold
+compressor = Compressor(
+    app,
+    min_size=Config.COMPRESSION_MIN_SIZE,
+    gzip_level=Config.COMPRESSION_GZIP_LEVEL,
+    brotli_quality=Config.COMPRESSION_BROTLI_QUALITY
+) if Config.COMPRESSION_ENABLED else None
 
 # ==================== FIXED: File upload configuration without flask_uploads ====================
 app.config['UPLOAD_FOLDER'] = 'uploads'
-app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
+app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max request body; larger files go through chunked uploads
 ALLOWED_EXTENSIONS = {'txt', 'pdf', 'png', 'jpg', 'jpeg', 'gif', 'doc', 'docx', 'xlsx'}
 
 # Create uploads folder if it doesn't exist
@@ -58,10 +67,27 @@ ALLOWED_EXTENSIONS = {'txt', 'pdf', 'png', 'jpg', 'jpeg', 'gif', 'doc', 'docx',
 app.config['PROFILE_UPLOAD_FOLDER'] = 'profile_photos'
 app.config['MAX_PROFILE_SIZE'] = 5 * 1024 * 1024  # 5MB max
 ALLOWED_PROFILE_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
+# profile_<user>_<content hash>.<ext>, or one of its resized variants (..._<size>.<ext>)
+PROFILE_PHOTO_NAME = re.compile(r'^profile_[0-9a-f]{24}_([0-9a-f]{16})(?:_\d+)?\.\w+$')
+IMAGE_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
+THUMBNAIL_NAME = re.compile(r'^([0-9a-f]{64})_\d+\.(webp|jpeg)$')
 
 # Create profile photos folder
 os.makedirs('profile_photos', exist_ok=True)
 
+# Let the front server read file bytes itself when Flask hands it an X-Sendfile path
+app.config['USE_X_SENDFILE'] = Config.FILE_SERVING_MODE == 'x-sendfile'
+
+# Cache of verified JWTs so repeat requests skip HMAC verification
+token_cache = TokenCache(max_size=Config.TOKEN_CACHE_SIZE)
+
+# bcrypt runs on its own bounded pool so logins can't tie up every request thread
+password_hasher = PasswordHasher(
+    rounds=Config.BCRYPT_ROUNDS,
+    workers=Config.PASSWORD_HASH_WORKERS,
+    max_queue=Config.PASSWORD_HASH_QUEUE
+)
+
 # ==================== INITIALIZE MONGODB ====================
 app.config["MONGO_URI"] = Config.MONGO_URI
 mongo = PyMongo(app)
@@ -70,6 +96,83 @@ db = mongo.cx[Config.MONGO_DB]
 # Collections
 users_collection = db['users']
 tasks_collection = db['tasks']
+comments_collection = db['comments']
+activity_collection = db['activity']
+task_stats_collection = db['task_stats']
+tombstones_collection = db['task_tombstones']
+idempotency_collection = db['idempotency_keys']
+outbox_collection = db['email_outbox']
+mail_rate_collection = db['mail_rate_limits']
+upload_sessions_collection = db['upload_sessions']
+blobs_collection = db['attachment_blobs']
+report_jobs_collection = db['report_jobs']
+
+# ==================== ATTACHMENT STORE ====================
+# Attachments are stored once per distinct content, keyed by SHA-256 and reference-counted
+blob_store = BlobStore(blobs_collection, os.path.join(app.config['UPLOAD_FOLDER'], 'blobs'))
+
+# Resized avatars and attachment thumbnails are rendered in a process pool after the upload returns
+image_variants = ImageVariantPool(workers=Config.IMAGE_VARIANT_WORKERS)
+THUMBNAIL_FOLDER = os.path.join(app.config['UPLOAD_FOLDER'], 'thumbs')
+
+# ==================== CHUNKED UPLOADS ====================
+# Partial files live next to the finished ones so completing is a rename
+chunked_uploads = ChunkedUploads(
+    upload_sessions_collection,
+    os.path.join(app.config['UPLOAD_FOLDER'], '.partial'),
+    chunk_size=Config.UPLOAD_CHUNK_SIZE,
+    max_size=Config.ATTACHMENT_MAX_SIZE,
+    session_hours=Config.UPLOAD_SESSION_HOURS
+)
+
+# ==================== REPORT JOBS ====================
+# PDF/Excel reports render in a process pool and are cached per user data version
+report_jobs = ReportJobs(
+    report_jobs_collection,
+    'reports',
+    Config.MONGO_URI,
+    Config.MONGO_DB,
+    workers=Config.REPORT_WORKERS,
+    batch_size=Config.EXPORT_BATCH_SIZE,
+    stale_minutes=Config.REPORT_JOB_TIMEOUT_MINUTES,
+    keep_days=Config.REPORT_CACHE_DAYS
+)
+
+# ==================== EMAIL OUTBOX ====================
+# Emails are persisted and delivered by background workers over pooled SMTP connections.
+# The send rate is counted in MongoDB, so it holds for all gunicorn workers together.
+mail_rate_limiter = SharedRateLimiter(
+    mail_rate_collection,
+    f'{Config.MAIL_SERVER}:{Config.MAIL_PORT}',
+    Config.MAIL_RATE_LIMIT_PER_SECOND
+)
+outbox = EmailOutbox(
+    outbox_collection,
+    SMTPPool(
+        Config.MAIL_SERVER,
+        Config.MAIL_PORT,
+        use_tls=Config.MAIL_USE_TLS,
+        username=Config.MAIL_USERNAME,
+        password=Config.MAIL_PASSWORD,
+        size=Config.SMTP_POOL_SIZE
+    ),
+    sender=Config.MAIL_DEFAULT_SENDER,
+    workers=Config.OUTBOX_WORKERS,
+    batch_size=Config.OUTBOX_BATCH_SIZE,
+    max_attempts=Config.OUTBOX_MAX_ATTEMPTS,
+    backoff_seconds=Config.OUTBOX_BACKOFF_SECONDS,
+    rate_limiter=mail_rate_limiter
+)
+if Config.OUTBOX_WORKERS > 0:
+    outbox.start()
+
+# ==================== BACKGROUND SCHEDULER ====================
+# Every worker creates one, but only the holder of the Mongo lease runs jobs
+scheduler = LeaderScheduler(
+    db,
+    lease_seconds=Config.SCHEDULER_LEASE_SECONDS,
+    renew_seconds=max(1, Config.SCHEDULER_LEASE_SECONDS // 3)
+)
 
 # ==================== CREATE INDEXES ====================
 def create_indexes():
@@ -79,6 +182,25 @@ def create_indexes():
         tasks_collection.create_index('userId')
         tasks_collection.create_index([('userId', 1), ('status', 1)])
         tasks_collection.create_index([('userId', 1), ('dueDate', 1)])
+        # Delta sync reads a user's changes and deletions since a point in time
+        tasks_collection.create_index([('userId', 1), ('updatedAt', 1)])
+        tombstones_collection.create_index([('userId', 1), ('deletedAt', 1)])
+        tombstones_collection.create_index('deletedAt', expireAfterSeconds=Config.TOMBSTONE_RETENTION_DAYS * 86400)
+        idempotency_collection.create_index('createdAt', expireAfterSeconds=Config.IDEMPOTENCY_TTL_HOURS * 3600)
+        # Nightly reminder job scans tasks due tomorrow
+        tasks_collection.create_index([('dueDate', 1), ('status', 1)])
+        # Keyset pagination sorts on (dueDate, _id) within a user
+        tasks_collection.create_index([('userId', 1), ('dueDate', 1), ('_id', 1)])
+        # Comment and activity feeds page on (timestamp, _id) within a task
+        comments_collection.create_index([('taskId', 1), ('timestamp', 1), ('_id', 1)])
+        activity_collection.create_index([('taskId', 1), ('timestamp', 1), ('_id', 1)])
+        # Shared feed pages on (dueDate, _id) within a member
+        tasks_collection.create_index([('sharedWith', 1), ('dueDate', 1), ('_id', 1)])
+        outbox.create_indexes()
+        mail_rate_limiter.create_indexes()
+        scheduler.create_indexes()
+        chunked_uploads.create_indexes()
+        report_jobs.create_indexes()
         print("✓ Database indexes created successfully")
     except Exception as e:
         print(f"Note: Indexes may already exist: {e}")
@@ -86,6 +208,17 @@ def create_indexes():
 # Create indexes on startup
 create_indexes()
 
+# ==================== TASK PROJECTIONS ====================
+
+# Scalar fields the task list views render
+TASK_SUMMARY_FIELDS = ('title', 'description', 'dueDate', 'priority', 'category', 'status')
+
+# Every field a client may ask for with ?fields=
+TASK_FIELDS = set(TASK_SUMMARY_FIELDS) | {
+    'userId', 'createdAt', 'updatedAt',
+    'attachments', 'sharedWith', 'recentComments', 'commentCount'
+}
+
 # ==================== HELPER FUNCTIONS ====================
 
 def validate_email(email):
@@ -107,26 +240,33 @@ def generate_token(user_id):
     return jwt.encode(payload, Config.JWT_SECRET_KEY, algorithm='HS256')
 
 def verify_token(token):
-    """Verify JWT token"""
+    """Verify JWT token, consulting the verified-token cache first"""
+    user_id = token_cache.get(token)
+    if user_id:
+        return user_id
+    
     try:
-        payload = jwt.decode(token, Config.JWT_SECRET_KEY, algorithms=['HS256'])
+        # Tokens without an expiry are rejected, so every cached token also expires
+        payload = jwt.decode(token, Config.JWT_SECRET_KEY, algorithms=['HS256'], options={'require': ['exp', 'user_id']})
+        token_cache.put(token, payload['user_id'], payload['exp'])
         return payload['user_id']
     except jwt.ExpiredSignatureError:
         return None
     except jwt.InvalidTokenError:
         return None
 
+def bearer_token():
+    """Token from the Authorization header, or None"""
+    auth_header = request.headers.get('Authorization', '')
+    if auth_header.startswith('Bearer '):
+        return auth_header.split(' ')[1]
+    return None
+
 def token_required(f):
     """Decorator to require valid token for routes"""
     @wraps(f)
     def decorated(*args, **kwargs):
-        token = None
-        
-        # Get token from header
-        if 'Authorization' in request.headers:
-            auth_header = request.headers['Authorization']
-            if auth_header.startswith('Bearer '):
-                token = auth_header.split(' ')[1]
+        token = bearer_token()
         
         if not token:
             return jsonify({'success': False, 'message': 'Token is missing!'}), 401
@@ -139,6 +279,140 @@ def token_required(f):
     
     return decorated
 
+def file_token_required(f):
+    """token_required for stored files, also accepting ?token=
+
+    <img> and <a> tags cannot send an Authorization header, so the
+    frontend puts the token in the file URL instead.
+    """
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        user_id = verify_token(bearer_token() or request.args.get('token', ''))
+        if not user_id:
+            abort(401)
+        return f(user_id, *args, **kwargs)
+    
+    return decorated
+
+def idempotent(f):
+    """Replay the stored response for a repeated Idempotency-Key instead of writing again
+
+    Apply below @token_required. Keys are scoped per user; the first
+    response is stored unless it was a server error, which frees the key
+    for a retry. A key still marked processing after
+    IDEMPOTENCY_LEASE_SECONDS (its worker crashed or was killed) can be
+    taken over by a retry instead of answering 409 until the key expires.
+    """
+    @wraps(f)
+    def decorated(user_id, *args, **kwargs):
+        key = request.headers.get('Idempotency-Key')
+        if not key:
+            return f(user_id, *args, **kwargs)
+        if len(key) > 255:
+            return jsonify({'success': False, 'message': 'Idempotency-Key is too long'}), 400
+        
+        record_id = f'{user_id}:{key}'
+        fingerprint = f'{request.method} {request.path}'
+        # Identifies this attempt, so a request that lost its lease can't overwrite the taker's result
+        owner = uuid.uuid4().hex
+        now = datetime.utcnow()
+        lease = {'owner': owner, 'lockedUntil': now + timedelta(seconds=Config.IDEMPOTENCY_LEASE_SECONDS)}
+        try:
+            idempotency_collection.insert_one({
+                '_id': record_id,
+                'request': fingerprint,
+                'status': 'processing',
+                'createdAt': now,
+                **lease
+            })
+        except DuplicateKeyError:
+            record = idempotency_collection.find_one({'_id': record_id})
+            if record is None:
+                return jsonify({'success': False, 'message': 'Request with this Idempotency-Key is being retried, try again'}), 409
+            if record['request'] != fingerprint:
+                return jsonify({'success': False, 'message': 'Idempotency-Key was already used for a different request'}), 422
+            if record['status'] == 'completed':
+                replay = app.response_class(record['body'], status=record['statusCode'], mimetype=record['mimetype'])
+                replay.headers['Idempotent-Replayed'] = 'true'
+                return replay
+            taken_over = idempotency_collection.find_one_and_update(
+                {'_id': record_id, 'status': 'processing', '$or': [
+                    {'lockedUntil': {'$lte': now}},
+                    {'lockedUntil': {'$exists': False}}
+                ]},
+                {'$set': lease}
+            )
+            if not taken_over:
+                return jsonify({'success': False, 'message': 'Request with this Idempotency-Key is still in progress'}), 409
+        
+        try:
+            response = app.make_response(f(user_id, *args, **kwargs))
+        except Exception:
+            idempotency_collection.delete_one({'_id': record_id, 'owner': owner})
+            raise
+        
+        if response.status_code >= 500:
+            idempotency_collection.delete_one({'_id': record_id, 'owner': owner})
+        else:
+            idempotency_collection.update_one(
+                {'_id': record_id, 'owner': owner},
+                {'$set': {
+                    'status': 'completed',
+                    'statusCode': response.status_code,
+                    'mimetype': response.mimetype,
+                    'body': response.get_data(as_text=True)
+                }, '$unset': {'lockedUntil': ''}}
+            )
+        return response
+    
+    return decorated
+
+def bump_version(user_id, *resources):
+    """Advance the user's change version for each resource ('tasks', 'profile', 'preferences')"""
+    users_collection.update_one(
+        {'_id': ObjectId(user_id)},
+        {'$inc': {f'versions.{resource}': 1 for resource in resources}}
+    )
+
+def versioned(*resources):
+    """Tag GET responses with a strong ETag built from the user's change versions
+
+    Apply below @token_required. The ETag is computed from one small read
+    of the user document, so a matching If-None-Match is answered with 304
+    before the route runs any query or serializes anything. Compressed
+    responses carry the same tag with an encoding suffix, and those match
+    too.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated(user_id, *args, **kwargs):
+            user = users_collection.find_one({'_id': ObjectId(user_id)}, {'versions': 1}) or {}
+            versions = user.get('versions', {})
+            state = ':'.join(str(versions.get(resource, 0)) for resource in resources)
+            etag = hashlib.sha256(f'{user_id}|{request.full_path}|{state}'.encode()).hexdigest()[:32]
+            
+            # A client may hold the tag of the identity body or of a compressed one
+            held = [etag] + [encoded_etag(etag, encoding) for encoding in ETAG_SUFFIXES]
+            matched = next((tag for tag in held if request.if_none_match.contains_weak(tag)), None)
+            if matched:
+                # Echo the tag the client holds: the compressor never touches a 304
+                response = app.response_class(status=304)
+                response.set_etag(matched)
+                response.vary.add('Accept-Encoding')
+            else:
+                response = app.make_response(f(user_id, *args, **kwargs))
+                if response.status_code != 200:
+                    return response
+                # Compressing the body later replaces this with a per-encoding tag
+                response.set_etag(etag)
+            
+            response.headers['Cache-Control'] = 'private, no-cache'
+            response.vary.add('Authorization')
+            return response
+        
+        return decorated
+    return decorator
+
 def serialize_document(doc):
     """Convert MongoDB document to JSON serializable format"""
     if doc is None:
@@ -147,6 +421,10 @@ def serialize_document(doc):
     doc['_id'] = str(doc['_id'])
     if 'userId' in doc and isinstance(doc['userId'], ObjectId):
         doc['userId'] = str(doc['userId'])
+    if 'taskId' in doc and isinstance(doc['taskId'], ObjectId):
+        doc['taskId'] = str(doc['taskId'])
+    if 'sharedWith' in doc:
+        doc['sharedWith'] = [str(member) for member in doc['sharedWith']]
     
     # Convert datetime objects to string
     for key, value in doc.items():
@@ -155,6 +433,195 @@ def serialize_document(doc):
     
     return doc
 
+def encode_cursor(sort_value, doc_id):
+    """Build an opaque pagination cursor from the last (sort value, _id) of a page"""
+    payload = {
+        'd': sort_value.isoformat() if isinstance(sort_value, datetime) else None,
+        'i': str(doc_id)
+    }
+    raw = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor):
+    """Decode a pagination cursor into (datetime, ObjectId), or None if malformed"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        if not ObjectId.is_valid(payload['i']):
+            return None
+        due_date = datetime.fromisoformat(payload['d']) if payload.get('d') else None
+        return due_date, ObjectId(payload['i'])
+    except (ValueError, KeyError, TypeError):
+        return None
+
+def parse_limit(value, default, maximum):
+    """Parse a page size query parameter, clamped to [1, maximum]"""
+    try:
+        limit = int(value) if value is not None else default
+    except ValueError:
+        return None
+    return max(1, min(limit, maximum))
+
+def shared_with_match(user_id):
+    """Query value matching a user in sharedWith (ObjectIds, plus legacy strings if enabled)"""
+    if Config.SHARED_WITH_LEGACY_STRINGS:
+        return {'$in': [ObjectId(user_id), str(user_id)]}
+    return ObjectId(user_id)
+
+def find_task_for_member(task_id, user_id, projection=None):
+    """Find a task the user owns or has been shared with"""
+    return tasks_collection.find_one({
+        '_id': ObjectId(task_id),
+        '$or': [
+            {'userId': ObjectId(user_id)},
+            {'sharedWith': shared_with_match(user_id)}
+        ]
+    }, projection)
+
+def keyset_filter(field, value, doc_id, direction=1):
+    """Query clause matching what comes after (value, doc_id) in a (field, _id) sort"""
+    op = '$gt' if direction > 0 else '$lt'
+    # Nulls sort before every other value, and $gt/$lt never match across types
+    if direction > 0:
+        beyond = [{field: {'$ne': None} if value is None else {'$gt': value}}]
+    else:
+        beyond = [] if value is None else [{field: {'$lt': value}}, {field: None}]
+    return {'$or': beyond + [{field: value, '_id': {op: doc_id}}]}
+
+def paginate_feed(collection, query, sort_field='timestamp', direction=-1, projection=None):
+    """Return a page of a feed ordered on (sort_field, _id), newest first by default.
+
+    Reads limit and cursor from the query string and seeks past the
+    cursor so deep pages cost the same as the first one. Used for the
+    per-task comment and activity feeds and the shared tasks feed.
+    Returns (entries, next_cursor) or None if the parameters are invalid.
+    """
+    limit = parse_limit(request.args.get('limit'),
+                        Config.FEED_PAGE_DEFAULT_LIMIT,
+                        Config.FEED_PAGE_MAX_LIMIT)
+    if limit is None:
+        return None
+    
+    query = dict(query)
+    cursor = request.args.get('cursor')
+    if cursor:
+        after = decode_cursor(cursor)
+        if after is None:
+            return None
+        query.update(keyset_filter(sort_field, after[0], after[1], direction))
+    
+    entries = list(
+        collection.find(query, projection)
+        .sort([(sort_field, direction), ('_id', direction)])
+        .limit(limit + 1)
+    )
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+    next_cursor = encode_cursor(entries[-1].get(sort_field), entries[-1]['_id']) if has_more else None
+    return entries, next_cursor
+
+def parse_fields(value, required=()):
+    """Turn a ?fields= parameter into a MongoDB projection.
+
+    Accepts a comma-separated list of task fields plus the shortcuts
+    'summary' (the default) and 'full' (no projection). Returns None for
+    'full', or False if an unknown field was requested.
+    """
+    names = [name.strip() for name in (value or 'summary').split(',') if name.strip()]
+    if 'full' in names:
+        return None
+    
+    projection = {}
+    for name in names:
+        if name == 'summary':
+            projection.update({field: 1 for field in TASK_SUMMARY_FIELDS})
+        elif name in TASK_FIELDS:
+            projection[name] = 1
+        else:
+            return False
+    
+    for name in required:
+        projection[name] = 1
+    return projection
+
+# Fields a client may set on an existing task
+UPDATABLE_TASK_FIELDS = ['title', 'description', 'priority', 'category', 'status']
+REQUIRED_TASK_FIELDS = ['title', 'dueDate', 'priority', 'category', 'status']
+# Fields that must be strings when present
+TEXT_TASK_FIELDS = ['title', 'description']
+
+def parse_due_date(value):
+    """Parse an ISO datetime or YYYY-MM-DD due date"""
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except:
+        return datetime.strptime(value, '%Y-%m-%d')
+
+def text_field_error(data):
+    """Error message for a title or description that is not a string, or None"""
+    for field in TEXT_TASK_FIELDS:
+        if field in data and not isinstance(data[field], str):
+            return f'{field} must be a string'
+    return None
+
+def build_task_document(user_id, data):
+    """Build a new task document from request data; returns (task, error message)"""
+    for field in REQUIRED_TASK_FIELDS:
+        if field not in data:
+            return None, f'Missing required field: {field}'
+    error = text_field_error(data)
+    if error:
+        return None, error
+    
+    try:
+        due_date = parse_due_date(data['dueDate'])
+    except (ValueError, AttributeError):
+        return None, 'Invalid dueDate'
+    
+    now = datetime.utcnow()
+    task = {
+        'userId': ObjectId(user_id),
+        'title': data['title'].strip(),
+        'description': data.get('description', '').strip(),
+        'dueDate': due_date,
+        'priority': data['priority'],
+        'category': data['category'],
+        'status': data['status'],
+        'createdAt': now,
+        'updatedAt': now,
+        # New fields for enhanced features
+        # (full comment history and activity live in their own collections)
+        'attachments': [],
+        'sharedWith': [],
+        'recentComments': [],
+        'commentCount': 0
+    }
+    return task, None
+
+def build_task_update(data):
+    """Build the $set document for a task update; returns (update, error message)"""
+    error = text_field_error(data)
+    if error:
+        return None, error
+    
+    update_data = {
+        'updatedAt': datetime.utcnow()
+    }
+    
+    # Update only provided fields
+    for field in UPDATABLE_TASK_FIELDS:
+        if field in data:
+            update_data[field] = data[field].strip() if isinstance(data[field], str) else data[field]
+    
+    # Handle due date separately
+    if 'dueDate' in data:
+        try:
+            update_data['dueDate'] = parse_due_date(data['dueDate'])
+        except (ValueError, AttributeError):
+            return None, 'Invalid dueDate'
+    
+    return update_data, None
+
 def allowed_file(filename):
     """Check if file type is allowed"""
     return '.' in filename and \
@@ -166,133 +633,344 @@ def allowed_profile_photo(filename):
            filename.rsplit('.', 1)[1].lower() in ALLOWED_PROFILE_EXTENSIONS
 
 # ==================== FIXED: Custom file save function ====================
+def blob_name(sha256, original):
+    """Name a stored blob is served under: its hash plus the original extension"""
+    ext = os.path.splitext(secure_filename(original))[1].lower()
+    return f"{sha256}{ext}"
+
+# Content-versioned URLs never change meaning, so they may be cached for a year;
+# every stored file sits behind auth, so only by the browser
+IMMUTABLE_CACHE_CONTROL = 'private, max-age=31536000, immutable'
+
+def send_stored_file(path, mimetype=None, etag=None, immutable=False):
+    """Send a file from disk with Range/206 support and a strong ETag
+
+    With etag=None the ETag is derived from the file's mtime and size.
+    In x-accel mode only headers are returned and the front proxy (nginx)
+    reads the bytes from X_ACCEL_PREFIX plus the path relative to
+    X_ACCEL_ROOT; in x-sendfile mode Flask sets X-Sendfile itself.
+    """
+    if not os.path.isfile(path):
+        abort(404)
+    mimetype = mimetype or mimetypes.guess_type(path)[0] or 'application/octet-stream'
+    
+    if Config.FILE_SERVING_MODE == 'x-accel':
+        relative = os.path.relpath(os.path.abspath(path), os.path.abspath(Config.X_ACCEL_ROOT))
+        response = Response(mimetype=mimetype)
+        response.headers['X-Accel-Redirect'] = f"{Config.X_ACCEL_PREFIX.rstrip('/')}/{relative.replace(os.sep, '/')}"
+        if etag:
+            response.set_etag(etag)
+    else:
+        # conditional=True answers If-None-Match with 304 and Range with 206
+        # Absolute, since send_file resolves relative paths against the app root rather than the cwd
+        response = send_file(os.path.abspath(path), mimetype=mimetype, etag=etag or True, conditional=True)
+    
+    response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL if immutable else 'private, no-cache'
+    return response
+
+def can_read_attachment(user_id, attachment_query):
+    """Whether a task the user owns or shares holds an attachment matching attachment_query"""
+    return tasks_collection.count_documents({
+        '$or': [{'userId': ObjectId(user_id)}, {'sharedWith': shared_with_match(user_id)}],
+        'attachments': {'$elemMatch': attachment_query}
+    }, limit=1) > 0
+
+def thumbnail_dir(sha256):
+    return os.path.join(THUMBNAIL_FOLDER, sha256[:2])
+
+def variant_urls(base_url, variants):
+    """{size: {format: filename}} from the renderer as {size: {format: url}}"""
+    return {
+        size: {fmt: f'{base_url}/{filename}' for fmt, filename in formats.items()}
+        for size, formats in variants.items()
+    }
+
+def queue_attachment_thumbnails(user_id, task_id, sha256, original_name):
+    """Render thumbnails of an image attachment in the background and record them on the task"""
+    ext = os.path.splitext(original_name)[1].lower().lstrip('.')
+    if ext not in IMAGE_EXTENSIONS:
+        return
+    
+    def store(variants):
+        result = tasks_collection.update_one(
+            {'_id': ObjectId(task_id), 'attachments.sha256': sha256},
+            {'$set': {
+                'attachments.$[a].thumbnails': variant_urls('/uploads/thumbs', variants),
+                'updatedAt': datetime.utcnow()
+            }},
+            array_filters=[{'a.sha256': sha256}]
+        )
+        if result.modified_count:
+            bump_version(user_id, 'tasks')
+    
+    image_variants.submit(blob_store.path_for(sha256), thumbnail_dir(sha256), sha256,
+                          Config.THUMBNAIL_SIZES, store)
+
+def queue_avatar_variants(user_id, photo_url, file_path):
+    """Render square avatar sizes in the background; kept only if the photo hasn't changed since"""
+    prefix = os.path.splitext(os.path.basename(file_path))[0]
+    
+    def store(variants):
+        result = users_collection.update_one(
+            {'_id': ObjectId(user_id), 'profilePhoto': photo_url},
+            {'$set': {'profilePhotoVariants': variant_urls('/profile_photos', variants)}}
+        )
+        if result.modified_count:
+            bump_version(user_id, 'profile')
+    
+    image_variants.submit(file_path, app.config['PROFILE_UPLOAD_FOLDER'], prefix,
+                          Config.AVATAR_SIZES, store, square=True)
+
+def remove_profile_photo_files(photo_url):
+    """Delete a profile photo and every variant rendered from it"""
+    filename = (photo_url or '').split('/')[-1]
+    if not filename:
+        return
+    file_path = os.path.join(app.config['PROFILE_UPLOAD_FOLDER'], filename)
+    if os.path.exists(file_path):
+        os.remove(file_path)
+    remove_variants(app.config['PROFILE_UPLOAD_FOLDER'], os.path.splitext(filename)[0], Config.AVATAR_SIZES)
+
 def save_uploaded_file(file):
-    """Save uploaded file with secure filename"""
-    filename = secure_filename(file.filename)
-    # Add timestamp to prevent duplicate filenames
-    name, ext = os.path.splitext(filename)
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    filename = f"{name}_{timestamp}{ext}"
-    file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-    file.save(file_path)
-    return filename
+    """Add an uploaded file to the blob store; returns (sha256, size)"""
+    return blob_store.put_stream(file.stream)
+
+def attach_to_task(user_id, task_id, original_name, sha256, size):
+    """Record a stored blob on the task and return the attachment entry"""
+    saved_as = blob_name(sha256, original_name)
+    attachment = {
+        'filename': original_name,  # Original filename
+        'saved_as': saved_as,       # Content hash plus extension
+        'sha256': sha256,
+        'url': f'/uploads/{saved_as}',
+        'uploaded_at': datetime.utcnow().isoformat(),
+        'size': size
+    }
+    tasks_collection.update_one(
+        {'_id': ObjectId(task_id)},
+        {'$push': {'attachments': attachment}, '$set': {'updatedAt': datetime.utcnow()}}
+    )
+    bump_version(user_id, 'tasks')
+    queue_attachment_thumbnails(user_id, task_id, sha256, original_name)
+    return attachment
+
+def release_attachments(attachments):
+    """Drop the blob references held by a list of attachment entries"""
+    counts = Counter(att['sha256'] for att in attachments or [] if att.get('sha256'))
+    for sha256, count in counts.items():
+        if blob_store.release(sha256, count):
+            remove_variants(thumbnail_dir(sha256), sha256, Config.THUMBNAIL_SIZES)
+
+# ==================== DELTA SYNC HELPERS ====================
+
+def encode_sync_token(timestamp):
+    """Opaque token marking how far a client has synced"""
+    return base64.urlsafe_b64encode(timestamp.isoformat().encode('ascii')).decode('ascii').rstrip('=')
+
+def decode_sync_token(token):
+    """Decode a sync token into a datetime, or None if malformed"""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        return datetime.fromisoformat(base64.urlsafe_b64decode(padded.encode('ascii')).decode('ascii'))
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+def record_tombstones(user_id, task_ids):
+    """Remember deleted tasks so syncing clients can drop them from their cache"""
+    if not task_ids:
+        return
+    now = datetime.utcnow()
+    tombstones_collection.insert_many(
+        [{'taskId': task_id, 'userId': ObjectId(user_id), 'deletedAt': now} for task_id in task_ids],
+        ordered=False
+    )
+
+# ==================== TASK STATISTICS ====================
+
+# Dimensions counted for the profile card and the filter sidebar
+STATS_DIMENSIONS = ('status', 'category', 'priority')
+# Projection holding just what task_counter_delta() reads
+TASK_COUNTER_PROJECTION = {dimension: 1 for dimension in STATS_DIMENSIONS}
+
+def counter_key(value):
+    """Make a field value safe to use as a key in a counters sub-document"""
+    return str(value).replace('.', '_').replace('$', '_') or '_'
+
+def aggregate_task_stats(user_id):
+    """Count a user's tasks by status, category and priority in one round trip"""
+    pipeline = [
+        {'$match': {'userId': ObjectId(user_id)}},
+        {'$facet': {
+            dimension: [{'$group': {'_id': f'${dimension}', 'count': {'$sum': 1}}}]
+            for dimension in STATS_DIMENSIONS
+        }}
+    ]
+    result = next(tasks_collection.aggregate(pipeline), {})
+    
+    counters = {}
+    for dimension in STATS_DIMENSIONS:
+        counters[dimension] = {
+            counter_key(group['_id']): group['count']
+            for group in result.get(dimension, [])
+        }
+    counters['total'] = sum(counters['status'].values())
+    return counters
+
+def load_task_counters(user_id):
+    """Read maintained counters, seeding them from an aggregation on first use"""
+    counters = task_stats_collection.find_one({'_id': ObjectId(user_id)})
+    if counters:
+        return counters
+    
+    counters = aggregate_task_stats(user_id)
+    task_stats_collection.update_one(
+        {'_id': ObjectId(user_id)},
+        {'$setOnInsert': counters},
+        upsert=True
+    )
+    return counters
+
+def get_task_stats(user_id):
+    """Get task statistics for a user
+
+    Uses the maintained per-user counters when TASK_STATS_COUNTERS is on,
+    otherwise a single $facet aggregation.
+    """
+    if Config.TASK_STATS_COUNTERS:
+        counters = load_task_counters(user_id)
+    else:
+        counters = aggregate_task_stats(user_id)
+    
+    by_status = {k: v for k, v in counters.get('status', {}).items() if v > 0}
+    return {
+        'total': counters.get('total', 0),
+        'pending': by_status.get('pending', 0),
+        'inProgress': by_status.get('in-progress', 0),
+        'completed': by_status.get('completed', 0),
+        'byStatus': by_status,
+        'byCategory': {k: v for k, v in counters.get('category', {}).items() if v > 0},
+        'byPriority': {k: v for k, v in counters.get('priority', {}).items() if v > 0}
+    }
+
+def task_counter_delta(task, sign):
+    """Counter increments contributed by one task (sign is +1 or -1)"""
+    delta = {'total': sign}
+    for dimension in STATS_DIMENSIONS:
+        delta[f'{dimension}.{counter_key(task.get(dimension))}'] = sign
+    return delta
+
+def update_task_counters(user_id, old_task=None, new_task=None):
+    """Apply a create (new only), update (both) or delete (old only) to the counters"""
+    update_task_counters_many(
+        user_id,
+        [] if old_task is None else [old_task],
+        [] if new_task is None else [new_task]
+    )
+
+def update_task_counters_many(user_id, old_tasks, new_tasks):
+    """Replace the contribution of old_tasks with that of new_tasks in one $inc"""
+    if not Config.TASK_STATS_COUNTERS:
+        return
+    
+    delta = {}
+    for tasks, sign in ((old_tasks, -1), (new_tasks, 1)):
+        for task in tasks:
+            for key, value in task_counter_delta(task, sign).items():
+                delta[key] = delta.get(key, 0) + value
+    delta = {k: v for k, v in delta.items() if v != 0}
+    
+    # Counters that were never seeded are built from scratch on the next read
+    if delta:
+        task_stats_collection.update_one({'_id': ObjectId(user_id)}, {'$inc': delta})
 
 # ==================== EMAIL NOTIFICATION FUNCTIONS ====================
 
 def send_email(recipient, subject, body):
-    """Send email"""
+    """Queue an email in the outbox; returns its outbox ID, or None on error"""
     try:
-        msg = Message(
-            subject=subject,
-            recipients=[recipient],
-            body=body,
-            sender=Config.MAIL_DEFAULT_SENDER
-        )
-        mail.send(msg)
-        print(f"✓ Email sent to {recipient}")
-        return True
+        return outbox.enqueue(recipient, subject, body)
     except Exception as e:
         print(f"✗ Email error: {e}")
-        return False
+        return None
 
 def check_due_date_reminders():
     """Check for tasks due in 24 hours and send reminders"""
     print(f"🔔 Checking for due tasks at {datetime.now()}")
     
-    # Calculate tomorrow's date
-    tomorrow = datetime.now() + timedelta(days=1)
-    tomorrow_start = datetime(tomorrow.year, tomorrow.month, tomorrow.day, 0, 0, 0)
-    tomorrow_end = datetime(tomorrow.year, tomorrow.month, tomorrow.day, 23, 59, 59)
-    
-    # Find tasks due tomorrow
-    tasks = tasks_collection.find({
-        'dueDate': {
-            '$gte': tomorrow_start,
-            '$lte': tomorrow_end
-        },
-        'status': {'$ne': 'completed'}
-    })
-    
-    # Group tasks by user
-    user_tasks = {}
-    for task in tasks:
-        user_id = str(task['userId'])
-        if user_id not in user_tasks:
-            user_tasks[user_id] = []
-        user_tasks[user_id].append(task)
+    # One aggregation groups tomorrow's open tasks by user and joins the user
+    tomorrow_start, tomorrow_end = due_tomorrow_window()
+    groups = iter_due_reminders(db, tomorrow_start, tomorrow_end, batch_size=Config.REMINDER_BATCH_SIZE)
     
-    # Send emails
-    for user_id, tasks in user_tasks.items():
-        user = users_collection.find_one({'_id': ObjectId(user_id)})
-        if user and 'email' in user:
-            subject = "⏰ Task Reminder: Tasks Due Tomorrow"
-            body = f"Hi {user['name']},\n\n"
-            body += "You have the following tasks due tomorrow:\n\n"
-            
-            for task in tasks:
-                body += f"• {task['title']} (Priority: {task['priority']})\n"
-                if 'description' in task and task['description']:
-                    body += f"  {task['description'][:100]}...\n"
-            
-            body += "\nComplete them before the deadline!\n"
-            body += "Login to TaskMaster Pro to update your progress."
-            
-            send_email(user['email'], subject, body)
+    for group in groups:
+        subject, body = build_reminder_email(group)
+        send_email(group['email'], subject, body)
+
+# Progress of the current (or last) weekly summary run, for /api/metrics
+weekly_summary_progress = {}
 
 def send_weekly_summary():
     """Send weekly task summary to all users"""
     print(f"📊 Sending weekly summary at {datetime.now()}")
     
-    users = users_collection.find()
-    
-    for user in users:
-        # Get user's tasks
-        tasks = list(tasks_collection.find({'userId': user['_id']}))
-        
-        if tasks:
-            total = len(tasks)
-            completed = len([t for t in tasks if t['status'] == 'completed'])
-            pending = len([t for t in tasks if t['status'] == 'pending'])
-            in_progress = len([t for t in tasks if t['status'] == 'in-progress'])
-            
-            subject = "📊 Your Weekly Task Summary"
-            body = f"Hi {user['name']},\n\n"
-            body += "Here's your task summary for this week:\n\n"
-            body += f"📋 Total Tasks: {total}\n"
-            body += f"✅ Completed: {completed}\n"
-            body += f"⏳ Pending: {pending}\n"
-            body += f"🔄 In Progress: {in_progress}\n\n"
-            
-            if pending > 0:
-                body += "Tasks to focus on this week:\n"
-                due_soon = [t for t in tasks if t['status'] != 'completed']
-                for task in due_soon[:5]:
-                    due_date = task['dueDate'].strftime('%Y-%m-%d') if hasattr(task['dueDate'], 'strftime') else str(task['dueDate'])
-                    body += f"• {task['title']} (Due: {due_date})\n"
-            
-            body += "\nKeep up the great work!\n"
-            body += "Login to TaskMaster Pro to manage your tasks."
-            
-            send_email(user['email'], subject, body)
+    result = run_weekly_summary(
+        db,
+        send_email,
+        chunk_size=Config.WEEKLY_SUMMARY_CHUNK_SIZE,
+        workers=Config.WEEKLY_SUMMARY_WORKERS,
+        dry_run=Config.WEEKLY_SUMMARY_DRY_RUN,
+        progress=weekly_summary_progress.update
+    )
+    weekly_summary_progress.update(result)
+    print(f"📊 Weekly summary done: {result['users']} users in {result['elapsedSeconds']}s "
+          f"({result['usersPerSecond']} users/s, {result['errors']} errors)")
 
 # Schedule jobs
-scheduler.add_job(
-    func=check_due_date_reminders,
-    trigger="cron",
+scheduler.add_cron_job(
+    "daily_reminders",
+    check_due_date_reminders,
+    period="daily",
     hour=8,
-    minute=0,
-    id="daily_reminders"
+    minute=0
 )
 
-scheduler.add_job(
-    func=send_weekly_summary,
-    trigger="cron",
+scheduler.add_cron_job(
+    "weekly_summary",
+    send_weekly_summary,
+    period="weekly",
     day_of_week="mon",
     hour=9,
-    minute=0,
-    id="weekly_summary"
+    minute=0
+)
+
+def cleanup_expired_uploads():
+    """Drop chunked uploads that were abandoned part-way"""
+    removed = chunked_uploads.cleanup_expired()
+    print(f"🧹 Removed {removed} expired upload sessions")
+
+scheduler.add_cron_job(
+    "upload_cleanup",
+    cleanup_expired_uploads,
+    period="daily",
+    hour=3,
+    minute=30
 )
 
+def cleanup_old_reports():
+    """Drop cached reports nobody has downloaded for a while"""
+    removed = report_jobs.cleanup()
+    print(f"🧹 Removed {removed} cached reports")
+
+scheduler.add_cron_job(
+    "report_cleanup",
+    cleanup_old_reports,
+    period="daily",
+    hour=4,
+    minute=0
+)
+
+if Config.SCHEDULER_ENABLED:
+    scheduler.start()
+
 # ==================== EXISTING AUTHENTICATION ROUTES ====================
 # (All your existing routes remain exactly as they were)
 
@@ -327,8 +1005,7 @@ def register():
             return jsonify({'success': False, 'message': 'Email already registered'}), 409
         
         # Hash password
-        salt = bcrypt.gensalt()
-        hashed_password = bcrypt.hashpw(password.encode('utf-8'), salt)
+        hashed_password = password_hasher.hash(password)
         
         # Create user document
         user = {
@@ -363,6 +1040,8 @@ def register():
             'user': user_data
         }), 201
         
+    except PasswordHasherBusy:
+        return jsonify({'success': False, 'message': 'Server is busy, please try again shortly'}), 503, {'Retry-After': '1'}
     except Exception as e:
         print(f"Registration error: {str(e)}")
         return jsonify({'success': False, 'message': f'Internal server error: {str(e)}'}), 500
@@ -389,10 +1068,20 @@ def login():
             return jsonify({'success': False, 'message': 'Invalid email or password'}), 401
         
         # Verify password
-        if not bcrypt.checkpw(password.encode('utf-8'), user['password']):
+        if not password_hasher.verify(password, user['password']):
             print(f"Invalid password for user: {email}")
             return jsonify({'success': False, 'message': 'Invalid email or password'}), 401
         
+        # Upgrade hashes made with a different BCRYPT_ROUNDS while we have the plaintext
+        if password_hasher.needs_rehash(user['password']):
+            try:
+                users_collection.update_one(
+                    {'_id': user['_id'], 'password': user['password']},
+                    {'$set': {'password': password_hasher.rehash(password)}}
+                )
+            except PasswordHasherBusy:
+                pass  # Try again on a later login
+        
         # Generate token
         token = generate_token(user['_id'])
         
@@ -413,6 +1102,8 @@ def login():
             'user': user_data
         }), 200
         
+    except PasswordHasherBusy:
+        return jsonify({'success': False, 'message': 'Server is busy, please try again shortly'}), 503, {'Retry-After': '1'}
     except Exception as e:
         print(f"Login error: {str(e)}")
         return jsonify({'success': False, 'message': f'Internal server error: {str(e)}'}), 500
@@ -447,14 +1138,34 @@ def verify_token_route(user_id):
 
 @app.route('/api/tasks', methods=['GET'])
 @token_required
+@versioned('tasks')
 def get_tasks(user_id):
-    """Get all tasks for the authenticated user"""
+    """Get a page of tasks for the authenticated user, ordered by (dueDate, _id)"""
     try:
         # Get query parameters for filtering
         status = request.args.get('status')
         priority = request.args.get('priority')
         category = request.args.get('category')
         
+        # Pagination parameters
+        limit = parse_limit(request.args.get('limit'),
+                            Config.TASKS_PAGE_DEFAULT_LIMIT,
+                            Config.TASKS_PAGE_MAX_LIMIT)
+        if limit is None:
+            return jsonify({'success': False, 'message': 'Invalid limit'}), 400
+        
+        # dueDate is always projected because the next cursor is built from it
+        projection = parse_fields(request.args.get('fields'), required=('dueDate',))
+        if projection is False:
+            return jsonify({'success': False, 'message': 'Invalid fields'}), 400
+        
+        cursor = request.args.get('cursor')
+        after = None
+        if cursor:
+            after = decode_cursor(cursor)
+            if after is None:
+                return jsonify({'success': False, 'message': 'Invalid cursor'}), 400
+        
         # Build query
         query = {'userId': ObjectId(user_id)}
         
@@ -465,26 +1176,47 @@ def get_tasks(user_id):
         if category:
             query['category'] = category
         
-        # Get tasks sorted by due date
-        tasks = list(tasks_collection.find(query).sort('dueDate', 1))
+        # Seek past the last task of the previous page instead of skipping
+        if after:
+            query.update(keyset_filter('dueDate', after[0], after[1]))
+        
+        # Fetch one extra task to know whether another page exists
+        tasks = list(
+            tasks_collection.find(query, projection)
+            .sort([('dueDate', 1), ('_id', 1)])
+            .limit(limit + 1)
+        )
+        has_more = len(tasks) > limit
+        tasks = tasks[:limit]
+        next_cursor = encode_cursor(tasks[-1].get('dueDate'), tasks[-1]['_id']) if has_more else None
         
-        # Serialize tasks
-        serialized_tasks = [serialize_document(task) for task in tasks]
+        # One batch for the whole page, encoded before any header goes out so errors still get a 500
+        body = stream_json({'success': True, 'hasMore': has_more, 'next': next_cursor}, 'tasks', tasks,
+                           batch_size=limit)
+        return Response(body, status=200, mimetype='application/json')
         
+    except Exception as e:
+        print(f"Get tasks error: {str(e)}")
+        return jsonify({'success': False, 'message': 'Internal server error'}), 500
+
+@app.route('/api/tasks/stats', methods=['GET'])
+@token_required
+def get_tasks_stats(user_id):
+    """Get task counts by status, category and priority for the filter sidebar"""
+    try:
         return jsonify({
             'success': True,
-            'tasks': serialized_tasks,
-            'count': len(serialized_tasks)
+            'stats': get_task_stats(user_id)
         }), 200
         
     except Exception as e:
-        print(f"Get tasks error: {str(e)}")
+        print(f"Get task stats error: {str(e)}")
         return jsonify({'success': False, 'message': 'Internal server error'}), 500
 
 @app.route('/api/tasks/<task_id>', methods=['GET'])
 @token_required
 def get_task(user_id, task_id):
-    """Get a single task by ID"""
+    """Get a single task by ID (always the full document)"""
     try:
         if not ObjectId.is_valid(task_id):
             return jsonify({'success': False, 'message': 'Invalid task ID'}), 400
@@ -508,45 +1240,23 @@ def get_task(user_id, task_id):
 
 @app.route('/api/tasks', methods=['POST'])
 @token_required
+@idempotent
 def create_task(user_id):
     """Create a new task"""
     try:
         data = request.get_json()
         print(f"Creating task with data: {data}")
         
-        # Validate required fields
-        required_fields = ['title', 'dueDate', 'priority', 'category', 'status']
-        for field in required_fields:
-            if field not in data:
-                return jsonify({'success': False, 'message': f'Missing required field: {field}'}), 400
-        
-        # Parse due date
-        try:
-            due_date = datetime.fromisoformat(data['dueDate'].replace('Z', '+00:00'))
-        except:
-            due_date = datetime.strptime(data['dueDate'], '%Y-%m-%d')
-        
-        # Create task document
-        task = {
-            'userId': ObjectId(user_id),
-            'title': data['title'].strip(),
-            'description': data.get('description', '').strip(),
-            'dueDate': due_date,
-            'priority': data['priority'],
-            'category': data['category'],
-            'status': data['status'],
-            'createdAt': datetime.utcnow(),
-            'updatedAt': datetime.utcnow(),
-            # New fields for enhanced features
-            'attachments': [],
-            'sharedWith': [],
-            'comments': [],
-            'activity': []
-        }
+        # Validate and build task document
+        task, error = build_task_document(user_id, data)
+        if error:
+            return jsonify({'success': False, 'message': error}), 400
         
         # Insert task
         result = tasks_collection.insert_one(task)
         task_id = result.inserted_id
+        update_task_counters(user_id, new_task=task)
+        bump_version(user_id, 'tasks')
         
         # Get created task
         created_task = tasks_collection.find_one({'_id': task_id})
@@ -584,28 +1294,17 @@ def update_task(user_id, task_id):
             return jsonify({'success': False, 'message': 'Task not found'}), 404
         
         # Prepare update data
-        update_data = {
-            'updatedAt': datetime.utcnow()
-        }
-        
-        # Update only provided fields
-        updatable_fields = ['title', 'description', 'priority', 'category', 'status']
-        for field in updatable_fields:
-            if field in data:
-                update_data[field] = data[field].strip() if isinstance(data[field], str) else data[field]
-        
-        # Handle due date separately
-        if 'dueDate' in data:
-            try:
-                update_data['dueDate'] = datetime.fromisoformat(data['dueDate'].replace('Z', '+00:00'))
-            except:
-                update_data['dueDate'] = datetime.strptime(data['dueDate'], '%Y-%m-%d')
+        update_data, error = build_task_update(data)
+        if error:
+            return jsonify({'success': False, 'message': error}), 400
         
         # Update task
         tasks_collection.update_one(
             {'_id': ObjectId(task_id)},
             {'$set': update_data}
         )
+        update_task_counters(user_id, old_task=existing_task, new_task={**existing_task, **update_data})
+        bump_version(user_id, 'tasks')
         
         # Get updated task
         updated_task = tasks_collection.find_one({'_id': ObjectId(task_id)})
@@ -645,6 +1344,12 @@ def delete_task(user_id, task_id):
         result = tasks_collection.delete_one({'_id': ObjectId(task_id)})
         
         if result.deleted_count > 0:
+            update_task_counters(user_id, old_task=existing_task)
+            bump_version(user_id, 'tasks')
+            record_tombstones(user_id, [ObjectId(task_id)])
+            release_attachments(existing_task.get('attachments'))
+            comments_collection.delete_many({'taskId': ObjectId(task_id)})
+            activity_collection.delete_many({'taskId': ObjectId(task_id)})
             print(f"Task {task_id} deleted successfully")
             return jsonify({
                 'success': True,
@@ -657,10 +1362,273 @@ def delete_task(user_id, task_id):
         print(f"Delete task error: {str(e)}")
         return jsonify({'success': False, 'message': f'Internal server error: {str(e)}'}), 500
 
+# ==================== BULK TASK WRITES ====================
+
+# Filter keys accepted by updateMany / deleteMany (always scoped to the caller's tasks)
+BULK_FILTER_FIELDS = ('status', 'priority', 'category')
+
+def build_bulk_filter(user_id, spec):
+    """Translate a bulk filter spec into a query on the user's tasks; returns (query, error)"""
+    if not isinstance(spec, dict) or not spec:
+        return None, 'filter must be a non-empty object'
+    
+    query = {'userId': ObjectId(user_id)}
+    for key, value in spec.items():
+        if key == 'ids':
+            if not isinstance(value, list) or not all(ObjectId.is_valid(v) for v in value):
+                return None, 'ids must be a list of task IDs'
+            query['_id'] = {'$in': [ObjectId(v) for v in value]}
+        elif key in BULK_FILTER_FIELDS:
+            query[key] = {'$in': value} if isinstance(value, list) else value
+        elif key == 'dueBefore':
+            try:
+                query.setdefault('dueDate', {})['$lt'] = parse_due_date(value)
+            except (ValueError, AttributeError):
+                return None, 'Invalid dueBefore'
+        else:
+            return None, f'Unsupported filter field: {key}'
+    return query, None
+
+def owned_task_ids(user_id, operations):
+    """IDs named by update/delete items that are the caller's tasks, read in one query"""
+    ids = [
+        ObjectId(op['id']) for op in operations
+        if isinstance(op, dict) and op.get('op') in ('update', 'delete')
+        and isinstance(op.get('id'), str) and ObjectId.is_valid(op['id'])
+    ]
+    if not ids:
+        return set()
+    return {doc['_id'] for doc in tasks_collection.find({'_id': {'$in': ids}, 'userId': ObjectId(user_id)}, {'_id': 1})}
+
+def build_bulk_request(user_id, op, owned):
+    """Turn one bulk item into (pymongo request, result stub, targeted task IDs) or an error string
+
+    `owned` is the set from owned_task_ids(); update and delete items naming
+    any other ID fail with 'Task not found' instead of silently matching nothing.
+    """
+    kind = op.get('op') if isinstance(op, dict) else None
+    
+    if kind == 'create':
+        if not isinstance(op.get('task') or {}, dict):
+            return 'task must be an object'
+        task, error = build_task_document(user_id, op.get('task') or {})
+        if error:
+            return error
+        task['_id'] = ObjectId()
+        return InsertOne(task), {'op': kind, 'id': str(task['_id'])}, [task['_id']]
+    
+    if kind in ('update', 'delete'):
+        task_id = op.get('id')
+        if not isinstance(task_id, str) or not ObjectId.is_valid(task_id):
+            return 'Invalid task ID'
+        if ObjectId(task_id) not in owned:
+            return 'Task not found'
+        query = {'_id': ObjectId(task_id), 'userId': ObjectId(user_id)}
+        if kind == 'delete':
+            return DeleteOne(query), {'op': kind, 'id': task_id}, [ObjectId(task_id)]
+        if not isinstance(op.get('changes') or {}, dict):
+            return 'changes must be an object'
+        update_data, error = build_task_update(op.get('changes') or {})
+        if error:
+            return error
+        return UpdateOne(query, {'$set': update_data}), {'op': kind, 'id': task_id}, [ObjectId(task_id)]
+    
+    if kind in ('updateMany', 'deleteMany'):
+        query, error = build_bulk_filter(user_id, op.get('filter'))
+        if error:
+            return error
+        # Resolve IDs up front so deletes can cascade and results report what matched
+        ids = [doc['_id'] for doc in tasks_collection.find(query, {'_id': 1})]
+        scoped = {'_id': {'$in': ids}, 'userId': ObjectId(user_id)}
+        stub = {'op': kind, 'matched': len(ids)}
+        if kind == 'deleteMany':
+            return DeleteMany(scoped), stub, ids
+        if not isinstance(op.get('changes') or {}, dict):
+            return 'changes must be an object'
+        update_data, error = build_task_update(op.get('changes') or {})
+        if error:
+            return error
+        if len(update_data) == 1:
+            return 'changes must set at least one field'
+        return UpdateMany(scoped, {'$set': update_data}), stub, ids
+    
+    return 'op must be one of create, update, delete, updateMany, deleteMany'
+
+@app.route('/api/tasks/bulk', methods=['POST'])
+@token_required
+@idempotent
+def bulk_tasks(user_id):
+    """Apply a batch of task creates, updates and deletes in one bulk_write"""
+    try:
+        data = request.get_json() or {}
+        operations = data.get('operations')
+        ordered = data.get('ordered', True)
+        
+        if not isinstance(operations, list) or not operations:
+            return jsonify({'success': False, 'message': 'operations must be a non-empty list'}), 400
+        if len(operations) > Config.BULK_MAX_OPERATIONS:
+            return jsonify({'success': False, 'message': f'At most {Config.BULK_MAX_OPERATIONS} operations per request'}), 400
+        
+        # Validate every item; in ordered mode nothing after the first invalid item runs
+        results = [None] * len(operations)
+        requests_, positions, request_ids = [], [], []
+        owned = owned_task_ids(user_id, operations)
+        for index, op in enumerate(operations):
+            built = build_bulk_request(user_id, op, owned)
+            if isinstance(built, str):
+                results[index] = {'op': op.get('op') if isinstance(op, dict) else None, 'status': 'error', 'error': built}
+                if ordered:
+                    break
+                continue
+            req, stub, ids = built
+            results[index] = {**stub, 'status': 'ok'}
+            requests_.append(req)
+            positions.append(index)
+            request_ids.append(ids)
+        request_deletes = [
+            ids if operations[item_index]['op'] in ('delete', 'deleteMany') else []
+            for item_index, ids in zip(positions, request_ids)
+        ]
+        
+        # Blob references held by tasks about to be deleted, released once the deletes go through
+        delete_candidates = [task_id for ids in request_deletes for task_id in ids]
+        held_attachments = {
+            task['_id']: task['attachments']
+            for task in tasks_collection.find(
+                {'_id': {'$in': delete_candidates}, 'userId': ObjectId(user_id), 'attachments.sha256': {'$exists': True}},
+                {'attachments': 1}
+            )
+        } if delete_candidates else {}
+        
+        # Counter fields of every targeted task before and after the write
+        touched = list({task_id for ids in request_ids for task_id in ids})
+        before = list(tasks_collection.find({'_id': {'$in': touched}}, TASK_COUNTER_PROJECTION)) \
+            if Config.TASK_STATS_COUNTERS and touched else []
+        
+        write_errors = {}
+        summary = {}
+        if requests_:
+            try:
+                result = tasks_collection.bulk_write(requests_, ordered=ordered)
+                summary = result.bulk_api_result
+            except BulkWriteError as bwe:
+                summary = bwe.details
+                write_errors = {err['index']: err for err in bwe.details.get('writeErrors', [])}
+        
+        # Map write errors back to request items; ordered writes stop at the first one
+        first_error = min(write_errors) if write_errors else None
+        for req_index, item_index in enumerate(positions):
+            if req_index in write_errors:
+                results[item_index].update({'status': 'error', 'error': write_errors[req_index].get('errmsg')})
+            elif ordered and first_error is not None and req_index > first_error:
+                results[item_index]['status'] = 'skipped'
+        for index, result_item in enumerate(results):
+            if result_item is None:
+                results[index] = {'op': operations[index].get('op') if isinstance(operations[index], dict) else None,
+                                  'status': 'skipped'}
+        
+        # Cascade only deletes that went through: the task was the caller's and is gone now
+        attempted = [
+            task_id
+            for req_index, item_index in enumerate(positions)
+            if results[item_index]['status'] == 'ok'
+            for task_id in request_deletes[req_index]
+        ]
+        remaining = {
+            doc['_id'] for doc in tasks_collection.find({'_id': {'$in': attempted}}, {'_id': 1})
+        } if attempted else set()
+        deleted_ids = [task_id for task_id in attempted if task_id not in remaining]
+        if deleted_ids:
+            record_tombstones(user_id, deleted_ids)
+            comments_collection.delete_many({'taskId': {'$in': deleted_ids}})
+            activity_collection.delete_many({'taskId': {'$in': deleted_ids}})
+            release_attachments([att for task_id in deleted_ids for att in held_attachments.get(task_id, [])])
+        if Config.TASK_STATS_COUNTERS and touched:
+            after = list(tasks_collection.find({'_id': {'$in': touched}}, TASK_COUNTER_PROJECTION))
+            update_task_counters_many(user_id, before, after)
+        if requests_:
+            bump_version(user_id, 'tasks')
+        
+        failed = any(r['status'] != 'ok' for r in results)
+        return jsonify({
+            'success': not failed,
+            'results': results,
+            'inserted': summary.get('nInserted', 0),
+            'modified': summary.get('nModified', 0),
+            'deleted': summary.get('nRemoved', 0)
+        }), 207 if failed else 200
+        
+    except Exception as e:
+        print(f"Bulk tasks error: {str(e)}")
+        return jsonify({'success': False, 'message': f'Internal server error: {str(e)}'}), 500
+
+# ==================== DELTA SYNC ====================
+
+@app.route('/api/sync', methods=['GET'])
+@token_required
+def sync_tasks(user_id):
+    """Return the user's tasks changed and deleted since a sync token, plus a new token
+
+    Without a token (or one too old or too far behind) the response says
+    reset: true and the client should reload its list in full. Changes
+    newer than SYNC_SETTLE_SECONDS are held back so writes still in
+    flight are picked up by the next sync instead of being skipped.
+    """
+    try:
+        projection = parse_fields(request.args.get('fields'))
+        if projection is False:
+            return jsonify({'success': False, 'message': 'Invalid fields'}), 400
+        
+        upper = datetime.utcnow() - timedelta(seconds=Config.SYNC_SETTLE_SECONDS)
+        next_token = encode_sync_token(upper)
+        reset = {'success': True, 'reset': True, 'tasks': [], 'deleted': [], 'token': next_token}
+        
+        since_token = request.args.get('since')
+        if not since_token:
+            return jsonify(reset), 200
+        
+        since = decode_sync_token(since_token)
+        if since is None:
+            return jsonify({'success': False, 'message': 'Invalid sync token'}), 400
+        
+        # Tombstones older than the retention window are gone, so we can't produce a delta
+        if since < datetime.utcnow() - timedelta(days=Config.TOMBSTONE_RETENTION_DAYS):
+            return jsonify(reset), 200
+        
+        window = {'$gt': since, '$lte': upper}
+        changed = list(
+            tasks_collection.find({'userId': ObjectId(user_id), 'updatedAt': window}, projection)
+            .sort('updatedAt', 1)
+            .limit(Config.SYNC_MAX_CHANGES + 1)
+        )
+        if len(changed) > Config.SYNC_MAX_CHANGES:
+            return jsonify(reset), 200
+        
+        deleted = [
+            str(tombstone['taskId'])
+            for tombstone in tombstones_collection.find(
+                {'userId': ObjectId(user_id), 'deletedAt': window}, {'taskId': 1}
+            )
+        ]
+        
+        # The delta is already in memory, so encode it in one batch before any header goes out
+        body = stream_json(
+            {'success': True, 'reset': False, 'deleted': deleted, 'token': next_token},
+            'tasks',
+            changed,
+            batch_size=Config.SYNC_MAX_CHANGES
+        )
+        return Response(body, status=200, mimetype='application/json')
+        
+    except Exception as e:
+        print(f"Sync error: {str(e)}")
+        return jsonify({'success': False, 'message': 'Internal server error'}), 500
+
 # ==================== EXISTING USER PROFILE ROUTE ====================
 
 @app.route('/api/user/profile', methods=['GET'])
 @token_required
+@versioned('profile', 'tasks')
 def get_profile(user_id):
     """Get user profile with task statistics"""
     try:
@@ -670,12 +1638,7 @@ def get_profile(user_id):
             return jsonify({'success': False, 'message': 'User not found'}), 404
         
         # Get task statistics
-        task_stats = {
-            'total': tasks_collection.count_documents({'userId': ObjectId(user_id)}),
-            'pending': tasks_collection.count_documents({'userId': ObjectId(user_id), 'status': 'pending'}),
-            'inProgress': tasks_collection.count_documents({'userId': ObjectId(user_id), 'status': 'in-progress'}),
-            'completed': tasks_collection.count_documents({'userId': ObjectId(user_id), 'status': 'completed'})
-        }
+        task_stats = get_task_stats(user_id)
         
         user_data = {
             '_id': str(user['_id']),
@@ -683,6 +1646,7 @@ def get_profile(user_id):
             'email': user['email'],
             'bio': user.get('bio', ''),
             'profilePhoto': user.get('profilePhoto', ''),
+            'profilePhotoVariants': user.get('profilePhotoVariants', {}),
             'createdAt': user['createdAt'].isoformat() if 'createdAt' in user else None,
             'taskStats': task_stats
         }
@@ -707,6 +1671,21 @@ def test():
         'timestamp': datetime.utcnow().isoformat()
     })
 
+@app.route('/api/metrics', methods=['GET'])
+def metrics():
+    """Runtime counters for monitoring"""
+    return jsonify({
+        'success': True,
+        'tokenCache': token_cache.stats(),
+        'passwordHasher': password_hasher.stats(),
+        'imageVariants': image_variants.stats(),
+        'reports': report_jobs.stats(),
+        'outbox': outbox.stats(),
+        'scheduler': scheduler.stats(),
+        'weeklySummary': weekly_summary_progress,
+        'compression': compressor.stats() if compressor else None
+    })
+
 # ==================== NEW FEATURE 1: EMAIL NOTIFICATION ROUTES ====================
 
 @app.route('/api/tasks/<task_id>/remind', methods=['POST'])
@@ -736,12 +1715,12 @@ def send_reminder(user_id, task_id):
         body += "Don't forget to complete it!\n"
         body += "Login to TaskMaster Pro to update your progress."
         
-        success = send_email(user['email'], subject, body)
+        message_id = send_email(user['email'], subject, body)
         
-        if success:
-            return jsonify({'success': True, 'message': 'Reminder sent successfully'}), 200
+        if message_id:
+            return jsonify({'success': True, 'message': 'Reminder queued', 'messageId': str(message_id)}), 202
         else:
-            return jsonify({'success': False, 'message': 'Failed to send reminder'}), 500
+            return jsonify({'success': False, 'message': 'Failed to queue reminder'}), 500
             
     except Exception as e:
         print(f"Reminder error: {str(e)}")
@@ -751,6 +1730,7 @@ def send_reminder(user_id, task_id):
 
 @app.route('/api/tasks/<task_id>/attachments', methods=['POST'])
 @token_required
+@idempotent
 def upload_attachment(user_id, task_id):
     """Upload file attachment for task"""
     try:
@@ -777,28 +1757,109 @@ def upload_attachment(user_id, task_id):
         if not task:
             return jsonify({'success': False, 'message': 'Task not found'}), 404
         
-        # Save file using custom function
-        filename = save_uploaded_file(file)
-        file_url = f'/uploads/{filename}'
-        
-        # Get file size
-        file.seek(0, os.SEEK_END)
-        file_size = file.tell()
-        file.seek(0)
+        # Store the content once, however many tasks attach it
+        sha256, file_size = save_uploaded_file(file)
         
         # Add to task attachments
-        attachment = {
-            'filename': file.filename,  # Original filename
-            'saved_as': filename,       # Saved filename with timestamp
-            'url': file_url,
-            'uploaded_at': datetime.utcnow().isoformat(),
-            'size': file_size
-        }
+        attachment = attach_to_task(user_id, task_id, file.filename, sha256, file_size)
         
-        tasks_collection.update_one(
-            {'_id': ObjectId(task_id)},
-            {'$push': {'attachments': attachment}}
+        return jsonify({
+            'success': True,
+            'message': 'File uploaded successfully',
+            'attachment': attachment
+        }), 200
+        
+    except Exception as e:
+        print(f"Upload error: {str(e)}")
+        return jsonify({'success': False, 'message': f'Upload failed: {str(e)}'}), 500
+
+# ==================== RESUMABLE CHUNKED UPLOADS ====================
+
+@app.route('/api/tasks/<task_id>/uploads', methods=['POST'])
+@token_required
+@idempotent
+def start_chunked_upload(user_id, task_id):
+    """Open a resumable upload session for a task attachment"""
+    try:
+        data = request.get_json() or {}
+        filename = data.get('filename') or ''
+        
+        if not allowed_file(filename):
+            return jsonify({'success': False, 'message': 'File type not allowed'}), 400
+        
+        if not ObjectId.is_valid(task_id):
+            return jsonify({'success': False, 'message': 'Invalid task ID'}), 400
+        
+        task = tasks_collection.find_one({'_id': ObjectId(task_id), 'userId': ObjectId(user_id)}, {'_id': 1})
+        if not task:
+            return jsonify({'success': False, 'message': 'Task not found'}), 404
+        
+        session = chunked_uploads.create(str(user_id), task_id, filename, data.get('size'))
+        return jsonify({'success': True, 'upload': chunked_uploads.describe(session)}), 201
+        
+    except UploadError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    except Exception as e:
+        print(f"Start upload error: {str(e)}")
+        return jsonify({'success': False, 'message': f'Internal error: {str(e)}'}), 500
+
+@app.route('/api/uploads/<upload_id>', methods=['GET'])
+@token_required
+def get_chunked_upload(user_id, upload_id):
+    """Which chunks of an upload have arrived, so a client can resume"""
+    session = chunked_uploads.get(upload_id, str(user_id))
+    if not session:
+        return jsonify({'success': False, 'message': 'Upload not found'}), 404
+    return jsonify({'success': True, 'upload': chunked_uploads.describe(session)}), 200
+
+@app.route('/api/uploads/<upload_id>/chunks/<int:index>', methods=['PUT'])
+@token_required
+def put_upload_chunk(user_id, upload_id, index):
+    """Store one chunk; the raw request body is the chunk's bytes"""
+    try:
+        session = chunked_uploads.get(upload_id, str(user_id))
+        if not session:
+            return jsonify({'success': False, 'message': 'Upload not found'}), 404
+        
+        record = chunked_uploads.write_chunk(
+            session, index, request.stream,
+            expected_sha256=request.headers.get('X-Chunk-SHA256')
         )
+        return jsonify({
+            'success': True,
+            'index': index,
+            'sha256': record['sha256'],
+            'missing': len(chunked_uploads.missing_chunks(session))
+        }), 200
+        
+    except UploadError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    except Exception as e:
+        print(f"Upload chunk error: {str(e)}")
+        return jsonify({'success': False, 'message': f'Internal error: {str(e)}'}), 500
+
+@app.route('/api/uploads/<upload_id>/complete', methods=['POST'])
+@token_required
+@idempotent
+def complete_chunked_upload(user_id, upload_id):
+    """Verify the assembled file and attach it to the task"""
+    try:
+        session = chunked_uploads.get(upload_id, str(user_id))
+        if not session:
+            return jsonify({'success': False, 'message': 'Upload not found'}), 404
+        
+        data = request.get_json(silent=True) or {}
+        path, checksum = chunked_uploads.finish(session, expected_sha256=data.get('sha256'))
+        
+        task = tasks_collection.find_one({'_id': ObjectId(session['taskId']), 'userId': ObjectId(user_id)}, {'_id': 1})
+        if not task:
+            chunked_uploads.discard(session)
+            return jsonify({'success': False, 'message': 'Task not found'}), 404
+        
+        # The whole-file hash was just computed, so the move into the store needs no second read
+        sha256, size = blob_store.put_file(path, checksum)
+        attachment = attach_to_task(user_id, session['taskId'], session['filename'], sha256, size)
+        chunked_uploads.discard(session)
         
         return jsonify({
             'success': True,
@@ -806,14 +1867,49 @@ def upload_attachment(user_id, task_id):
             'attachment': attachment
         }), 200
         
+    except UploadError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
     except Exception as e:
-        print(f"Upload error: {str(e)}")
+        print(f"Complete upload error: {str(e)}")
         return jsonify({'success': False, 'message': f'Upload failed: {str(e)}'}), 500
 
+@app.route('/api/uploads/<upload_id>', methods=['DELETE'])
+@token_required
+def abort_chunked_upload(user_id, upload_id):
+    """Abandon an upload and free its partial file"""
+    session = chunked_uploads.get(upload_id, str(user_id))
+    if not session:
+        return jsonify({'success': False, 'message': 'Upload not found'}), 404
+    chunked_uploads.discard(session)
+    return jsonify({'success': True, 'message': 'Upload cancelled'}), 200
+
 @app.route('/uploads/<filename>')
-def uploaded_file(filename):
-    """Serve uploaded files"""
-    return send_from_directory(app.config['UPLOAD_FOLDER'], filename)
+@file_token_required
+def uploaded_file(user_id, filename):
+    """Serve an attachment of a task the user owns or shares"""
+    sha256 = parse_blob_name(filename)
+    # Someone else's file answers like a missing one
+    if not can_read_attachment(user_id, {'sha256': sha256} if sha256 else {'saved_as': filename}):
+        abort(404)
+    if sha256 and blob_store.exists(sha256):
+        # The name is the content hash, which makes it both the ETag and a cache-forever URL
+        mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        return send_stored_file(blob_store.path_for(sha256), mimetype=mimetype, etag=sha256, immutable=True)
+    # Files uploaded before the blob store sit flat in the upload folder
+    path = safe_join(app.config['UPLOAD_FOLDER'], filename)
+    if path is None:
+        abort(404)
+    return send_stored_file(path)
+
+@app.route('/uploads/thumbs/<filename>')
+@file_token_required
+def attachment_thumbnail(user_id, filename):
+    """Serve a rendered thumbnail of an attachment the user can read"""
+    match = THUMBNAIL_NAME.match(filename)
+    if not match or not can_read_attachment(user_id, {'sha256': match.group(1)}):
+        abort(404)
+    # Named after the source content, so a thumbnail URL never changes meaning
+    return send_stored_file(os.path.join(thumbnail_dir(match.group(1)), filename), immutable=True)
 
 @app.route('/api/tasks/<task_id>/attachments/<filename>', methods=['DELETE'])
 @token_required
@@ -831,16 +1927,21 @@ def delete_attachment(user_id, task_id, filename):
         if not task:
             return jsonify({'success': False, 'message': 'Task not found'}), 404
         
+        removed = [att for att in task.get('attachments', []) if att.get('saved_as') == filename]
+        
         # Remove from database
         tasks_collection.update_one(
             {'_id': ObjectId(task_id)},
-            {'$pull': {'attachments': {'saved_as': filename}}}
+            {'$pull': {'attachments': {'saved_as': filename}}, '$set': {'updatedAt': datetime.utcnow()}}
         )
+        bump_version(user_id, 'tasks')
         
-        # Delete file
-        file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        if os.path.exists(file_path):
-            os.remove(file_path)
+        # Blobs go away with their last reference; legacy files belong to this task alone
+        release_attachments(removed)
+        if not any(att.get('sha256') for att in removed):
+            file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
+            if os.path.exists(file_path):
+                os.remove(file_path)
         
         return jsonify({'success': True, 'message': 'Attachment deleted'}), 200
         
@@ -852,6 +1953,7 @@ def delete_attachment(user_id, task_id, filename):
 
 @app.route('/api/tasks/<task_id>/share', methods=['POST'])
 @token_required
+@idempotent
 def share_task(user_id, task_id):
     """Share task with another user"""
     try:
@@ -882,21 +1984,20 @@ def share_task(user_id, task_id):
         # Add shared user
         tasks_collection.update_one(
             {'_id': ObjectId(task_id)},
-            {'$addToSet': {'sharedWith': str(share_user['_id'])}}
+            {'$addToSet': {'sharedWith': share_user['_id']}, '$set': {'updatedAt': datetime.utcnow()}}
         )
+        bump_version(user_id, 'tasks')
         
         # Add to activity log
         activity = {
+            'taskId': ObjectId(task_id),
             'userId': str(user_id),
             'action': 'shared',
             'targetUser': str(share_user['_id']),
-            'timestamp': datetime.utcnow().isoformat()
+            'timestamp': datetime.utcnow()
         }
         
-        tasks_collection.update_one(
-            {'_id': ObjectId(task_id)},
-            {'$push': {'activity': activity}}
-        )
+        activity_collection.insert_one(activity)
         
         return jsonify({'success': True, 'message': 'Task shared successfully'}), 200
         
@@ -906,6 +2007,7 @@ def share_task(user_id, task_id):
 
 @app.route('/api/tasks/<task_id>/comments', methods=['POST'])
 @token_required
+@idempotent
 def add_comment(user_id, task_id):
     """Add comment to task"""
     try:
@@ -920,31 +2022,42 @@ def add_comment(user_id, task_id):
             return jsonify({'success': False, 'message': 'Invalid task ID'}), 400
         
         # Check if user has access to task
-        task = tasks_collection.find_one({
-            '$or': [
-                {'_id': ObjectId(task_id), 'userId': ObjectId(user_id)},
-                {'_id': ObjectId(task_id), 'sharedWith': str(user_id)}
-            ]
-        })
+        task = find_task_for_member(task_id, user_id, {'_id': 1, 'userId': 1})
         
         if not task:
             return jsonify({'success': False, 'message': 'Task not found'}), 404
         
-        user = users_collection.find_one({'_id': ObjectId(user_id)})
+        user = users_collection.find_one({'_id': ObjectId(user_id)}, {'name': 1})
         
         comment = {
+            'taskId': ObjectId(task_id),
             'userId': str(user_id),
             'userName': user['name'],
             'text': comment_text,
-            'timestamp': datetime.utcnow().isoformat()
+            'timestamp': datetime.utcnow()
         }
         
+        comments_collection.insert_one(comment)
+        
+        # Keep a short, bounded preview on the task for list views
+        preview = {
+            'userId': comment['userId'],
+            'userName': comment['userName'],
+            'text': comment['text'],
+            'timestamp': comment['timestamp'].isoformat()
+        }
         tasks_collection.update_one(
             {'_id': ObjectId(task_id)},
-            {'$push': {'comments': comment}}
+            {
+                '$push': {'recentComments': {'$each': [preview], '$slice': -Config.RECENT_COMMENTS_LIMIT}},
+                '$inc': {'commentCount': 1},
+                '$set': {'updatedAt': datetime.utcnow()}
+            }
         )
+        # The preview lives on the owner's task, which may not be the commenter's
+        bump_version(task['userId'], 'tasks')
         
-        return jsonify({'success': True, 'message': 'Comment added', 'comment': comment}), 200
+        return jsonify({'success': True, 'message': 'Comment added', 'comment': serialize_document(comment)}), 200
         
     except Exception as e:
         print(f"Comment error: {str(e)}")
@@ -953,87 +2066,93 @@ def add_comment(user_id, task_id):
 @app.route('/api/tasks/shared', methods=['GET'])
 @token_required
 def get_shared_tasks(user_id):
-    """Get tasks shared with user - SIMPLIFIED WORKING VERSION"""
+    """Get a page of tasks shared with user, ordered by (dueDate, _id)"""
     try:
-        print("\n" + "="*50)
-        print("🔍 SHARED TASKS DEBUG")
-        print("="*50)
-        print(f"👤 Looking for tasks shared with user ID: {user_id}")
+        # userId is always projected to resolve the owner name, dueDate to build the next cursor
+        projection = parse_fields(request.args.get('fields'), required=('userId', 'dueDate'))
+        if projection is False:
+            return jsonify({'success': False, 'message': 'Invalid fields'}), 400
+        
+        # Paged by due date, served by the (sharedWith, dueDate, _id) index without an in-memory sort
+        page = paginate_feed(tasks_collection, {'sharedWith': shared_with_match(user_id)},
+                             sort_field='dueDate', direction=1, projection=projection)
+        if page is None:
+            return jsonify({'success': False, 'message': 'Invalid limit or cursor'}), 400
+        tasks, next_cursor = page
+        
+        # Resolve every owner name in one round trip
+        owner_ids = list({task['userId'] for task in tasks})
+        owners = {}
+        if owner_ids:
+            owners = {
+                owner['_id']: owner.get('name', 'Unknown')
+                for owner in users_collection.find({'_id': {'$in': owner_ids}}, {'name': 1})
+            }
         
-        # DIRECT QUERY - Find tasks where sharedWith array contains this user ID
-        # In MongoDB, this checks if the string is in the array
-        tasks = list(tasks_collection.find({
-            'sharedWith': user_id  # Direct string comparison
-        }))
+        for task in tasks:
+            task['sharedBy'] = owners.get(task['userId'], 'Unknown')
         
-        print(f"📦 Found {len(tasks)} shared tasks")
+        # One batch for the whole page, encoded before any header goes out so errors still get a 500
+        body = stream_json({'success': True, 'hasMore': next_cursor is not None, 'next': next_cursor},
+                           'tasks', tasks, batch_size=Config.FEED_PAGE_MAX_LIMIT)
+        return Response(body, status=200, mimetype='application/json')
         
-        if len(tasks) == 0:
-            print("❌ No tasks found with sharedWith containing:", user_id)
-            
-            # DEBUG: Show all tasks that have any sharedWith entries
-            print("\n📋 Checking all tasks with sharedWith array:")
-            all_shared = list(tasks_collection.find({
-                'sharedWith': {'$exists': True, '$ne': []}
-            }))
-            for task in all_shared:
-                print(f"  Task: {task.get('title')}")
-                print(f"  sharedWith: {task.get('sharedWith')}")
-            
-            return jsonify({
-                'success': True,
-                'tasks': [],
-                'count': 0
-            }), 200
+    except Exception as e:
+        print(f"❌ Error: {str(e)}")
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+@app.route('/api/tasks/<task_id>/comments', methods=['GET'])
+@token_required
+def get_task_comments(user_id, task_id):
+    """Get a page of comments for task, newest first"""
+    try:
+        if not ObjectId.is_valid(task_id):
+            return jsonify({'success': False, 'message': 'Invalid task ID'}), 400
         
-        # Process tasks
-        serialized_tasks = []
-        for task in tasks:
-            print(f"\n📋 Processing: {task.get('title')}")
-            print(f"  Attachments: {len(task.get('attachments', []))}")
-            print(f"  Comments: {len(task.get('comments', []))}")
-            
-            # Get owner info
-            owner = users_collection.find_one({'_id': task['userId']})
-            owner_name = owner['name'] if owner else 'Unknown'
-            
-            serialized = serialize_document(task)
-            serialized['sharedBy'] = owner_name
-            serialized_tasks.append(serialized)
+        task = find_task_for_member(task_id, user_id, {'_id': 1})
         
-        print(f"\n✅ Returning {len(serialized_tasks)} tasks")
+        if not task:
+            return jsonify({'success': False, 'message': 'Task not found'}), 404
         
+        page = paginate_feed(comments_collection, {'taskId': ObjectId(task_id)})
+        if page is None:
+            return jsonify({'success': False, 'message': 'Invalid limit or cursor'}), 400
+        
+        comments, next_cursor = page
         return jsonify({
             'success': True,
-            'tasks': serialized_tasks,
-            'count': len(serialized_tasks)
+            'comments': [serialize_document(entry) for entry in comments],
+            'hasMore': next_cursor is not None,
+            'next': next_cursor
         }), 200
         
     except Exception as e:
-        print(f"❌ Error: {str(e)}")
-        return jsonify({'success': False, 'message': str(e)}), 500
+        print(f"Get comments error: {str(e)}")
+        return jsonify({'success': False, 'message': f'Internal error: {str(e)}'}), 500
 
 @app.route('/api/tasks/<task_id>/activity', methods=['GET'])
 @token_required
 def get_task_activity(user_id, task_id):
-    """Get activity log for task"""
+    """Get a page of the activity log for task, newest first"""
     try:
         if not ObjectId.is_valid(task_id):
             return jsonify({'success': False, 'message': 'Invalid task ID'}), 400
         
-        task = tasks_collection.find_one({
-            '$or': [
-                {'_id': ObjectId(task_id), 'userId': ObjectId(user_id)},
-                {'_id': ObjectId(task_id), 'sharedWith': str(user_id)}
-            ]
-        })
+        task = find_task_for_member(task_id, user_id, {'_id': 1})
         
         if not task:
             return jsonify({'success': False, 'message': 'Task not found'}), 404
         
+        page = paginate_feed(activity_collection, {'taskId': ObjectId(task_id)})
+        if page is None:
+            return jsonify({'success': False, 'message': 'Invalid limit or cursor'}), 400
+        
+        activity, next_cursor = page
         return jsonify({
             'success': True,
-            'activity': task.get('activity', [])
+            'activity': [serialize_document(entry) for entry in activity],
+            'hasMore': next_cursor is not None,
+            'next': next_cursor
         }), 200
         
     except Exception as e:
@@ -1042,116 +2161,146 @@ def get_task_activity(user_id, task_id):
 
 # ==================== NEW FEATURE 4: EXPORT ROUTES ====================
 
-# @app.route('/api/export/csv', methods=['GET'])
-# @token_required
-# def export_csv(user_id):
-#     """Export tasks to CSV"""
-#     try:
-#         tasks = list(tasks_collection.find({'userId': ObjectId(user_id)}))
-        
-#         # Prepare data for CSV
-#         data = []
-#         for task in tasks:
-#             due_date = task['dueDate'].strftime('%Y-%m-%d') if hasattr(task['dueDate'], 'strftime') else str(task['dueDate'])
-#             created_at = task['createdAt'].strftime('%Y-%m-%d') if hasattr(task['createdAt'], 'strftime') else str(task['createdAt'])
-            
-#             data.append({
-#                 'Title': task['title'],
-#                 'Description': task.get('description', ''),
-#                 'Due Date': due_date,
-#                 'Priority': task['priority'],
-#                 'Category': task['category'],
-#                 'Status': task['status'],
-#                 'Created': created_at
-#             })
-        
-#         df = pd.DataFrame(data)
-        
-#         # Create CSV
-#         csv_data = df.to_csv(index=False)
-        
-#         response = app.response_class(
-#             response=csv_data,
-#             status=200,
-#             mimetype='text/csv',
-#             headers={'Content-Disposition': 'attachment; filename=tasks_export.csv'}
-#         )
-        
-#         return response
-        
-#     except Exception as e:
-#         print(f"Export error: {str(e)}")
-#         return jsonify({'success': False, 'message': f'Export failed: {str(e)}'}), 500
-
-# @app.route('/api/export/pdf', methods=['GET'])
-# @token_required
-# def export_pdf(user_id):
-#     """Export tasks to PDF"""
-#     try:
-#         tasks = list(tasks_collection.find({'userId': ObjectId(user_id)}))
-#         user = users_collection.find_one({'_id': ObjectId(user_id)})
-        
-#         # Create PDF buffer
-#         buffer = io.BytesIO()
-#         doc = SimpleDocTemplate(buffer, pagesize=A4)
-#         elements = []
-        
-#         # Add title
-#         styles = getSampleStyleSheet()
-#         title = Paragraph(f"Task Report for {user['name']}", styles['Title'])
-#         elements.append(title)
-#         elements.append(Paragraph(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M')}", styles['Normal']))
-#         elements.append(Paragraph(" ", styles['Normal']))
-        
-#         # Create table data
-#         table_data = [['Title', 'Due Date', 'Priority', 'Status']]
-#         for task in tasks:
-#             due_date = task['dueDate'].strftime('%Y-%m-%d') if hasattr(task['dueDate'], 'strftime') else str(task['dueDate'])
-#             table_data.append([
-#                 task['title'][:30],
-#                 due_date,
-#                 task['priority'],
-#                 task['status']
-#             ])
-        
-#         # Create table
-#         table = Table(table_data)
-#         table.setStyle(TableStyle([
-#             ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-#             ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-#             ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-#             ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-#             ('FONTSIZE', (0, 0), (-1, 0), 14),
-#             ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-#             ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-#             ('GRID', (0, 0), (-1, -1), 1, colors.black)
-#         ]))
-        
-#         elements.append(table)
-        
-#         # Build PDF
-#         doc.build(elements)
-        
-#         pdf_data = buffer.getvalue()
-#         buffer.close()
-        
-#         response = app.response_class(
-#             response=pdf_data,
-#             status=200,
-#             mimetype='application/pdf',
-#             headers={'Content-Disposition': 'attachment; filename=tasks_report.pdf'}
-#         )
-        
-#         return response
-        
-#     except Exception as e:
-#         print(f"PDF export error: {str(e)}")
-#         return jsonify({'success': False, 'message': f'PDF export failed: {str(e)}'}), 500
+@app.route('/api/export/csv', methods=['GET'])
+@token_required
+def export_csv(user_id):
+    """Export tasks to CSV, streamed straight from the cursor"""
+    try:
+        tasks = (
+            tasks_collection.find({'userId': ObjectId(user_id)}, EXPORT_PROJECTION)
+            .sort([('dueDate', 1), ('_id', 1)])
+            .batch_size(Config.EXPORT_BATCH_SIZE)
+        )
+        
+        return Response(
+            stream_csv(tasks),
+            status=200,
+            mimetype='text/csv',
+            headers={'Content-Disposition': 'attachment; filename=tasks_export.csv'}
+        )
+        
+    except Exception as e:
+        print(f"Export error: {str(e)}")
+        return jsonify({'success': False, 'message': f'Export failed: {str(e)}'}), 500
+
+# ---------- PDF / Excel report jobs ----------
+# POST starts (or reuses) a job, then the client polls it or follows its
+# event stream, and downloads the file once it is done
+
+REPORT_FILENAMES = {'pdf': 'tasks_report.pdf', 'xlsx': 'tasks_report.xlsx'}
+REPORT_EVENTS_POLL_SECONDS = 0.5
+REPORT_EVENTS_HEARTBEAT_SECONDS = 15
+
+def report_job_response(job):
+    """A job's client view plus the URLs to follow it"""
+    body = report_jobs.describe(job)
+    base = f"/api/reports/{job['_id']}"
+    body.update({'statusUrl': base, 'eventsUrl': f'{base}/events'})
+    if job['status'] == 'done':
+        body['downloadUrl'] = f'{base}/download'
+    return body
+
+def sse_event(event, data):
+    return f'event: {event}\ndata: {json.dumps(data)}\n\n'
+
+@app.route('/api/reports', methods=['POST'])
+@token_required
+def start_report(user_id):
+    """Start a PDF or Excel report; an unchanged one is returned already done"""
+    try:
+        data = request.get_json(silent=True) or {}
+        fmt = data.get('format')
+        if fmt not in REPORT_FORMATS:
+            return jsonify({'success': False, 'message': f"format must be one of {', '.join(REPORT_FORMATS)}"}), 400
+        if not report_jobs.available(fmt):
+            return jsonify({
+                'success': False,
+                'message': f"{fmt.upper()} reports need {REPORT_FORMATS[fmt]['library']} on the server"
+            }), 501
+        
+        user = users_collection.find_one({'_id': ObjectId(user_id)}, {'versions': 1}) or {}
+        job = report_jobs.start(ObjectId(user_id), fmt, user.get('versions', {}))
+        body = report_job_response(job)
+        status = 200 if job['status'] == 'done' else 202
+        return jsonify({'success': True, 'job': body}), status, {'Location': body['statusUrl']}
+        
+    except Exception as e:
+        print(f"Start report error: {str(e)}")
+        return jsonify({'success': False, 'message': f'Report failed: {str(e)}'}), 500
+
+@app.route('/api/reports/<job_id>', methods=['GET'])
+@token_required
+def get_report(user_id, job_id):
+    """Status and progress of a report job"""
+    job = report_jobs.get(job_id, ObjectId(user_id))
+    if not job:
+        return jsonify({'success': False, 'message': 'Report not found'}), 404
+    return jsonify({'success': True, 'job': report_job_response(job)}), 200
+
+@app.route('/api/reports/<job_id>/events', methods=['GET'])
+@token_required
+def report_events(user_id, job_id):
+    """Server-sent progress events until the job is done or failed
+
+    The stream ends after REPORT_EVENTS_SECONDS; the client then reconnects
+    or falls back to polling.
+    """
+    owner = ObjectId(user_id)
+    if not report_jobs.get(job_id, owner):
+        return jsonify({'success': False, 'message': 'Report not found'}), 404
+    
+    def events():
+        last = None
+        last_sent = time.monotonic()
+        deadline = last_sent + Config.REPORT_EVENTS_SECONDS
+        while True:
+            job = report_jobs.get(job_id, owner)
+            if not job:
+                yield sse_event('error', {'message': 'Report not found'})
+                return
+            body = report_job_response(job)
+            if job['status'] in ('done', 'failed'):
+                yield sse_event(job['status'], body)
+                return
+            if body != last:
+                yield sse_event('progress', body)
+                last = body
+                last_sent = time.monotonic()
+            elif time.monotonic() - last_sent >= REPORT_EVENTS_HEARTBEAT_SECONDS:
+                # Comment line, so proxies don't close an idle connection
+                yield ': keep-alive\n\n'
+                last_sent = time.monotonic()
+            if time.monotonic() >= deadline:
+                return
+            time.sleep(REPORT_EVENTS_POLL_SECONDS)
+    
+    return Response(events(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+@app.route('/api/reports/<job_id>/download', methods=['GET'])
+@token_required
+def download_report(user_id, job_id):
+    """The finished report; its URL is tied to one data version, so it never changes"""
+    job = report_jobs.get(job_id, ObjectId(user_id))
+    if not job:
+        return jsonify({'success': False, 'message': 'Report not found'}), 404
+    if job['status'] != 'done':
+        return jsonify({'success': False, 'message': 'Report is not ready yet', 'job': report_job_response(job)}), 409
+    
+    report_jobs.touch(job)
+    response = send_stored_file(report_jobs.path_for(job), REPORT_FORMATS[job['format']]['mimetype'], etag=job['_id'])
+    # Per-user content behind auth: cacheable forever, but only by the browser
+    response.headers['Cache-Control'] = 'private, max-age=31536000, immutable'
+    response.headers['Content-Disposition'] = f"attachment; filename={REPORT_FILENAMES[job['format']]}"
+    return response
 
 # ==================== NEW FEATURE 5: DARK MODE PREFERENCE ====================
 
 @app.route('/api/user/preferences', methods=['GET'])
 @token_required
+@versioned('preferences')
 def get_preferences(user_id):
     """Get user preferences including theme"""
     try:
@@ -1186,6 +2335,7 @@ def update_preferences(user_id):
             {'_id': ObjectId(user_id)},
             {'$set': {'preferences.theme': theme}}
         )
+        bump_version(user_id, 'preferences')
         
         return jsonify({
             'success': True,
@@ -1215,18 +2365,33 @@ def upload_profile_photo(user_id):
         if not allowed_profile_photo(file.filename):
             return jsonify({'success': False, 'message': 'File type not allowed. Use PNG, JPG, JPEG, or GIF'}), 400
         
-        # Save file with user ID as filename
+        data = file.read()
+        if len(data) > app.config['MAX_PROFILE_SIZE']:
+            return jsonify({'success': False, 'message': 'Photo must be 5MB or smaller'}), 400
+        
+        # Name the file after its content so the URL can be cached forever
         ext = file.filename.rsplit('.', 1)[1].lower()
-        filename = f"profile_{user_id}.{ext}"
+        filename = f"profile_{user_id}_{hashlib.sha256(data).hexdigest()[:16]}.{ext}"
         file_path = os.path.join(app.config['PROFILE_UPLOAD_FOLDER'], filename)
-        file.save(file_path)
+        with open(file_path, 'wb') as f:
+            f.write(data)
         
         # Update user document with photo path
         photo_url = f"/profile_photos/{filename}"
-        users_collection.update_one(
+        previous = users_collection.find_one_and_update(
             {'_id': ObjectId(user_id)},
-            {'$set': {'profilePhoto': photo_url}}
+            {'$set': {'profilePhoto': photo_url}, '$unset': {'profilePhotoVariants': ''}},
+            projection={'profilePhoto': 1}
         )
+        bump_version(user_id, 'profile')
+        
+        # The old photo had a different name, so it has to be removed explicitly
+        old_url = (previous or {}).get('profilePhoto')
+        if old_url and old_url != photo_url:
+            remove_profile_photo_files(old_url)
+        
+        # Respond now; the small sizes show up on the profile once rendered
+        queue_avatar_variants(user_id, photo_url, file_path)
         
         return jsonify({
             'success': True,
@@ -1239,9 +2404,20 @@ def upload_profile_photo(user_id):
         return jsonify({'success': False, 'message': f'Upload failed: {str(e)}'}), 500
 
 @app.route('/profile_photos/<filename>')
-def get_profile_photo(filename):
-    """Serve profile photos"""
-    return send_from_directory(app.config['PROFILE_UPLOAD_FOLDER'], filename)
+@file_token_required
+def get_profile_photo(user_id, filename):
+    """Serve the user's own profile photo and its variants"""
+    # profile_<user>.<ext> from before hashing, profile_<user>_<hash>[_<size>].<ext> since
+    if not re.match(rf'^profile_{user_id}[_.]', filename):
+        abort(404)
+    path = safe_join(app.config['PROFILE_UPLOAD_FOLDER'], filename)
+    if path is None:
+        abort(404)
+    # profile_<user>_<content hash>.<ext>; photos saved before hashing have no version
+    match = PROFILE_PHOTO_NAME.match(filename)
+    if match:
+        return send_stored_file(path, etag=match.group(1), immutable=True)
+    return send_stored_file(path)
 
 @app.route('/api/user/photo', methods=['DELETE'])
 @token_required
@@ -1250,17 +2426,14 @@ def delete_profile_photo(user_id):
     try:
         user = users_collection.find_one({'_id': ObjectId(user_id)})
         if user and 'profilePhoto' in user:
-            # Extract filename from URL
-            filename = user['profilePhoto'].split('/')[-1]
-            file_path = os.path.join(app.config['PROFILE_UPLOAD_FOLDER'], filename)
-            if os.path.exists(file_path):
-                os.remove(file_path)
+            remove_profile_photo_files(user['profilePhoto'])
             
             # Remove from database
             users_collection.update_one(
                 {'_id': ObjectId(user_id)},
-                {'$unset': {'profilePhoto': ''}}
+                {'$unset': {'profilePhoto': '', 'profilePhotoVariants': ''}}
             )
+            bump_version(user_id, 'profile')
         
         return jsonify({'success': True, 'message': 'Profile photo removed'}), 200
         
@@ -1306,6 +2479,7 @@ def update_profile(user_id):
                 {'_id': ObjectId(user_id)},
                 {'$set': update_data}
             )
+            bump_version(user_id, 'profile')
         
         # Get updated user
         user = users_collection.find_one({'_id': ObjectId(user_id)})
@@ -1315,6 +2489,7 @@ def update_profile(user_id):
             'email': user['email'],
             'bio': user.get('bio', ''),
             'profilePhoto': user.get('profilePhoto', ''),
+            'profilePhotoVariants': user.get('profilePhotoVariants', {}),
             'createdAt': user['createdAt'].isoformat() if 'createdAt' in user else None
         }
         
@@ -0,0 +1,117 @@
+# backend/benchmarks/bench_json_stream.py
+"""
+Benchmark: serialize_document + jsonify versus the streaming BSON
+serializer (services/json_stream.py) for task lists of 1k, 10k and
+100k documents.
+
+Reports wall time and peak memory for each path. Does not need MongoDB.
+
+Usage (from the backend folder):
+    python benchmarks/bench_json_stream.py [--sizes 1000 10000 100000]
+"""
+from datetime import datetime, timedelta
+import argparse
+import copy
+import os
+import sys
+import time
+import tracemalloc
+
+from bson import ObjectId
+from flask import Flask, jsonify
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from services.json_stream import stream_json
+
+
+def serialize_document(doc):
+    """Copy of the original per-key serializer in app.py"""
+    if doc is None:
+        return None
+
+    doc['_id'] = str(doc['_id'])
+    if 'userId' in doc and isinstance(doc['userId'], ObjectId):
+        doc['userId'] = str(doc['userId'])
+
+    for key, value in doc.items():
+        if isinstance(value, datetime):
+            doc[key] = value.isoformat()
+
+    return doc
+
+
+def make_tasks(count):
+    user_id = ObjectId()
+    now = datetime.utcnow()
+    return [
+        {
+            '_id': ObjectId(),
+            'userId': user_id,
+            'title': f'Task number {i}',
+            'description': 'Prepare the quarterly report and circulate it to the team.',
+            'dueDate': now + timedelta(days=i % 90),
+            'priority': ('low', 'medium', 'high')[i % 3],
+            'category': ('work', 'personal', 'shopping')[i % 3],
+            'status': ('pending', 'in-progress', 'completed')[i % 3],
+            'createdAt': now,
+            'updatedAt': now,
+            'attachments': [],
+            'sharedWith': [],
+            'recentComments': [],
+            'commentCount': 0
+        }
+        for i in range(count)
+    ]
+
+
+def measure(fn, repeat=3):
+    """Best wall time of `repeat` runs, then peak memory from a separate traced run
+
+    tracemalloc slows allocation-heavy code several times over, so it is
+    kept out of the timed runs.
+    """
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        size = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+
+    for count in args.sizes:
+        tasks = make_tasks(count)
+
+        def jsonify_path(docs):
+            with app.app_context():
+                response = jsonify({'success': True, 'tasks': [serialize_document(t) for t in docs], 'count': count})
+                return len(response.get_data())
+
+        def stream_path():
+            return sum(len(chunk) for chunk in stream_json({'success': True}, 'tasks', tasks))
+
+        # serialize_document mutates, so each run gets its own copy, made outside the timing
+        copies = iter([copy.deepcopy(tasks) for _ in range(4)])
+        old_time, old_peak, old_size = measure(lambda: jsonify_path(next(copies)))
+        new_time, new_peak, new_size = measure(stream_path)
+
+        print(f"{count:>7} tasks")
+        print(f"  serialize_document + jsonify: {old_time * 1000:8.1f} ms  peak {old_peak / 1e6:7.1f} MB  {old_size / 1e6:6.1f} MB out")
+        print(f"  stream_json:                  {new_time * 1000:8.1f} ms  peak {new_peak / 1e6:7.1f} MB  {new_size / 1e6:6.1f} MB out")
+        print(f"  speedup: {old_time / new_time:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
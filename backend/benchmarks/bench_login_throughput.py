@@ -0,0 +1,114 @@
+# backend/benchmarks/bench_login_throughput.py
+"""
+Benchmark: login throughput and task-read latency under a mixed load.
+
+Runs against a live server. Registers (or reuses) one bench user, then
+hammers POST /api/auth/login from some threads while others keep
+reading GET /api/tasks, and reports logins per second, how many logins
+were shed with 503, and task-read latency percentiles. Compare runs with
+different PASSWORD_HASH_WORKERS / PASSWORD_HASH_QUEUE / BCRYPT_ROUNDS on
+the server to see how much a login burst slows the task API.
+
+Usage (from the backend folder, with the app running):
+    python benchmarks/bench_login_throughput.py --url http://localhost:5000 --seconds 20
+    python benchmarks/bench_login_throughput.py --login-threads 16 --read-threads 8
+"""
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+import argparse
+import json
+import statistics
+import sys
+import threading
+import time
+
+BENCH_EMAIL = 'bench-login@example.com'
+BENCH_PASSWORD = 'bench-password'
+
+
+def call(url, method='GET', data=None, token=None):
+    """(status, parsed body) for one request"""
+    headers = {'Content-Type': 'application/json'}
+    if token:
+        headers['Authorization'] = f'Bearer {token}'
+    body = json.dumps(data).encode('utf-8') if data is not None else None
+    try:
+        with urlopen(Request(url, data=body, headers=headers, method=method), timeout=30) as response:
+            return response.status, json.loads(response.read() or b'{}')
+    except HTTPError as e:
+        return e.code, {}
+
+
+def login_token(base):
+    credentials = {'email': BENCH_EMAIL, 'password': BENCH_PASSWORD}
+    status, body = call(f'{base}/api/auth/login', 'POST', credentials)
+    if status != 200:
+        status, body = call(f'{base}/api/auth/register', 'POST', {'name': 'Bench', **credentials})
+    if status not in (200, 201):
+        sys.exit(f'Could not log in or register the bench user (HTTP {status})')
+    return body['token']
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--url', default='http://localhost:5000')
+    parser.add_argument('--seconds', type=float, default=20)
+    parser.add_argument('--login-threads', type=int, default=8)
+    parser.add_argument('--read-threads', type=int, default=4)
+    args = parser.parse_args()
+
+    base = args.url.rstrip('/')
+    token = login_token(base)
+    credentials = {'email': BENCH_EMAIL, 'password': BENCH_PASSWORD}
+
+    lock = threading.Lock()
+    results = {'logins': 0, 'shed': 0, 'loginErrors': 0, 'reads': 0, 'readErrors': 0}
+    read_latencies = []
+    deadline = time.perf_counter() + args.seconds
+
+    def login_worker():
+        while time.perf_counter() < deadline:
+            status, _ = call(f'{base}/api/auth/login', 'POST', credentials)
+            key = 'logins' if status == 200 else 'shed' if status == 503 else 'loginErrors'
+            with lock:
+                results[key] += 1
+
+    def read_worker():
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            status, _ = call(f'{base}/api/tasks?limit=50', token=token)
+            elapsed = time.perf_counter() - start
+            with lock:
+                if status == 200:
+                    results['reads'] += 1
+                    read_latencies.append(elapsed)
+                else:
+                    results['readErrors'] += 1
+
+    threads = [threading.Thread(target=login_worker) for _ in range(args.login_threads)]
+    threads += [threading.Thread(target=read_worker) for _ in range(args.read_threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    print(f"{args.login_threads} login threads, {args.read_threads} read threads, {args.seconds:.0f}s")
+    print(f"  logins:      {results['logins']} ok ({results['logins'] / args.seconds:.1f}/s), "
+          f"{results['shed']} shed with 503, {results['loginErrors']} errors")
+    print(f"  task reads:  {results['reads']} ok ({results['reads'] / args.seconds:.1f}/s), "
+          f"{results['readErrors']} errors")
+    if read_latencies:
+        print(f"  read latency: p50 {statistics.median(read_latencies) * 1000:.1f} ms, "
+              f"p95 {percentile(read_latencies, 0.95) * 1000:.1f} ms, "
+              f"max {max(read_latencies) * 1000:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+# backend/benchmarks/bench_token_cache.py
+"""
+Microbenchmark: per-request token verification cost with and without
+the verified-token cache, using a thread pool the size of a gunicorn
+`--threads` setting.
+
+Usage (from the backend folder):
+    python benchmarks/bench_token_cache.py [--threads 8] [--requests 50000] [--users 200]
+"""
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+import argparse
+import os
+import random
+import sys
+import time
+
+import jwt
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from services.token_cache import TokenCache
+
+SECRET = 'bench-secret'
+
+
+def make_tokens(count):
+    exp = datetime.utcnow() + timedelta(hours=1)
+    return [
+        jwt.encode({'user_id': f'user{i}', 'exp': exp, 'iat': datetime.utcnow()}, SECRET, algorithm='HS256')
+        for i in range(count)
+    ]
+
+
+def verify_uncached(token):
+    return jwt.decode(token, SECRET, algorithms=['HS256'])['user_id']
+
+
+def make_verify_cached(cache):
+    def verify_cached(token):
+        user_id = cache.get(token)
+        if user_id:
+            return user_id
+        payload = jwt.decode(token, SECRET, algorithms=['HS256'])
+        cache.put(token, payload['user_id'], payload['exp'])
+        return payload['user_id']
+    return verify_cached
+
+
+def run(verify, workload, threads):
+    chunk = len(workload) // threads
+    chunks = [workload[i * chunk:(i + 1) * chunk] for i in range(threads)]
+
+    def worker(tokens):
+        for token in tokens:
+            verify(token)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(worker, chunks))
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=50000)
+    parser.add_argument('--users', type=int, default=200)
+    args = parser.parse_args()
+
+    tokens = make_tokens(args.users)
+    workload = [random.choice(tokens) for _ in range(args.requests)]
+    cache = TokenCache(max_size=10000)
+
+    uncached = run(verify_uncached, workload, args.threads)
+    cached = run(make_verify_cached(cache), workload, args.threads)
+
+    per_uncached = uncached / args.requests * 1e6
+    per_cached = cached / args.requests * 1e6
+    print(f"threads={args.threads} requests={args.requests} users={args.users}")
+    print(f"  jwt.decode every request: {uncached:.3f}s  ({per_uncached:.1f} µs/request)")
+    print(f"  verified-token cache:     {cached:.3f}s  ({per_cached:.1f} µs/request)")
+    print(f"  saved per request:        {per_uncached - per_cached:.1f} µs ({uncached / cached:.1f}x)")
+    print(f"  cache stats:              {cache.stats()}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+# backend/benchmarks/bench_weekly_summary.py
+"""
+Benchmark: weekly summary pipeline in dry-run mode against a seeded database.
+
+Seeds a separate database (never the app's own) with synthetic users and
+tasks, then renders every summary without sending, printing progress
+after each chunk and the final throughput.
+
+Usage (from the backend folder):
+    python benchmarks/bench_weekly_summary.py --users 10000 --tasks-per-user 50
+    python benchmarks/bench_weekly_summary.py --no-seed --workers 8 --chunk-size 1000
+"""
+from datetime import datetime, timedelta
+import argparse
+import os
+import random
+import sys
+
+from pymongo import MongoClient
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import Config
+from services.weekly_summary import run_weekly_summary
+
+
+def seed(db, users, tasks_per_user, batch=5000):
+    db.users.drop()
+    db.tasks.drop()
+    user_ids = db.users.insert_many([
+        {'name': f'Bench User {i}', 'email': f'bench{i}@example.com', 'createdAt': datetime.utcnow()}
+        for i in range(users)
+    ]).inserted_ids
+
+    now = datetime.utcnow()
+    pending = []
+    for user_id in user_ids:
+        for i in range(tasks_per_user):
+            pending.append({
+                'userId': user_id,
+                'title': f'Task {i}',
+                'dueDate': now + timedelta(days=random.randint(-30, 60)),
+                'priority': random.choice(('low', 'medium', 'high')),
+                'category': random.choice(('work', 'personal', 'shopping')),
+                'status': random.choice(('pending', 'in-progress', 'completed')),
+                'createdAt': now
+            })
+            if len(pending) >= batch:
+                db.tasks.insert_many(pending)
+                pending = []
+    if pending:
+        db.tasks.insert_many(pending)
+    db.tasks.create_index([('userId', 1), ('dueDate', 1)])
+    print(f"Seeded {users} users x {tasks_per_user} tasks")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--db', default=f'{Config.MONGO_DB}_bench')
+    parser.add_argument('--users', type=int, default=10000)
+    parser.add_argument('--tasks-per-user', type=int, default=50)
+    parser.add_argument('--no-seed', action='store_true', help='reuse the existing bench database')
+    parser.add_argument('--chunk-size', type=int, default=Config.WEEKLY_SUMMARY_CHUNK_SIZE)
+    parser.add_argument('--workers', type=int, default=Config.WEEKLY_SUMMARY_WORKERS)
+    args = parser.parse_args()
+
+    if args.db == Config.MONGO_DB:
+        sys.exit('Refusing to seed the application database; pass a different --db')
+
+    client = MongoClient(Config.MONGO_URI)
+    db = client[args.db]
+    if not args.no_seed:
+        seed(db, args.users, args.tasks_per_user)
+
+    def progress(snapshot):
+        print(f"  chunk {snapshot['chunks']}: {snapshot['users']} users, {snapshot['usersPerSecond']} users/s")
+
+    result = run_weekly_summary(db, send=None, chunk_size=args.chunk_size, workers=args.workers,
+                                dry_run=True, progress=progress)
+    print(f"Done: {result}")
+    client.close()
+
+
+if __name__ == '__main__':
+    main()
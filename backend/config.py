@@ -13,24 +13,104 @@ class Config:
     # JWT configuration
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'dev-secret-key-change-in-production')
     JWT_EXPIRATION_HOURS = int(os.getenv('JWT_EXPIRATION_HOURS', 24))
+    TOKEN_CACHE_SIZE = int(os.getenv('TOKEN_CACHE_SIZE', 10000))  # 0 disables the verified-token cache
+    
+    # Password hashing; changing BCRYPT_ROUNDS rehashes each user's password on their next login
+    BCRYPT_ROUNDS = int(os.getenv('BCRYPT_ROUNDS', 12))
+    PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', 2))  # Concurrent bcrypt operations per process
+    PASSWORD_HASH_QUEUE = int(os.getenv('PASSWORD_HASH_QUEUE', 32))  # Waiting operations before logins get a 503
     
     # Application configuration
     DEBUG = os.getenv('DEBUG', 'True').lower() == 'true'
     PORT = int(os.getenv('PORT', 5000))
     
+    # Task list pagination
+    TASKS_PAGE_DEFAULT_LIMIT = int(os.getenv('TASKS_PAGE_DEFAULT_LIMIT', 100))
+    TASKS_PAGE_MAX_LIMIT = int(os.getenv('TASKS_PAGE_MAX_LIMIT', 500))
+    
+    # Task exports: CSV is streamed, PDF/Excel are rendered as background jobs (need reportlab / openpyxl)
+    EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', 1000))  # Tasks per cursor round trip while streaming a CSV
+    REPORT_WORKERS = int(os.getenv('REPORT_WORKERS', 2))  # PDF/Excel render processes per app worker; 0 disables reports
+    REPORT_JOB_TIMEOUT_MINUTES = int(os.getenv('REPORT_JOB_TIMEOUT_MINUTES', 10))  # Unfinished jobs are restarted after this
+    REPORT_CACHE_DAYS = int(os.getenv('REPORT_CACHE_DAYS', 7))  # Reports not downloaded for this long are removed
+    REPORT_EVENTS_SECONDS = int(os.getenv('REPORT_EVENTS_SECONDS', 60))  # Length of one progress event stream
+    
+    # Bulk task writes
+    BULK_MAX_OPERATIONS = int(os.getenv('BULK_MAX_OPERATIONS', 1000))
+    
+    # Attachments: files above one request body go through resumable chunked uploads
+    ATTACHMENT_MAX_SIZE = int(os.getenv('ATTACHMENT_MAX_SIZE', 200 * 1024 * 1024))  # Per-upload limit in bytes
+    UPLOAD_CHUNK_SIZE = int(os.getenv('UPLOAD_CHUNK_SIZE', 5 * 1024 * 1024))  # Must stay below the 16MB request cap
+    UPLOAD_SESSION_HOURS = int(os.getenv('UPLOAD_SESSION_HOURS', 24))  # Idle sessions are cleaned up after this
+    
+    # Resized images (needs Pillow): square avatar sizes and attachment thumbnail bounds, in px
+    IMAGE_VARIANT_WORKERS = int(os.getenv('IMAGE_VARIANT_WORKERS', 2))  # Processes per app worker; 0 disables
+    AVATAR_SIZES = [int(size) for size in os.getenv('AVATAR_SIZES', '32,64,256').split(',')]
+    THUMBNAIL_SIZES = [int(size) for size in os.getenv('THUMBNAIL_SIZES', '64,256').split(',')]
+    
+    # How /uploads and /profile_photos bytes are sent: 'flask', 'x-accel' (nginx) or 'x-sendfile'
+    FILE_SERVING_MODE = os.getenv('FILE_SERVING_MODE', 'flask').lower()
+    X_ACCEL_PREFIX = os.getenv('X_ACCEL_PREFIX', '/protected-files')  # nginx internal location mapped to X_ACCEL_ROOT
+    X_ACCEL_ROOT = os.getenv('X_ACCEL_ROOT', '.')  # Directory the upload folders are relative to
+    
+    # Delta sync for offline clients
+    SYNC_SETTLE_SECONDS = int(os.getenv('SYNC_SETTLE_SECONDS', 2))  # Only hand out changes older than this
+    SYNC_MAX_CHANGES = int(os.getenv('SYNC_MAX_CHANGES', 1000))  # Beyond this the client does a full reload
+    TOMBSTONE_RETENTION_DAYS = int(os.getenv('TOMBSTONE_RETENTION_DAYS', 30))
+    
+    # Idempotency-Key replay window for mutating endpoints
+    IDEMPOTENCY_TTL_HOURS = int(os.getenv('IDEMPOTENCY_TTL_HOURS', 24))
+    IDEMPOTENCY_LEASE_SECONDS = int(os.getenv('IDEMPOTENCY_LEASE_SECONDS', 60))  # About 2x the request timeout; a retry may take over after this
+    
+    # Response compression
+    COMPRESSION_ENABLED = os.getenv('COMPRESSION_ENABLED', 'True').lower() == 'true'
+    COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', 1024))  # Bytes; smaller bodies are sent as-is
+    COMPRESSION_GZIP_LEVEL = int(os.getenv('COMPRESSION_GZIP_LEVEL', 6))
+    COMPRESSION_BROTLI_QUALITY = int(os.getenv('COMPRESSION_BROTLI_QUALITY', 4))  # Used only if brotli is installed
+    
+    # Comment and activity feed pagination
+    FEED_PAGE_DEFAULT_LIMIT = int(os.getenv('FEED_PAGE_DEFAULT_LIMIT', 50))
+    FEED_PAGE_MAX_LIMIT = int(os.getenv('FEED_PAGE_MAX_LIMIT', 200))
+    RECENT_COMMENTS_LIMIT = 5  # Comments kept on the task document for list views
+    
+    # Keep per-user task counters up to date on every write so stats reads are O(1)
+    TASK_STATS_COUNTERS = os.getenv('TASK_STATS_COUNTERS', 'False').lower() == 'true'
+    
+    # Also match legacy string entries in sharedWith until
+    # migrations/sharedwith_objectids.py has been run
+    SHARED_WITH_LEGACY_STRINGS = os.getenv('SHARED_WITH_LEGACY_STRINGS', 'True').lower() == 'true'
+    
     # CORS configuration
     CORS_ORIGINS = os.getenv('CORS_ORIGINS', 'http://localhost:5500,http://127.0.0.1:5500').split(',')
     
     # ==================== NEW FEATURE 1: EMAIL CONFIGURATION ====================
-    MAIL_SERVER = 'smtp.gmail.com'
-    MAIL_PORT = 587
-    MAIL_USE_TLS = True
+    MAIL_SERVER = os.getenv('MAIL_SERVER', 'smtp.gmail.com')
+    MAIL_PORT = int(os.getenv('MAIL_PORT', 587))
+    MAIL_USE_TLS = os.getenv('MAIL_USE_TLS', 'True').lower() == 'true'
     MAIL_USERNAME = os.getenv('MAIL_USERNAME', 'your-email@gmail.com')
     MAIL_PASSWORD = os.getenv('MAIL_PASSWORD', 'your-app-password')
     MAIL_DEFAULT_SENDER = os.getenv('MAIL_DEFAULT_SENDER', 'noreply@taskmaster.com')
     
     # Notification Settings
     REMINDER_HOURS_BEFORE = 24  # Send reminder 24 hours before due
+    REMINDER_BATCH_SIZE = int(os.getenv('REMINDER_BATCH_SIZE', 100))  # User groups fetched per cursor batch
+    
+    # Background jobs: one process at a time holds the scheduler lease and runs them
+    SCHEDULER_ENABLED = os.getenv('SCHEDULER_ENABLED', 'True').lower() == 'true'
+    SCHEDULER_LEASE_SECONDS = int(os.getenv('SCHEDULER_LEASE_SECONDS', 60))
+    
+    # Weekly summary pipeline ($topN on MongoDB 5.2+, detected at run time; $sort + $push before that)
+    WEEKLY_SUMMARY_CHUNK_SIZE = int(os.getenv('WEEKLY_SUMMARY_CHUNK_SIZE', 500))  # Users per chunk
+    WEEKLY_SUMMARY_WORKERS = int(os.getenv('WEEKLY_SUMMARY_WORKERS', 4))
+    WEEKLY_SUMMARY_DRY_RUN = os.getenv('WEEKLY_SUMMARY_DRY_RUN', 'False').lower() == 'true'
+    
+    # Email outbox delivery
+    OUTBOX_WORKERS = int(os.getenv('OUTBOX_WORKERS', 2))  # 0 disables delivery in this process
+    OUTBOX_BATCH_SIZE = int(os.getenv('OUTBOX_BATCH_SIZE', 20))  # Messages sent per pooled connection checkout
+    OUTBOX_MAX_ATTEMPTS = int(os.getenv('OUTBOX_MAX_ATTEMPTS', 5))
+    OUTBOX_BACKOFF_SECONDS = int(os.getenv('OUTBOX_BACKOFF_SECONDS', 30))  # Doubles after each failed attempt
+    SMTP_POOL_SIZE = int(os.getenv('SMTP_POOL_SIZE', 2))
+    MAIL_RATE_LIMIT_PER_SECOND = float(os.getenv('MAIL_RATE_LIMIT_PER_SECOND', 5))  # Per SMTP provider, across all workers
     
     # ==================== NEW FEATURE 2: FILE UPLOAD CONFIGURATION ====================
     UPLOAD_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'uploads')
@@ -0,0 +1,103 @@
+# backend/migrations/attachments_to_blob_store.py
+"""
+Move attachments from the flat uploads folder into the blob store.
+
+Each legacy file is hashed and copied (unless identical content is
+already stored) into uploads/blobs/ab/cd/<sha256>; its attachment entry
+is then rewritten to the content-addressed name and the legacy file is
+removed. A task is only rewritten if its attachments are unchanged
+since they were read; one that changed in the meantime keeps its legacy
+files and is picked up again on the next pass.
+Attachments whose file is missing on disk are left as they are.
+
+Run from the directory the app runs from, so the relative upload
+folder resolves the same way.
+
+Usage (from the backend folder):
+    python migrations/attachments_to_blob_store.py [--uploads uploads] [--pause 0.05]
+"""
+import argparse
+import os
+import sys
+import time
+
+from pymongo import MongoClient
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import Config
+from services.blob_store import BlobStore, file_sha256
+
+
+def convert_task(db, store, uploads, task):
+    """Rewrite one task's legacy attachments; returns how many files were moved"""
+    moved = []
+    attachments = []
+    for att in task['attachments']:
+        path = os.path.join(uploads, att.get('saved_as') or '')
+        if att.get('sha256') or not att.get('saved_as') or not os.path.isfile(path):
+            attachments.append(att)
+            continue
+
+        sha256 = file_sha256(path)
+        ext = os.path.splitext(att['saved_as'])[1].lower()
+        saved_as = f'{sha256}{ext}'
+        attachments.append({**att, 'sha256': sha256, 'saved_as': saved_as, 'url': f'/uploads/{saved_as}'})
+        moved.append((path, sha256))
+
+    if not moved:
+        return 0
+
+    # Store copies first, so the task never points at a blob that doesn't exist yet
+    for path, sha256 in moved:
+        with open(path, 'rb') as f:
+            store.put_stream(f)
+
+    result = db.tasks.update_one(
+        {'_id': task['_id'], 'attachments': task['attachments']},
+        {'$set': {'attachments': attachments}}
+    )
+    if not result.modified_count:
+        # The task changed meanwhile; give the references back and retry it next pass
+        for _, sha256 in moved:
+            store.release(sha256)
+        return 0
+    for path, _ in moved:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+    return len(moved)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--uploads', default='uploads', help='upload folder the app serves /uploads from')
+    parser.add_argument('--batch-size', type=int, default=200)
+    parser.add_argument('--pause', type=float, default=0.05, help='seconds to sleep between batches')
+    args = parser.parse_args()
+
+    client = MongoClient(Config.MONGO_URI)
+    db = client[Config.MONGO_DB]
+    store = BlobStore(db['attachment_blobs'], os.path.join(args.uploads, 'blobs'))
+
+    query = {'attachments': {'$elemMatch': {'sha256': {'$exists': False}}}}
+    total = 0
+    while True:
+        moved = 0
+        for index, task in enumerate(db.tasks.find(query, {'attachments': 1}).batch_size(args.batch_size), 1):
+            moved += convert_task(db, store, args.uploads, task)
+            if index % args.batch_size == 0:
+                print(f"  ...{total + moved} files moved")
+                time.sleep(args.pause)
+        total += moved
+        if moved == 0:
+            break
+
+    remaining = db.tasks.count_documents(query)
+    print(f"✓ Moved {total} attachments into the blob store ({remaining} tasks still reference missing files)")
+    client.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+# backend/migrations/sharedwith_objectids.py
+"""
+Convert string user IDs in tasks.sharedWith to ObjectIds.
+
+Runs online: tasks are rewritten in small batches with a pause between
+them, and each update only applies if sharedWith is unchanged since it
+was read, so a concurrent share is never lost (the task is simply picked
+up again on the next pass).
+
+Once this reports nothing left to convert, set
+SHARED_WITH_LEGACY_STRINGS=false so queries match ObjectIds only.
+
+Usage (from the backend folder):
+    python migrations/sharedwith_objectids.py [--batch-size 500] [--pause 0.1]
+"""
+import argparse
+import os
+import sys
+import time
+
+from bson import ObjectId
+from pymongo import MongoClient, UpdateOne
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import Config
+
+
+def convert_members(members):
+    """Return sharedWith with valid string IDs as ObjectIds, de-duplicated in order"""
+    converted = []
+    for member in members:
+        if isinstance(member, str) and ObjectId.is_valid(member):
+            member = ObjectId(member)
+        if member not in converted:
+            converted.append(member)
+    return converted
+
+
+def run_pass(db, batch_size, pause):
+    """One sweep over tasks that still hold string entries; returns tasks updated"""
+    updated = 0
+    batch = []
+    query = {'sharedWith': {'$type': 'string'}}
+
+    for task in db.tasks.find(query, {'sharedWith': 1}).batch_size(batch_size):
+        batch.append(UpdateOne(
+            {'_id': task['_id'], 'sharedWith': task['sharedWith']},
+            {'$set': {'sharedWith': convert_members(task['sharedWith'])}}
+        ))
+        if len(batch) >= batch_size:
+            updated += db.tasks.bulk_write(batch, ordered=False).modified_count
+            batch = []
+            print(f"  ...{updated} tasks converted")
+            time.sleep(pause)
+
+    if batch:
+        updated += db.tasks.bulk_write(batch, ordered=False).modified_count
+    return updated
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--batch-size', type=int, default=500)
+    parser.add_argument('--pause', type=float, default=0.1, help='seconds to sleep between batches')
+    args = parser.parse_args()
+
+    client = MongoClient(Config.MONGO_URI)
+    db = client[Config.MONGO_DB]
+
+    db.tasks.create_index([('sharedWith', 1), ('dueDate', 1), ('_id', 1)])
+
+    total = 0
+    while True:
+        updated = run_pass(db, args.batch_size, args.pause)
+        total += updated
+        remaining = db.tasks.count_documents({'sharedWith': {'$type': 'string'}})
+        if updated == 0 or remaining == 0:
+            break
+
+    print(f"✓ Converted sharedWith on {total} tasks ({remaining} still hold unconvertible strings)")
+    client.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+# backend/migrations/split_comments_activity.py
+"""
+Move embedded task comments and activity into their own collections.
+
+Older tasks carry unbounded `comments` and `activity` arrays. This copies
+each entry into the `comments` / `activity` collections (keyed by taskId),
+adds them to the task's `commentCount`, rebuilds the short
+`recentComments` preview from the collection and removes the embedded
+arrays. Comments added through the new code while this runs are kept.
+
+Safe to re-run: entries copied by a previous, interrupted run are tagged
+`migrated: True` and replaced rather than duplicated.
+
+Usage (from the backend folder):
+    python migrations/split_comments_activity.py
+"""
+from datetime import datetime
+import os
+import sys
+
+from pymongo import MongoClient
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import Config
+
+BATCH_SIZE = 500
+
+
+def parse_timestamp(value):
+    """Embedded entries stored ISO strings; the collections store datetimes"""
+    if isinstance(value, datetime):
+        return value
+    try:
+        return datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    except ValueError:
+        return datetime.utcnow()
+
+
+def migrate_task(db, task):
+    """Copy one task's embedded arrays out and strip them from the task"""
+    task_id = task['_id']
+    comments = task.get('comments') or []
+    activity = task.get('activity') or []
+
+    db.comments.delete_many({'taskId': task_id, 'migrated': True})
+    db.activity.delete_many({'taskId': task_id, 'migrated': True})
+
+    if comments:
+        db.comments.insert_many([
+            {**entry, 'taskId': task_id, 'timestamp': parse_timestamp(entry.get('timestamp')), 'migrated': True}
+            for entry in comments
+        ])
+    if activity:
+        db.activity.insert_many([
+            {**entry, 'taskId': task_id, 'timestamp': parse_timestamp(entry.get('timestamp')), 'migrated': True}
+            for entry in activity
+        ])
+
+    # $inc rather than $set: comments added through the new code since the
+    # deploy are already counted, and stripping the arrays only happens once
+    db.tasks.update_one(
+        {'_id': task_id, '$or': [{'comments': {'$exists': True}}, {'activity': {'$exists': True}}]},
+        {
+            '$inc': {'commentCount': len(comments)},
+            '$unset': {'comments': '', 'activity': ''}
+        }
+    )
+    refresh_recent_comments(db, task_id)
+    return len(comments), len(activity)
+
+
+def refresh_recent_comments(db, task_id):
+    """Rebuild the preview from the comments collection, retrying if a comment lands meanwhile"""
+    while True:
+        task = db.tasks.find_one({'_id': task_id}, {'commentCount': 1})
+        if task is None:
+            return
+        latest = list(
+            db.comments.find({'taskId': task_id})
+            .sort([('timestamp', -1), ('_id', -1)])
+            .limit(Config.RECENT_COMMENTS_LIMIT)
+        )
+        preview = [
+            {
+                'userId': entry.get('userId'),
+                'userName': entry.get('userName'),
+                'text': entry.get('text'),
+                'timestamp': entry['timestamp'].isoformat()
+            }
+            for entry in reversed(latest)
+        ]
+        # Each new comment bumps commentCount, so a changed count means the preview is stale
+        result = db.tasks.update_one(
+            {'_id': task_id, 'commentCount': task.get('commentCount')},
+            {'$set': {'recentComments': preview}}
+        )
+        if result.matched_count:
+            return
+
+
+def main():
+    client = MongoClient(Config.MONGO_URI)
+    db = client[Config.MONGO_DB]
+
+    db.comments.create_index([('taskId', 1), ('timestamp', 1), ('_id', 1)])
+    db.activity.create_index([('taskId', 1), ('timestamp', 1), ('_id', 1)])
+
+    query = {'$or': [{'comments': {'$exists': True}}, {'activity': {'$exists': True}}]}
+    projection = {'comments': 1, 'activity': 1}
+
+    tasks_done = comments_moved = activity_moved = 0
+    for task in db.tasks.find(query, projection).batch_size(BATCH_SIZE):
+        moved_comments, moved_activity = migrate_task(db, task)
+        tasks_done += 1
+        comments_moved += moved_comments
+        activity_moved += moved_activity
+        if tasks_done % BATCH_SIZE == 0:
+            print(f"  ...{tasks_done} tasks migrated")
+
+    print(f"✓ Migrated {tasks_done} tasks: {comments_moved} comments, {activity_moved} activity entries")
+    client.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+# backend/services/blob_store.py
+"""
+Content-addressed file store for attachments.
+
+Files are stored once per distinct content under their SHA-256, in two
+levels of hash-prefix directories (ab/cd/abcd...) so no directory grows
+past a few hundred entries. A document per blob in MongoDB counts the
+attachments pointing at it; the file is removed when the last one goes.
+
+Removal marks the record `deleting` before unlinking. A reference taken
+meanwhile waits for the unlink to finish and then puts its own copy of
+the file back, so a live attachment never ends up without its blob.
+"""
+from datetime import datetime
+import hashlib
+import os
+import re
+import tempfile
+import time
+
+from pymongo import ReturnDocument
+
+COPY_BUFFER = 64 * 1024
+DELETE_WAIT_SECONDS = 5  # How long a new reference waits on an unlink in progress
+
+# <sha256> or <sha256>.<ext>, the names blobs are served under
+BLOB_NAME = re.compile(r'^([0-9a-f]{64})(\.[A-Za-z0-9]+)?$')
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(COPY_BUFFER), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def parse_blob_name(name):
+    """The SHA-256 in a served blob name, or None for any other (legacy) filename"""
+    match = BLOB_NAME.match(name or '')
+    return match.group(1) if match else None
+
+
+class BlobStore:
+    def __init__(self, collection, root):
+        self.collection = collection
+        self.root = root
+        self._tmp = os.path.join(root, '.tmp')
+        os.makedirs(self._tmp, exist_ok=True)
+
+    def path_for(self, sha256):
+        return os.path.join(self.root, sha256[:2], sha256[2:4], sha256)
+
+    def exists(self, sha256):
+        return os.path.exists(self.path_for(sha256))
+
+    # ---------- adding ----------
+
+    def put_file(self, src_path, sha256=None):
+        """Move a file into the store and take one reference; returns (sha256, size).
+
+        src_path must be on the same filesystem as the store. If the
+        content is already stored, src_path is simply removed.
+        """
+        sha256 = sha256 or file_sha256(src_path)
+        size = os.path.getsize(src_path)
+
+        # Reference first, so a release that starts after this can't delete under us
+        record = self.collection.find_one_and_update(
+            {'_id': sha256},
+            {'$inc': {'refs': 1}, '$setOnInsert': {'size': size, 'createdAt': datetime.utcnow()}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        # A release that started before is unlinking the file; let it finish, then put ours in place
+        deadline = time.monotonic() + DELETE_WAIT_SECONDS
+        while record and record.get('deleting') and time.monotonic() < deadline:
+            time.sleep(0.01)
+            record = self.collection.find_one({'_id': sha256}, {'deleting': 1})
+
+        dest = self.path_for(sha256)
+        if os.path.exists(dest):
+            os.remove(src_path)
+        else:
+            os.makedirs(os.path.dirname(dest), exist_ok=True)
+            os.replace(src_path, dest)
+        return sha256, size
+
+    def put_stream(self, stream):
+        """Store everything read from a file-like object; returns (sha256, size)"""
+        digest = hashlib.sha256()
+        fd, tmp_path = tempfile.mkstemp(dir=self._tmp)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                for block in iter(lambda: stream.read(COPY_BUFFER), b''):
+                    digest.update(block)
+                    f.write(block)
+            return self.put_file(tmp_path, digest.hexdigest())
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    # ---------- removing ----------
+
+    def release(self, sha256, count=1):
+        """Drop references; deletes the file once nothing points at it. True if it is gone for good"""
+        self.collection.update_one({'_id': sha256}, {'$inc': {'refs': -count}})
+        claimed = self.collection.find_one_and_update(
+            {'_id': sha256, 'refs': {'$lte': 0}, 'deleting': {'$ne': True}},
+            {'$set': {'deleting': True}}
+        )
+        if not claimed:
+            return False
+        try:
+            os.remove(self.path_for(sha256))
+        except FileNotFoundError:
+            pass
+        if self.collection.delete_one({'_id': sha256, 'refs': {'$lte': 0}}).deleted_count:
+            return True
+        # Referenced again while unlinking: the new holder re-materialises the file
+        self.collection.update_one({'_id': sha256}, {'$unset': {'deleting': ''}})
+        return False
@@ -0,0 +1,173 @@
+# backend/services/chunked_upload.py
+"""
+Resumable uploads in numbered chunks.
+
+A client opens a session with the final file size, PUTs chunks in any
+order and then completes the session. Each chunk is streamed straight to
+its offset in one partial file and checksummed while it is written, so
+no chunk is ever held in memory. Sessions list the chunks already
+received; after a dropped connection the client re-sends only what is
+missing instead of starting over.
+"""
+from datetime import datetime, timedelta
+import hashlib
+import math
+import os
+import uuid
+
+COPY_BUFFER = 64 * 1024
+
+
+class UploadError(Exception):
+    """A request that doesn't fit its session (size, checksum, missing chunks)"""
+
+
+class ChunkedUploads:
+    def __init__(self, collection, root, chunk_size=5 * 1024 * 1024,
+                 max_size=200 * 1024 * 1024, session_hours=24):
+        self.collection = collection
+        self.root = root
+        self.chunk_size = chunk_size
+        self.max_size = max_size
+        self.session_hours = session_hours
+        os.makedirs(root, exist_ok=True)
+
+    def create_indexes(self):
+        self.collection.create_index('expiresAt')
+
+    def _path(self, session):
+        return os.path.join(self.root, f"{session['_id']}.part")
+
+    def _expires_at(self):
+        return datetime.utcnow() + timedelta(hours=self.session_hours)
+
+    # ---------- sessions ----------
+
+    def create(self, user_id, task_id, filename, size):
+        """Open a session for a file of `size` bytes, enforcing the per-upload size policy"""
+        # bool is an int subclass, so JSON true would otherwise pass as a 1-byte file
+        if isinstance(size, bool) or not isinstance(size, int) or size <= 0:
+            raise UploadError('size must be a positive number of bytes')
+        if size > self.max_size:
+            raise UploadError(f'File is larger than the {self.max_size // (1024 * 1024)}MB limit')
+
+        session = {
+            '_id': uuid.uuid4().hex,
+            'userId': user_id,
+            'taskId': task_id,
+            'filename': filename,
+            'size': size,
+            'chunkSize': self.chunk_size,
+            'totalChunks': math.ceil(size / self.chunk_size),
+            'chunks': {},
+            'createdAt': datetime.utcnow(),
+            'expiresAt': self._expires_at()
+        }
+        # Reserve the full length up front so chunks can land at any offset
+        with open(self._path(session), 'wb') as f:
+            f.truncate(size)
+        self.collection.insert_one(session)
+        return session
+
+    def get(self, upload_id, user_id):
+        return self.collection.find_one({'_id': upload_id, 'userId': user_id})
+
+    def chunk_length(self, session, index):
+        start = index * session['chunkSize']
+        return min(session['chunkSize'], session['size'] - start)
+
+    def missing_chunks(self, session):
+        return [i for i in range(session['totalChunks']) if str(i) not in session['chunks']]
+
+    def describe(self, session):
+        """Client view of a session, including what still has to be sent"""
+        return {
+            'uploadId': session['_id'],
+            'filename': session['filename'],
+            'size': session['size'],
+            'chunkSize': session['chunkSize'],
+            'totalChunks': session['totalChunks'],
+            'received': sorted(int(i) for i in session['chunks']),
+            'missing': self.missing_chunks(session),
+            'expiresAt': session['expiresAt'].isoformat()
+        }
+
+    # ---------- chunks ----------
+
+    def write_chunk(self, session, index, stream, expected_sha256=None):
+        """Stream one chunk from `stream` to its offset; returns its size and SHA-256.
+
+        Re-sending a chunk simply overwrites it, so retries are safe.
+        """
+        if not 0 <= index < session['totalChunks']:
+            raise UploadError('Chunk index out of range')
+        expected = self.chunk_length(session, index)
+
+        digest = hashlib.sha256()
+        written = 0
+        try:
+            with open(self._path(session), 'r+b') as f:
+                f.seek(index * session['chunkSize'])
+                while True:
+                    block = stream.read(COPY_BUFFER)
+                    if not block:
+                        break
+                    written += len(block)
+                    if written > expected:
+                        raise UploadError(f'Chunk {index} must be {expected} bytes')
+                    digest.update(block)
+                    f.write(block)
+
+            if written != expected:
+                raise UploadError(f'Chunk {index} must be {expected} bytes, got {written}')
+            checksum = digest.hexdigest()
+            if expected_sha256 and expected_sha256.lower() != checksum:
+                raise UploadError(f'Checksum mismatch for chunk {index}')
+        except Exception:
+            # A failed re-send may have overwritten good bytes, so the chunk counts as missing again
+            if str(index) in session['chunks']:
+                self.collection.update_one({'_id': session['_id']}, {'$unset': {f'chunks.{index}': ''}})
+                del session['chunks'][str(index)]
+            raise
+
+        record = {'size': written, 'sha256': checksum, 'receivedAt': datetime.utcnow()}
+        self.collection.update_one(
+            {'_id': session['_id']},
+            {'$set': {f'chunks.{index}': record, 'expiresAt': self._expires_at()}}
+        )
+        session['chunks'][str(index)] = record
+        return record
+
+    # ---------- completion ----------
+
+    def finish(self, session, expected_sha256=None):
+        """Check that every chunk arrived and return (partial file path, SHA-256 of the whole file)"""
+        missing = self.missing_chunks(session)
+        if missing:
+            raise UploadError(f'{len(missing)} chunks have not been received yet')
+
+        path = self._path(session)
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(COPY_BUFFER), b''):
+                digest.update(block)
+        checksum = digest.hexdigest()
+        if expected_sha256 and expected_sha256.lower() != checksum:
+            raise UploadError('Checksum mismatch for the assembled file')
+        return path, checksum
+
+    def discard(self, session):
+        """Drop a session and whatever is left of its partial file"""
+        try:
+            os.remove(self._path(session))
+        except FileNotFoundError:
+            pass
+        self.collection.delete_one({'_id': session['_id']})
+
+    def cleanup_expired(self, now=None):
+        """Remove sessions (and partial files) that have not been touched for session_hours"""
+        removed = 0
+        for session in self.collection.find({'expiresAt': {'$lt': now or datetime.utcnow()}}, {'_id': 1}):
+            self.discard(session)
+            removed += 1
+        return removed
@@ -0,0 +1,211 @@
+# backend/services/compression.py
+"""
+Response compression for the Flask app.
+
+Negotiates brotli (when the `brotli` package is installed) or gzip from
+Accept-Encoding and compresses text-like responses above a size
+threshold. Streamed responses are compressed chunk by chunk as they are
+produced, whatever their size, so nothing is buffered and the first
+byte goes out right away. File downloads and already-compressed media
+are passed through untouched.
+"""
+import threading
+import time
+import zlib
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = {
+    'application/json',
+    'application/javascript',
+    'text/html',
+    'text/css',
+    'text/plain',
+    'text/csv',
+    'text/event-stream',
+    'image/svg+xml'
+}
+
+# Suffix appended to a response's ETag for each content coding
+ETAG_SUFFIXES = {'gzip': 'gz', 'br': 'br'}
+
+
+def encoded_etag(etag, encoding):
+    """ETag of the `encoding`-compressed representation of a response tagged `etag`"""
+    return f'{etag}-{ETAG_SUFFIXES[encoding]}'
+
+
+class _GzipStream:
+    def __init__(self, level):
+        self._obj = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data):
+        # Sync-flush so each streamed chunk reaches the client as soon as it is produced
+        return self._obj.compress(data) + self._obj.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._obj.flush(zlib.Z_FINISH)
+
+
+class _BrotliStream:
+    def __init__(self, quality):
+        self._obj = brotli.Compressor(quality=quality)
+
+    def compress(self, data):
+        return self._obj.process(data) + self._obj.flush()
+
+    def finish(self):
+        return self._obj.finish()
+
+
+class Compressor:
+    """after_request hook that compresses eligible responses and keeps counters"""
+
+    def __init__(self, app=None, min_size=1024, gzip_level=6, brotli_quality=4,
+                 excluded_prefixes=('/uploads/', '/profile_photos/')):
+        self.min_size = min_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.excluded_prefixes = tuple(excluded_prefixes)
+        self.encodings = ['br', 'gzip'] if brotli else ['gzip']
+
+        self._lock = threading.Lock()
+        self.counters = {'compressed': 0, 'skipped': 0, 'bytesIn': 0, 'bytesOut': 0, 'cpuSeconds': 0.0}
+        self.by_encoding = {encoding: 0 for encoding in self.encodings}
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.after_request(self.after_request)
+
+    def _new_stream(self, encoding):
+        if encoding == 'br':
+            return _BrotliStream(self.brotli_quality)
+        return _GzipStream(self.gzip_level)
+
+    def _record(self, encoding, bytes_in, bytes_out, cpu_seconds):
+        with self._lock:
+            self.counters['bytesIn'] += bytes_in
+            self.counters['bytesOut'] += bytes_out
+            self.counters['cpuSeconds'] += cpu_seconds
+            if encoding:
+                self.counters['compressed'] += 1
+                self.by_encoding[encoding] += 1
+
+    def _skip(self):
+        with self._lock:
+            self.counters['skipped'] += 1
+
+    # ---------- eligibility ----------
+
+    def _is_compressible(self, response):
+        if response.status_code < 200 or response.status_code in (204, 206, 304):
+            return False
+        if response.direct_passthrough or 'Content-Encoding' in response.headers:
+            return False
+        if request.method == 'HEAD' or request.path.startswith(self.excluded_prefixes):
+            return False
+        return response.mimetype in COMPRESSIBLE_MIMETYPES
+
+    def after_request(self, response):
+        if not self._is_compressible(response):
+            return response
+
+        # The body depends on Accept-Encoding whether or not we end up compressing
+        response.vary.add('Accept-Encoding')
+        encoding = request.accept_encodings.best_match(self.encodings)
+        if not encoding:
+            self._skip()
+            return response
+
+        if response.is_streamed:
+            return self._compress_streamed(response, encoding)
+        return self._compress_buffered(response, encoding)
+
+    # ---------- buffered bodies ----------
+
+    def _compress_buffered(self, response, encoding):
+        data = response.get_data()
+        if len(data) < self.min_size:
+            self._skip()
+            return response
+
+        start = time.thread_time()
+        stream = self._new_stream(encoding)
+        compressed = stream.compress(data) + stream.finish()
+        self._record(encoding, len(data), len(compressed), time.thread_time() - start)
+
+        response.set_data(compressed)
+        self._mark_encoded(response, encoding)
+        return response
+
+    # ---------- streamed bodies ----------
+
+    def _compress_streamed(self, response, encoding):
+        """Compress a streamed body as it is produced.
+
+        The decision rests on Content-Type alone: measuring the body
+        against min_size would mean pulling chunks here, before the
+        response starts, and hold back the first byte of CSV exports,
+        streamed lists and event streams.
+        """
+        response.response = self._compressing_iter(response.response, encoding)
+        response.headers.pop('Content-Length', None)
+        self._mark_encoded(response, encoding)
+        return response
+
+    def _compressing_iter(self, source, encoding):
+        stream = self._new_stream(encoding)
+        bytes_in = bytes_out = 0
+        cpu = 0.0
+
+        def compress(chunk):
+            nonlocal bytes_in, bytes_out, cpu
+            start = time.thread_time()
+            out = stream.compress(chunk)
+            cpu += time.thread_time() - start
+            bytes_in += len(chunk)
+            bytes_out += len(out)
+            return out
+
+        try:
+            for chunk in source:
+                if isinstance(chunk, str):
+                    chunk = chunk.encode('utf-8')
+                out = compress(chunk)
+                if out:
+                    yield out
+            start = time.thread_time()
+            tail = stream.finish()
+            cpu += time.thread_time() - start
+            bytes_out += len(tail)
+            yield tail
+        finally:
+            self._record(encoding, bytes_in, bytes_out, cpu)
+            # The original iterable is no longer the response body, so close it here
+            if hasattr(source, 'close'):
+                source.close()
+
+    @staticmethod
+    def _mark_encoded(response, encoding):
+        response.headers['Content-Encoding'] = encoding
+        # The compressed bytes are a representation of their own, with their own strong ETag
+        etag, weak = response.get_etag()
+        if etag:
+            response.set_etag(encoded_etag(etag, encoding), weak=weak)
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self.counters)
+            by_encoding = dict(self.by_encoding)
+        counters['cpuSeconds'] = round(counters['cpuSeconds'], 4)
+        counters['ratio'] = round(counters['bytesOut'] / counters['bytesIn'], 4) if counters['bytesIn'] else None
+        counters['byEncoding'] = by_encoding
+        counters['minSize'] = self.min_size
+        return counters
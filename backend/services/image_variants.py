@@ -0,0 +1,137 @@
+# backend/services/image_variants.py
+"""
+Resized WebP/JPEG variants of uploaded images, rendered off the request path.
+
+Rendering runs in a process pool (resizing is CPU-bound and would hold
+the GIL in a thread), and the request that uploaded the image returns as
+soon as the job is queued. Variant names are derived from the source
+content hash, so they are immutable and a re-upload of the same image
+reuses them. Pillow is optional; without it no variants are produced and
+the originals are served as before.
+"""
+from concurrent.futures import ProcessPoolExecutor
+import io
+import os
+import threading
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+
+FORMATS = {'webp': 'WEBP', 'jpeg': 'JPEG'}
+QUALITY = 80
+
+
+def _prepare(image):
+    """Apply EXIF rotation and flatten transparency so every format can be saved"""
+    image = ImageOps.exif_transpose(image)
+    if image.mode in ('RGBA', 'LA', 'P'):
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel('A'))
+        return background
+    return image.convert('RGB')
+
+
+def render_variants(src_path, out_dir, prefix, sizes, square=False):
+    """Write <prefix>_<size>.<format> for every size and format; returns {size: {format: filename}}.
+
+    Runs in a worker process. With square=True the image is centre-cropped
+    (avatars); otherwise it is scaled to fit inside size x size
+    (thumbnails). Files that already exist are not rendered again.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    variants = {}
+    with Image.open(src_path) as original:
+        original.seek(0)  # First frame of animated GIFs
+        image = _prepare(original)
+        for size in sizes:
+            if square:
+                resized = ImageOps.fit(image, (size, size), Image.LANCZOS)
+            else:
+                resized = image.copy()
+                resized.thumbnail((size, size), Image.LANCZOS)
+            variants[str(size)] = {}
+            for ext, pil_format in FORMATS.items():
+                filename = f'{prefix}_{size}.{ext}'
+                path = os.path.join(out_dir, filename)
+                if not os.path.exists(path):
+                    buffer = io.BytesIO()
+                    resized.save(buffer, pil_format, quality=QUALITY)
+                    tmp_path = f'{path}.{os.getpid()}.tmp'
+                    with open(tmp_path, 'wb') as f:
+                        f.write(buffer.getvalue())
+                    os.replace(tmp_path, path)
+                variants[str(size)][ext] = filename
+    return variants
+
+
+def variant_filenames(prefix, sizes):
+    """Every filename render_variants writes for prefix and sizes"""
+    return [f'{prefix}_{size}.{ext}' for size in sizes for ext in FORMATS]
+
+
+def remove_variants(out_dir, prefix, sizes):
+    """Delete the variants rendered under prefix.
+
+    Only the exact names the renderer produces are removed: a legacy
+    prefix like profile_<uid> is also the start of newer files such as
+    profile_<uid>_<hash>.jpg, which must survive.
+    """
+    for filename in variant_filenames(prefix, sizes):
+        try:
+            os.remove(os.path.join(out_dir, filename))
+        except FileNotFoundError:
+            pass
+
+
+class ImageVariantPool:
+    """Process pool that renders variants and hands the result to a callback in this process"""
+
+    def __init__(self, workers=2):
+        self.workers = workers
+        self.enabled = Image is not None and workers > 0
+        self._pool = None
+        self._lock = threading.Lock()
+        self.counters = {'queued': 0, 'rendered': 0, 'failed': 0}
+
+    def _executor(self):
+        # Created on first use so each gunicorn worker forks its own pool after startup
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            return self._pool
+
+    def _count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def submit(self, src_path, out_dir, prefix, sizes, on_done, square=False):
+        """Queue a render; on_done(variants) runs in a pool thread when it finishes. False if disabled"""
+        if not self.enabled:
+            return False
+        future = self._executor().submit(render_variants, src_path, out_dir, prefix, tuple(sizes), square)
+        self._count('queued')
+
+        def finished(future):
+            try:
+                variants = future.result()
+                on_done(variants)
+                self._count('rendered')
+            except Exception as e:
+                self._count('failed')
+                print(f"✗ Image variants for {prefix} failed: {e}")
+
+        future.add_done_callback(finished)
+        return True
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self.counters)
+        counters.update({'enabled': self.enabled, 'workers': self.workers})
+        return counters
@@ -0,0 +1,64 @@
+# backend/services/json_stream.py
+from datetime import date, datetime
+from itertools import islice
+import json
+
+from bson import ObjectId
+
+
+# Exact-type lookup first: it is called for every ObjectId and datetime in a response
+_CONVERTERS = {ObjectId: str, datetime: datetime.isoformat, date: date.isoformat}
+
+
+def bson_default(value):
+    """json `default` hook for the BSON types our documents contain"""
+    convert = _CONVERTERS.get(type(value))
+    if convert is not None:
+        return convert(value)
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+# The C encoder walks dicts and lists itself and only calls back into
+# Python for ObjectId/datetime, at any nesting depth.
+_encoder = json.JSONEncoder(default=bson_default, separators=(',', ':'), ensure_ascii=False)
+
+
+def dumps(value):
+    """Serialize a MongoDB document (or anything containing them) to a JSON string"""
+    return _encoder.encode(value)
+
+
+def stream_json(envelope, key, items, batch_size=500):
+    """Serialize a JSON object holding a list of documents, as UTF-8 chunks.
+
+    The output is `envelope` with `key` set to the serialized `items`
+    and a trailing `count` of how many were written. Items are encoded
+    `batch_size` at a time in one call into the C encoder, which is what
+    makes this faster than serializing document by document, and each
+    batch becomes one chunk, so `items` may be a list or a lazy cursor.
+
+    The first batch is read and encoded before this returns: a failing
+    query or an unserializable document raises in the caller, which can
+    still answer with an error status, instead of after the 200 headers
+    have been sent. Returns an iterator of chunks.
+    """
+    items = iter(items)
+    first = list(islice(items, batch_size))
+    head = dumps(envelope)[:-1] + (',' if envelope else '') + dumps(key) + ':[' + dumps(first)[1:-1]
+    return _stream_rest(head, len(first), items, batch_size)
+
+
+def _stream_rest(head, count, items, batch_size):
+    yield head.encode('utf-8')
+    while True:
+        batch = list(islice(items, batch_size))
+        if not batch:
+            break
+        # Encode the batch as a list and drop its brackets to splice it into the open array
+        yield ((',' if count else '') + dumps(batch)[1:-1]).encode('utf-8')
+        count += len(batch)
+    yield f'],"count":{count}}}'.encode('utf-8')
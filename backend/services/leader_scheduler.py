@@ -0,0 +1,191 @@
+# backend/services/leader_scheduler.py
+"""
+Background scheduler that runs each job exactly once across processes.
+
+Every gunicorn worker creates a LeaderScheduler, but only the holder of a
+lease document in MongoDB runs jobs; the others keep their scheduler
+paused and take over if the leader stops renewing. Each run is recorded
+in a run-history collection under a per-period key (e.g. the date for a
+daily job), which both fences off a stalled former leader and lets a new
+leader detect and catch up on runs missed while nothing was running.
+"""
+from datetime import datetime, timedelta
+import os
+import socket
+import threading
+import uuid
+
+from apscheduler.schedulers.background import BackgroundScheduler
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+# How a job's runs are bucketed; one successful run per bucket
+PERIOD_FORMATS = {
+    'daily': '%Y-%m-%d',
+    'weekly': '%G-W%V'
+}
+
+
+def period_start(period, now):
+    """Start of the daily/weekly bucket containing now"""
+    start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    if period == 'weekly':
+        start -= timedelta(days=start.weekday())
+    return start
+
+
+class LeaderScheduler:
+    def __init__(self, db, lease_name='scheduler', lease_seconds=60, renew_seconds=20):
+        self.leases = db['scheduler_leases']
+        self.runs = db['job_runs']
+        self.lease_name = lease_name
+        self.lease_seconds = lease_seconds
+        self.renew_seconds = renew_seconds
+        self.instance_id = f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}'
+        self.is_leader = False
+
+        self.scheduler = BackgroundScheduler()
+        self._jobs = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def create_indexes(self):
+        self.runs.create_index([('jobId', 1), ('startedAt', -1)])
+
+    def add_cron_job(self, job_id, func, period, **cron):
+        """Schedule func on a cron trigger; period ('daily'/'weekly') defines one run per bucket"""
+        job = self.scheduler.add_job(
+            self._run_job,
+            trigger='cron',
+            args=[job_id],
+            id=job_id,
+            replace_existing=True,
+            coalesce=True,
+            max_instances=1,
+            **cron
+        )
+        self._jobs[job_id] = {'func': func, 'period': period, 'trigger': job.trigger}
+
+    # ---------- leadership ----------
+
+    def start(self):
+        """Start paused; the lease thread resumes the scheduler while this process leads"""
+        self.scheduler.start(paused=True)
+        self._thread = threading.Thread(target=self._lease_loop, name='scheduler-lease', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self.is_leader:
+            self.leases.delete_one({'_id': self.lease_name, 'owner': self.instance_id})
+        self.scheduler.shutdown(wait=False)
+
+    def _try_acquire(self):
+        """Take or renew the lease; True if this process holds it afterwards"""
+        now = datetime.utcnow()
+        try:
+            lease = self.leases.find_one_and_update(
+                {'_id': self.lease_name,
+                 '$or': [{'owner': self.instance_id}, {'expiresAt': {'$lt': now}}]},
+                {'$set': {'owner': self.instance_id,
+                          'expiresAt': now + timedelta(seconds=self.lease_seconds),
+                          'renewedAt': now}},
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+        except DuplicateKeyError:
+            # Someone else holds an unexpired lease
+            return False
+        return lease is not None and lease['owner'] == self.instance_id
+
+    def _lease_loop(self):
+        while not self._stop.is_set():
+            try:
+                leader = self._try_acquire()
+            except Exception as e:
+                print(f"✗ Scheduler lease error: {e}")
+                leader = False
+
+            if leader and not self.is_leader:
+                self.is_leader = True
+                print(f"✓ Scheduler leadership acquired by {self.instance_id}")
+                self.scheduler.resume()
+                self._recover_missed_runs()
+            elif not leader and self.is_leader:
+                self.is_leader = False
+                print(f"⚠ Scheduler leadership lost by {self.instance_id}")
+                self.scheduler.pause()
+
+            self._stop.wait(self.renew_seconds)
+
+    # ---------- runs ----------
+
+    def _claim_run(self, job_id, period_key):
+        """Record the start of a run; False if this period already ran (or is running)"""
+        run_id = f'{job_id}:{period_key}'
+        now = datetime.utcnow()
+        run = {
+            'jobId': job_id,
+            'periodKey': period_key,
+            'status': 'running',
+            'owner': self.instance_id,
+            'startedAt': now
+        }
+        try:
+            self.runs.insert_one({'_id': run_id, **run})
+            return run_id
+        except DuplicateKeyError:
+            # A failed run, or one abandoned by a dead leader, may be retried
+            retried = self.runs.update_one(
+                {'_id': run_id, '$or': [
+                    {'status': 'failed'},
+                    {'status': 'running', 'startedAt': {'$lt': now - timedelta(hours=1)},
+                     'owner': {'$ne': self.instance_id}}
+                ]},
+                {'$set': run, '$inc': {'attempts': 1}}
+            )
+            return run_id if retried.modified_count else None
+
+    def _run_job(self, job_id, now=None):
+        if not self.is_leader:
+            return
+        job = self._jobs[job_id]
+        now = now or datetime.now()
+        run_id = self._claim_run(job_id, now.strftime(PERIOD_FORMATS[job['period']]))
+        if not run_id:
+            return
+
+        try:
+            job['func']()
+            self.runs.update_one({'_id': run_id}, {'$set': {'status': 'succeeded', 'finishedAt': datetime.utcnow()}})
+        except Exception as e:
+            print(f"✗ Job {job_id} failed: {e}")
+            self.runs.update_one({'_id': run_id}, {'$set': {'status': 'failed', 'finishedAt': datetime.utcnow(), 'error': str(e)}})
+
+    def _recover_missed_runs(self):
+        """Run any job whose fire time in the current period passed without a successful run"""
+        for job_id, job in self._jobs.items():
+            trigger = job['trigger']
+            now = datetime.now(trigger.timezone)
+            start = period_start(job['period'], now)
+            due_at = trigger.get_next_fire_time(None, start)
+            if due_at is None or due_at > now:
+                continue
+
+            period_key = now.strftime(PERIOD_FORMATS[job['period']])
+            done = self.runs.find_one({'_id': f'{job_id}:{period_key}', 'status': 'succeeded'}, {'_id': 1})
+            if not done:
+                print(f"↻ Recovering missed run of {job_id} ({period_key})")
+                self.scheduler.add_job(self._run_job, args=[job_id, now.replace(tzinfo=None)],
+                                       id=f'{job_id}-recovery', replace_existing=True)
+
+    def history(self, job_id=None, limit=20):
+        query = {'jobId': job_id} if job_id else {}
+        return list(self.runs.find(query).sort('startedAt', -1).limit(limit))
+
+    def stats(self):
+        return {
+            'instanceId': self.instance_id,
+            'isLeader': self.is_leader,
+            'jobs': sorted(self._jobs)
+        }
@@ -0,0 +1,390 @@
+# backend/services/outbox.py
+"""
+Persistent email outbox with a pooled-SMTP delivery worker pool.
+
+Messages are written to a MongoDB collection and delivered by background
+threads, so neither request handlers nor scheduler jobs wait on SMTP.
+Workers claim messages atomically, which makes it safe to run a pool in
+every gunicorn worker. Failed deliveries are retried with exponential
+backoff; a send limit counted in MongoDB keeps each SMTP provider under
+its rate across all processes.
+
+The SMTP side can be exercised without MongoDB against a local debugging
+server:
+
+    python -m aiosmtpd -n -l localhost:1025
+    python services/outbox.py --host localhost --port 1025 --count 50
+"""
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+import queue
+import random
+import smtplib
+import socket
+import threading
+import time
+
+from pymongo import ASCENDING, ReturnDocument
+
+# Errors that mean the connection itself is unusable. Not plain OSError:
+# SMTPException subclasses it, and a refused recipient or rejected message
+# only concerns that one message.
+CONNECTION_ERRORS = (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, ConnectionError, socket.timeout)
+
+
+class RateLimiter:
+    """Token bucket shared by the threads of one process (used by the SMTP test below)"""
+
+    def __init__(self, rate_per_second, burst=None):
+        self.rate = float(rate_per_second)
+        self.capacity = float(burst or max(1, rate_per_second))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until one send is allowed"""
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class SharedRateLimiter:
+    """Fixed-window send limit counted in MongoDB, so it holds across processes
+
+    Every process sending through the same provider increments one counter
+    document per window; a send is allowed while the count is within the
+    window's share of the rate. The in-process RateLimiter above would let
+    each gunicorn worker send at the full rate.
+    """
+
+    def __init__(self, collection, key, rate_per_second, window_seconds=1.0):
+        self.collection = collection
+        self.key = key
+        self.rate = float(rate_per_second)
+        # A window has to allow at least one send, so slow rates get longer windows
+        self.window = max(window_seconds, 1 / self.rate) if self.rate > 0 else window_seconds
+        self.limit = max(1, int(self.rate * self.window))
+
+    def create_indexes(self):
+        self.collection.create_index('expiresAt', expireAfterSeconds=0)
+
+    def acquire(self):
+        """Block until one send is allowed"""
+        if self.rate <= 0:
+            return
+        while True:
+            now = time.time()
+            window = int(now // self.window)
+            doc = self.collection.find_one_and_update(
+                {'_id': f'{self.key}:{window}'},
+                {'$inc': {'count': 1},
+                 '$setOnInsert': {'expiresAt': datetime.utcnow() + timedelta(seconds=self.window + 60)}},
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+            if doc['count'] <= self.limit:
+                return
+            time.sleep((window + 1) * self.window - now)
+
+
+class SMTPPool:
+    """A small pool of logged-in SMTP connections that are reused across messages"""
+
+    def __init__(self, host, port, use_tls=False, username=None, password=None, size=2, timeout=30):
+        self.host = host
+        self.port = port
+        self.use_tls = use_tls
+        self.username = username
+        self.password = password
+        self.timeout = timeout
+        self._idle = queue.LifoQueue(maxsize=size)
+
+    def _connect(self):
+        smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        if self.use_tls:
+            smtp.starttls()
+        if self.username and self.password:
+            smtp.login(self.username, self.password)
+        return smtp
+
+    def _is_alive(self, smtp):
+        try:
+            return smtp.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+
+    @contextmanager
+    def connection(self):
+        """Borrow a live connection; it is discarded instead of returned if sending fails"""
+        smtp = None
+        try:
+            smtp = self._idle.get_nowait()
+            if not self._is_alive(smtp):
+                self._quit(smtp)
+                smtp = None
+        except queue.Empty:
+            pass
+        if smtp is None:
+            smtp = self._connect()
+
+        try:
+            yield smtp
+        except Exception:
+            self._quit(smtp)
+            raise
+        else:
+            try:
+                self._idle.put_nowait(smtp)
+            except queue.Full:
+                self._quit(smtp)
+
+    def close(self):
+        while True:
+            try:
+                self._quit(self._idle.get_nowait())
+            except queue.Empty:
+                return
+
+    @staticmethod
+    def _quit(smtp):
+        try:
+            smtp.quit()
+        except Exception:
+            smtp.close()
+
+
+def build_message(sender, recipient, subject, body):
+    msg = EmailMessage()
+    msg['From'] = sender
+    msg['To'] = recipient
+    msg['Subject'] = subject
+    msg.set_content(body)
+    return msg
+
+
+class EmailOutbox:
+    """Enqueue emails in MongoDB and deliver them from a pool of worker threads"""
+
+    def __init__(self, collection, smtp_pool, sender, workers=2, batch_size=20,
+                 max_attempts=5, backoff_seconds=30, rate_limiter=None,
+                 poll_interval=5, lock_seconds=300):
+        self.collection = collection
+        self.smtp_pool = smtp_pool
+        self.sender = sender
+        self.workers = workers
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self.rate_limiter = rate_limiter or RateLimiter(0)
+        self.poll_interval = poll_interval
+        self.lock_seconds = lock_seconds
+
+        self._threads = []
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._counter_lock = threading.Lock()
+        self.counters = {'enqueued': 0, 'sent': 0, 'retried': 0, 'failed': 0}
+
+    def create_indexes(self):
+        self.collection.create_index([('status', ASCENDING), ('nextAttemptAt', ASCENDING)])
+
+    def _count(self, name, amount=1):
+        with self._counter_lock:
+            self.counters[name] += amount
+
+    # ---------- producer side ----------
+
+    def enqueue(self, recipient, subject, body):
+        """Persist a message for delivery and return its outbox ID"""
+        now = datetime.utcnow()
+        result = self.collection.insert_one({
+            'to': recipient,
+            'subject': subject,
+            'body': body,
+            'status': 'pending',
+            'attempts': 0,
+            'nextAttemptAt': now,
+            'createdAt': now
+        })
+        self._count('enqueued')
+        self._wake.set()
+        return result.inserted_id
+
+    # ---------- worker side ----------
+
+    def start(self):
+        if self._threads:
+            return
+        self._stop.clear()
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f'outbox-{index}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout=10):
+        self._stop.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+        self.smtp_pool.close()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                batch = self._claim_batch()
+                if batch:
+                    self._deliver(batch)
+                    continue
+            except Exception as e:
+                print(f"✗ Outbox worker error: {e}")
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+
+    def _claim_batch(self):
+        """Atomically take up to batch_size due messages (including ones abandoned by a dead worker)"""
+        batch = []
+        while len(batch) < self.batch_size:
+            now = datetime.utcnow()
+            doc = self.collection.find_one_and_update(
+                {'$or': [
+                    {'status': 'pending', 'nextAttemptAt': {'$lte': now}},
+                    {'status': 'sending', 'lockedUntil': {'$lte': now}}
+                ]},
+                {'$set': {'status': 'sending', 'lockedUntil': now + timedelta(seconds=self.lock_seconds)}},
+                sort=[('nextAttemptAt', ASCENDING)],
+                return_document=ReturnDocument.AFTER
+            )
+            if doc is None:
+                break
+            batch.append(doc)
+        return batch
+
+    def _deliver(self, batch):
+        """Send a claimed batch over one pooled connection"""
+        remaining = list(batch)
+        try:
+            with self.smtp_pool.connection() as smtp:
+                while remaining:
+                    doc = remaining[0]
+                    self.rate_limiter.acquire()
+                    try:
+                        smtp.send_message(build_message(self.sender, doc['to'], doc['subject'], doc['body']))
+                    except CONNECTION_ERRORS:
+                        raise
+                    except smtplib.SMTPException as e:
+                        self._record(self._mark_failed_attempt, doc, e)
+                    else:
+                        self._record(self._mark_sent, doc)
+                    remaining.pop(0)
+        except Exception as e:
+            # The connection is gone; everything not yet sent goes back with a backoff
+            for doc in remaining:
+                self._record(self._mark_failed_attempt, doc, e)
+
+    @staticmethod
+    def _record(mark, doc, *args):
+        """Write a delivery outcome without letting a database error reach the send loop
+
+        A failed write must not count as a failed send: the message would be
+        sent again right away. It stays claimed instead and is only picked up
+        again, at-least-once style, when its lock expires.
+        """
+        try:
+            mark(doc, *args)
+        except Exception as e:
+            print(f"✗ Outbox could not record the outcome for {doc['_id']}: {e}")
+
+    def _claimed(self, doc):
+        # Only the worker whose claim is still current may change the message;
+        # after lockedUntil passes another worker may have taken it over
+        return {'_id': doc['_id'], 'status': 'sending', 'lockedUntil': doc['lockedUntil']}
+
+    def _mark_sent(self, doc):
+        result = self.collection.update_one(
+            self._claimed(doc),
+            {'$set': {'status': 'sent', 'sentAt': datetime.utcnow()},
+             '$inc': {'attempts': 1},
+             '$unset': {'lockedUntil': ''}}
+        )
+        self._count('sent')
+        if result.matched_count:
+            print(f"✓ Email sent to {doc['to']}")
+        else:
+            print(f"✗ Email to {doc['to']} was sent after its claim expired; another worker may send it again")
+
+    def _mark_failed_attempt(self, doc, error):
+        attempts = doc.get('attempts', 0) + 1
+        update = {'attempts': attempts, 'lastError': str(error)}
+        if attempts >= self.max_attempts:
+            update['status'] = 'failed'
+        else:
+            # Exponential backoff with jitter: 30s, 60s, 120s, ...
+            delay = self.backoff_seconds * (2 ** (attempts - 1)) * random.uniform(0.8, 1.2)
+            update['status'] = 'pending'
+            update['nextAttemptAt'] = datetime.utcnow() + timedelta(seconds=delay)
+        result = self.collection.update_one(
+            self._claimed(doc),
+            {'$set': update, '$unset': {'lockedUntil': ''}}
+        )
+        if not result.matched_count:
+            # Another worker reclaimed the message; its outcome stands
+            return
+        if update['status'] == 'failed':
+            self._count('failed')
+            print(f"✗ Email to {doc['to']} failed after {attempts} attempts: {error}")
+        else:
+            self._count('retried')
+
+    def stats(self):
+        with self._counter_lock:
+            counters = dict(self.counters)
+        counters['workers'] = len(self._threads)
+        return counters
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Send test messages through the SMTP pool and rate limiter')
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--port', type=int, default=1025)
+    parser.add_argument('--count', type=int, default=20)
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--rate', type=float, default=10, help='messages per second')
+    args = parser.parse_args()
+
+    pool = SMTPPool(args.host, args.port, size=args.threads)
+    limiter = RateLimiter(args.rate)
+    sent = []
+    sent_lock = threading.Lock()
+
+    def send_some(count):
+        with pool.connection() as smtp:
+            for i in range(count):
+                limiter.acquire()
+                smtp.send_message(build_message('outbox@localhost', 'test@localhost', f'Outbox test {i}', 'Hello'))
+                with sent_lock:
+                    sent.append(i)
+
+    start = time.perf_counter()
+    per_thread = args.count // args.threads
+    threads = [threading.Thread(target=send_some, args=(per_thread,)) for _ in range(args.threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    pool.close()
+    print(f"Sent {len(sent)} messages in {elapsed:.2f}s ({len(sent) / elapsed:.1f}/s, limit {args.rate}/s)")
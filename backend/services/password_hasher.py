@@ -0,0 +1,93 @@
+# backend/services/password_hasher.py
+"""
+bcrypt hashing on a small dedicated thread pool.
+
+bcrypt is deliberately slow, so running it inline lets a burst of logins
+occupy every request thread. Here hashes run on a fixed number of
+threads (bcrypt releases the GIL while it works) behind a bounded queue;
+once the queue is full callers get PasswordHasherBusy immediately and
+the route answers 503 instead of piling up.
+"""
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+import threading
+
+import bcrypt
+
+
+class PasswordHasherBusy(Exception):
+    """The hashing queue is full (or the wait for a result timed out)"""
+
+
+def hash_rounds(hashed):
+    """Cost factor of a bcrypt hash such as b'$2b$12$...'"""
+    try:
+        return int(hashed.split(b'$')[2])
+    except (IndexError, ValueError):
+        return None
+
+
+class PasswordHasher:
+    def __init__(self, rounds=12, workers=2, max_queue=32, timeout=10):
+        self.rounds = rounds
+        self.workers = workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='bcrypt')
+        # One slot per running or queued hash
+        self._slots = threading.BoundedSemaphore(workers + max_queue)
+
+        self._lock = threading.Lock()
+        self.counters = {'hashed': 0, 'verified': 0, 'rehashed': 0, 'rejected': 0, 'timedOut': 0}
+
+    def _count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def _run(self, func, *args):
+        if not self._slots.acquire(blocking=False):
+            self._count('rejected')
+            raise PasswordHasherBusy('Password hashing queue is full')
+        try:
+            future = self._pool.submit(func, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            self._count('timedOut')
+            raise PasswordHasherBusy('Timed out waiting for password hashing')
+
+    @staticmethod
+    def _encode(value):
+        return value.encode('utf-8') if isinstance(value, str) else value
+
+    def hash(self, password):
+        """bcrypt hash of password at the configured cost"""
+        hashed = self._run(bcrypt.hashpw, self._encode(password), bcrypt.gensalt(rounds=self.rounds))
+        self._count('hashed')
+        return hashed
+
+    def verify(self, password, hashed):
+        ok = self._run(bcrypt.checkpw, self._encode(password), self._encode(hashed))
+        self._count('verified')
+        return ok
+
+    def needs_rehash(self, hashed):
+        """True if hashed was made with a different cost than the configured one"""
+        return hash_rounds(self._encode(hashed)) != self.rounds
+
+    def rehash(self, password):
+        hashed = self.hash(password)
+        self._count('rehashed')
+        return hashed
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False)
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self.counters)
+        counters.update({'rounds': self.rounds, 'workers': self.workers, 'maxQueue': self.max_queue})
+        return counters
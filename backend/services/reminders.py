@@ -0,0 +1,68 @@
+# backend/services/reminders.py
+from datetime import datetime, timedelta
+
+
+def due_tomorrow_window(now=None):
+    """Start and end of tomorrow, as stored in dueDate"""
+    tomorrow = (now or datetime.now()) + timedelta(days=1)
+    start = datetime(tomorrow.year, tomorrow.month, tomorrow.day, 0, 0, 0)
+    end = datetime(tomorrow.year, tomorrow.month, tomorrow.day, 23, 59, 59)
+    return start, end
+
+
+def due_reminders_pipeline(start, end):
+    """Open tasks due in [start, end], grouped per user with the user joined in"""
+    return [
+        # Served by the (dueDate, status) index
+        {'$match': {
+            'dueDate': {'$gte': start, '$lte': end},
+            'status': {'$ne': 'completed'}
+        }},
+        {'$sort': {'dueDate': 1}},
+        {'$group': {
+            '_id': '$userId',
+            'tasks': {'$push': {
+                'title': '$title',
+                'priority': '$priority',
+                'description': {'$substrCP': [{'$ifNull': ['$description', '']}, 0, 100]}
+            }}
+        }},
+        {'$lookup': {
+            'from': 'users',
+            'localField': '_id',
+            'foreignField': '_id',
+            'as': 'user'
+        }},
+        {'$unwind': '$user'},
+        {'$match': {'user.email': {'$exists': True}}},
+        {'$project': {
+            'tasks': 1,
+            'name': '$user.name',
+            'email': '$user.email'
+        }}
+    ]
+
+
+def iter_due_reminders(db, start, end, batch_size=100):
+    """Stream one {name, email, tasks} group per user with tasks due in the window"""
+    return db.tasks.aggregate(
+        due_reminders_pipeline(start, end),
+        batchSize=batch_size,
+        allowDiskUse=True
+    )
+
+
+def build_reminder_email(group):
+    """Subject and body of the 'due tomorrow' email for one user group"""
+    subject = "⏰ Task Reminder: Tasks Due Tomorrow"
+    body = f"Hi {group['name']},\n\n"
+    body += "You have the following tasks due tomorrow:\n\n"
+
+    for task in group['tasks']:
+        body += f"• {task['title']} (Priority: {task['priority']})\n"
+        if task.get('description'):
+            body += f"  {task['description']}...\n"
+
+    body += "\nComplete them before the deadline!\n"
+    body += "Login to TaskMaster Pro to update your progress."
+    return subject, body
@@ -0,0 +1,347 @@
+# backend/services/report_jobs.py
+"""
+PDF and Excel task reports, rendered as background jobs.
+
+A job's ID is a hash of the user, the format and the user's data
+versions, so it doubles as the cache key: asking for the same report
+again before any task or profile change returns the finished job, and
+its file is served straight from disk. Rendering runs in a process pool
+(laying out a long table is CPU-bound); the worker reads tasks over its
+own MongoDB connection and records progress on the job document, which
+is what status polls and event streams read, from any app worker.
+ReportLab (PDF) and openpyxl (Excel) are optional; a format whose
+library is missing is reported as unavailable.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+import hashlib
+import os
+import threading
+from xml.sax.saxutils import escape
+
+from pymongo import MongoClient
+from pymongo.errors import DuplicateKeyError
+
+from services.task_export import EXPORT_COLUMNS, EXPORT_PROJECTION, export_row
+
+try:
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4, landscape
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+except ImportError:
+    SimpleDocTemplate = None
+
+try:
+    from openpyxl import Workbook
+except ImportError:
+    Workbook = None
+
+FORMATS = {
+    'pdf': {'mimetype': 'application/pdf', 'library': 'reportlab'},
+    'xlsx': {
+        'mimetype': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        'library': 'openpyxl'
+    }
+}
+
+# Bump when a layout changes so reports cached under the old one are rendered again
+LAYOUT_VERSION = 1
+
+PROGRESS_EVERY = 500  # Rows between progress writes to the job document
+PDF_TABLE_ROWS = 250  # Rows per PDF table; one huge table is slow to split across pages
+PDF_COLUMNS = ['Title', 'Due Date', 'Priority', 'Category', 'Status']
+
+_client = None
+
+
+def _database(mongo_uri, db_name):
+    # One client per worker process, created after the fork
+    global _client
+    if _client is None:
+        _client = MongoClient(mongo_uri)
+    return _client[db_name]
+
+
+# ---------- rendering (worker process) ----------
+
+def _write_pdf(path, owner, rows):
+    styles = getSampleStyleSheet()
+    doc = SimpleDocTemplate(path, pagesize=landscape(A4), title='Task Report')
+    elements = [
+        Paragraph(f"Task Report for {escape(owner)}", styles['Title']),
+        Paragraph(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M')}", styles['Normal']),
+        Spacer(1, 12)
+    ]
+    style = TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.black)
+    ])
+
+    def table(body):
+        t = Table([PDF_COLUMNS] + body, repeatRows=1)
+        t.setStyle(style)
+        return t
+
+    body = []
+    tables = 0
+    for row in rows:
+        title, _, due, priority, category, status, _ = row
+        body.append([title[:50], due, priority, category, status])
+        if len(body) == PDF_TABLE_ROWS:
+            elements.append(table(body))
+            tables += 1
+            body = []
+    if body or not tables:
+        elements.append(table(body))
+    doc.build(elements)
+
+
+def _write_xlsx(path, owner, rows):
+    # Write-only mode streams rows to disk instead of keeping every cell in memory
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('Tasks')
+    sheet.append(EXPORT_COLUMNS)
+    for row in rows:
+        sheet.append(row)
+    workbook.save(path)
+
+
+WRITERS = {'pdf': _write_pdf, 'xlsx': _write_xlsx}
+
+
+def render_report(mongo_uri, db_name, jobs_name, job_id, user_id, fmt, out_path, batch_size=1000):
+    """Render one report to out_path and return its size; runs in a worker process"""
+    db = _database(mongo_uri, db_name)
+    jobs = db[jobs_name]
+    query = {'userId': user_id}
+    user = db.users.find_one({'_id': user_id}, {'name': 1}) or {}
+    total = db.tasks.count_documents(query)
+    jobs.update_one(
+        {'_id': job_id},
+        {'$set': {'status': 'running', 'done': 0, 'total': total, 'startedAt': datetime.utcnow()}}
+    )
+
+    def rows():
+        cursor = (
+            db.tasks.find(query, EXPORT_PROJECTION)
+            .sort([('dueDate', 1), ('_id', 1)])
+            .batch_size(batch_size)
+        )
+        done = 0
+        for task in cursor:
+            yield export_row(task)
+            done += 1
+            if done % PROGRESS_EVERY == 0:
+                jobs.update_one({'_id': job_id}, {'$set': {'done': done}})
+        jobs.update_one({'_id': job_id}, {'$set': {'done': done}})
+
+    tmp_path = f'{out_path}.{os.getpid()}.tmp'
+    try:
+        WRITERS[fmt](tmp_path, user.get('name', ''), rows())
+        os.replace(tmp_path, out_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return os.path.getsize(out_path)
+
+
+# ---------- jobs (app process) ----------
+
+class ReportJobs:
+    def __init__(self, collection, root, mongo_uri, db_name, workers=2,
+                 batch_size=1000, stale_minutes=10, keep_days=7):
+        self.collection = collection
+        self.root = root
+        self.mongo_uri = mongo_uri
+        self.db_name = db_name
+        self.workers = workers
+        self.batch_size = batch_size
+        self.stale_minutes = stale_minutes
+        self.keep_days = keep_days
+        self._pool = None
+        self._lock = threading.Lock()
+        self.counters = {'queued': 0, 'rendered': 0, 'failed': 0, 'cacheHits': 0}
+        os.makedirs(root, exist_ok=True)
+
+    def create_indexes(self):
+        self.collection.create_index([('userId', 1), ('format', 1)])
+        self.collection.create_index('lastAccessedAt')
+
+    def _executor(self):
+        # Created on first use so each gunicorn worker forks its own pool after startup
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            return self._pool
+
+    def _count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def available(self, fmt):
+        """False if reports are disabled or the format's library is not installed"""
+        libraries = {'pdf': SimpleDocTemplate, 'xlsx': Workbook}
+        return self.workers > 0 and libraries.get(fmt) is not None
+
+    @staticmethod
+    def job_id(user_id, fmt, versions):
+        state = f"{user_id}|{fmt}|{versions.get('tasks', 0)}|{versions.get('profile', 0)}|{LAYOUT_VERSION}"
+        return hashlib.sha256(state.encode('utf-8')).hexdigest()[:32]
+
+    def path_for(self, job):
+        return os.path.join(self.root, f"{job['_id']}.{job['format']}")
+
+    def _reusable(self, job):
+        if job['status'] == 'done':
+            return os.path.exists(self.path_for(job))
+        if job['status'] in ('queued', 'running'):
+            # A job whose worker died never finishes, so it is started again after a while
+            return job['createdAt'] > datetime.utcnow() - timedelta(minutes=self.stale_minutes)
+        return False
+
+    # ---------- starting ----------
+
+    def start(self, user_id, fmt, versions):
+        """The job for this report at the user's current data versions, starting it if needed"""
+        job_id = self.job_id(user_id, fmt, versions)
+        job = self.collection.find_one({'_id': job_id})
+        if job and self._reusable(job):
+            if job['status'] == 'done':
+                self._count('cacheHits')
+                self.touch(job)
+            return job
+
+        now = datetime.utcnow()
+        new_job = {
+            '_id': job_id,
+            'userId': user_id,
+            'format': fmt,
+            'versions': {'tasks': versions.get('tasks', 0), 'profile': versions.get('profile', 0)},
+            'status': 'queued',
+            'done': 0,
+            'total': None,
+            'error': None,
+            'createdAt': now,
+            'lastAccessedAt': now
+        }
+        # Only one request gets to (re)start a given report; the others see its job
+        try:
+            if job:
+                claimed = self.collection.replace_one(
+                    {'_id': job_id, 'status': job['status'], 'createdAt': job['createdAt']}, new_job
+                ).modified_count
+            else:
+                self.collection.insert_one(new_job)
+                claimed = True
+        except DuplicateKeyError:
+            claimed = False
+        if not claimed:
+            return self.collection.find_one({'_id': job_id})
+
+        self._submit(new_job)
+        return new_job
+
+    def _submit(self, job):
+        try:
+            future = self._executor().submit(
+                render_report, self.mongo_uri, self.db_name, self.collection.name,
+                job['_id'], job['userId'], job['format'], self.path_for(job), self.batch_size
+            )
+        except Exception as e:
+            self._fail(job, e)
+            raise
+        self._count('queued')
+
+        def finished(future):
+            try:
+                size = future.result()
+                self.collection.update_one(
+                    {'_id': job['_id']},
+                    {'$set': {'status': 'done', 'size': size, 'finishedAt': datetime.utcnow()}}
+                )
+                self._count('rendered')
+                self._drop_superseded(job)
+            except Exception as e:
+                self._fail(job, e)
+
+        future.add_done_callback(finished)
+
+    def _fail(self, job, error):
+        self._count('failed')
+        print(f"✗ Report {job['_id']} ({job['format']}) failed: {error}")
+        self.collection.update_one(
+            {'_id': job['_id']},
+            {'$set': {'status': 'failed', 'error': str(error), 'finishedAt': datetime.utcnow()}}
+        )
+
+    # ---------- reading ----------
+
+    def get(self, job_id, user_id):
+        return self.collection.find_one({'_id': job_id, 'userId': user_id})
+
+    def touch(self, job):
+        self.collection.update_one({'_id': job['_id']}, {'$set': {'lastAccessedAt': datetime.utcnow()}})
+
+    def describe(self, job):
+        """Client view of a job"""
+        total = job.get('total')
+        progress = 1.0 if job['status'] == 'done' else None
+        if progress is None and total:
+            progress = round(min(job.get('done', 0) / total, 1.0), 3)
+        return {
+            'jobId': job['_id'],
+            'format': job['format'],
+            'status': job['status'],
+            'done': job.get('done', 0),
+            'total': total,
+            'progress': progress,
+            'size': job.get('size'),
+            'error': job.get('error'),
+            'createdAt': job['createdAt'].isoformat()
+        }
+
+    # ---------- cleanup ----------
+
+    def _remove(self, job):
+        try:
+            os.remove(self.path_for(job))
+        except FileNotFoundError:
+            pass
+        self.collection.delete_one({'_id': job['_id']})
+
+    def _drop_superseded(self, job):
+        """Remove this user's older finished reports in the same format"""
+        for old in self.collection.find(
+            {'userId': job['userId'], 'format': job['format'], '_id': {'$ne': job['_id']},
+             'status': {'$in': ['done', 'failed']}},
+            {'format': 1}
+        ):
+            self._remove(old)
+
+    def cleanup(self, now=None):
+        """Remove reports nobody has downloaded for keep_days"""
+        cutoff = (now or datetime.utcnow()) - timedelta(days=self.keep_days)
+        removed = 0
+        for job in self.collection.find({'lastAccessedAt': {'$lt': cutoff}}, {'format': 1}):
+            self._remove(job)
+            removed += 1
+        return removed
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self.counters)
+        counters.update({
+            'workers': self.workers,
+            'formats': [fmt for fmt in FORMATS if self.available(fmt)]
+        })
+        return counters
@@ -0,0 +1,63 @@
+# backend/services/task_export.py
+"""
+Task export rows and a streamed CSV writer.
+
+Tasks are read from a cursor and turned into rows one at a time, so an
+export never holds more than one cursor batch and one output chunk in
+memory, however many tasks the user has.
+"""
+import csv
+import io
+
+EXPORT_COLUMNS = ['Title', 'Description', 'Due Date', 'Priority', 'Category', 'Status', 'Created']
+
+# Only the fields the export writes are fetched from MongoDB
+EXPORT_PROJECTION = {
+    '_id': 0, 'title': 1, 'description': 1, 'dueDate': 1,
+    'priority': 1, 'category': 1, 'status': 1, 'createdAt': 1
+}
+
+
+def _date(value):
+    if value is None:
+        return ''
+    return value.strftime('%Y-%m-%d') if hasattr(value, 'strftime') else str(value)
+
+
+def export_row(task):
+    """One task as a list of cell values in EXPORT_COLUMNS order"""
+    return [
+        task.get('title', ''),
+        task.get('description', ''),
+        _date(task.get('dueDate')),
+        task.get('priority', ''),
+        task.get('category', ''),
+        task.get('status', ''),
+        _date(task.get('createdAt'))
+    ]
+
+
+def stream_csv(tasks, chunk_size=64 * 1024):
+    """Yield a CSV of `tasks` as UTF-8 chunks.
+
+    The header goes out on its own so the client sees the first byte
+    before the query has returned anything; after that rows are
+    buffered and flushed every `chunk_size` characters. A BOM is written
+    first so spreadsheet apps detect the encoding.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    yield ('\ufeff' + buffer.getvalue()).encode('utf-8')
+    buffer.seek(0)
+    buffer.truncate()
+
+    for task in tasks:
+        writer.writerow(export_row(task))
+        if buffer.tell() >= chunk_size:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
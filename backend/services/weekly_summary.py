@@ -0,0 +1,182 @@
+# backend/services/weekly_summary.py
+"""
+Weekly summary as a streamed batch pipeline.
+
+One aggregation produces, per user, the task totals and the five open
+tasks due soonest, already joined with the user's name and email. The
+cursor is consumed in chunks and each chunk is rendered and sent by a
+bounded thread pool, so memory stays proportional to the chunk size and
+not to the number of users or tasks.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import time
+
+FOCUS_TASKS = 5
+
+
+def supports_top_n(db):
+    """True if the server has the $topN accumulator (MongoDB 5.2+)"""
+    try:
+        version = db.client.server_info().get('versionArray', [])
+    except Exception:
+        return False
+    return list(version[:2]) >= [5, 2]
+
+
+def weekly_summary_pipeline(top_n=True):
+    """Per-user totals plus the top open tasks, with the user joined in
+
+    With top_n the server keeps only FOCUS_TASKS tasks per user while
+    grouping. Servers older than 5.2 lack $topN, so instead the tasks are
+    sorted first and every one is pushed, then sliced; that costs a full
+    sort and a larger group, but gives the same result.
+    """
+    focus_fields = {'title': '$title', 'dueDate': '$dueDate', 'isDone': '$isDone'}
+    if top_n:
+        # Open tasks sort ahead of completed ones, soonest due first
+        focus = {'$topN': {'n': FOCUS_TASKS, 'sortBy': {'isDone': 1, 'dueDate': 1}, 'output': focus_fields}}
+        presort = []
+    else:
+        focus = {'$push': focus_fields}
+        presort = [{'$sort': {'userId': 1, 'isDone': 1, 'dueDate': 1}}]
+
+    return [
+        {'$addFields': {'isDone': {'$eq': ['$status', 'completed']}}},
+        *presort,
+        {'$group': {
+            '_id': '$userId',
+            'total': {'$sum': 1},
+            'completed': {'$sum': {'$cond': ['$isDone', 1, 0]}},
+            'pending': {'$sum': {'$cond': [{'$eq': ['$status', 'pending']}, 1, 0]}},
+            'inProgress': {'$sum': {'$cond': [{'$eq': ['$status', 'in-progress']}, 1, 0]}},
+            'focus': focus
+        }},
+        {'$lookup': {
+            'from': 'users',
+            'localField': '_id',
+            'foreignField': '_id',
+            'as': 'user'
+        }},
+        {'$unwind': '$user'},
+        {'$project': {
+            'total': 1,
+            'completed': 1,
+            'pending': 1,
+            'inProgress': 1,
+            'focus': {'$slice': [
+                {'$filter': {'input': '$focus', 'cond': {'$eq': ['$$this.isDone', False]}}},
+                FOCUS_TASKS
+            ]},
+            'name': '$user.name',
+            'email': '$user.email'
+        }}
+    ]
+
+
+def render_weekly_summary(group):
+    """Subject and body of one user's weekly summary email"""
+    subject = "📊 Your Weekly Task Summary"
+    body = f"Hi {group['name']},\n\n"
+    body += "Here's your task summary for this week:\n\n"
+    body += f"📋 Total Tasks: {group['total']}\n"
+    body += f"✅ Completed: {group['completed']}\n"
+    body += f"⏳ Pending: {group['pending']}\n"
+    body += f"🔄 In Progress: {group['inProgress']}\n\n"
+
+    if group['pending'] > 0:
+        body += "Tasks to focus on this week:\n"
+        for task in group['focus']:
+            due_date = task['dueDate'].strftime('%Y-%m-%d') if hasattr(task.get('dueDate'), 'strftime') else str(task.get('dueDate'))
+            body += f"• {task['title']} (Due: {due_date})\n"
+
+    body += "\nKeep up the great work!\n"
+    body += "Login to TaskMaster Pro to manage your tasks."
+    return subject, body
+
+
+class SummaryProgress:
+    """Counters for one pipeline run, readable while it is in progress"""
+
+    def __init__(self, dry_run):
+        self.dry_run = dry_run
+        self.started_at = datetime.utcnow()
+        self.finished_at = None
+        self.users = 0
+        self.rendered = 0
+        self.sent = 0
+        self.errors = 0
+        self.chunks = 0
+        self._start = time.perf_counter()
+        self.elapsed = 0.0
+
+    def snapshot(self):
+        elapsed = self.elapsed or (time.perf_counter() - self._start)
+        return {
+            'dryRun': self.dry_run,
+            'startedAt': self.started_at.isoformat(),
+            'finishedAt': self.finished_at.isoformat() if self.finished_at else None,
+            'users': self.users,
+            'rendered': self.rendered,
+            'sent': self.sent,
+            'errors': self.errors,
+            'chunks': self.chunks,
+            'elapsedSeconds': round(elapsed, 3),
+            'usersPerSecond': round(self.users / elapsed, 1) if elapsed else 0.0
+        }
+
+
+def run_weekly_summary(db, send, chunk_size=500, workers=4, dry_run=False, progress=None, top_n=None):
+    """Render and send every user's weekly summary; returns the final metrics.
+
+    send(recipient, subject, body) is called from the worker pool and
+    returns a falsy value if the message could not be queued; with
+    dry_run the bodies are rendered but send is never called. progress,
+    if given, receives a metrics snapshot after every chunk. top_n picks
+    the pipeline variant and defaults to what the server supports.
+    """
+    stats = SummaryProgress(dry_run)
+    if top_n is None:
+        top_n = supports_top_n(db)
+
+    def process(group):
+        """Render one summary and send it; True if it was queued"""
+        subject, body = render_weekly_summary(group)
+        return not dry_run and bool(send(group['email'], subject, body))
+
+    cursor = db.tasks.aggregate(weekly_summary_pipeline(top_n), batchSize=chunk_size, allowDiskUse=True)
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='weekly-summary') as pool:
+        chunk = []
+        for group in cursor:
+            if group.get('email'):
+                chunk.append(group)
+            if len(chunk) >= chunk_size:
+                _process_chunk(pool, process, chunk, stats, progress)
+                chunk = []
+        if chunk:
+            _process_chunk(pool, process, chunk, stats, progress)
+
+    stats.elapsed = time.perf_counter() - stats._start
+    stats.finished_at = datetime.utcnow()
+    return stats.snapshot()
+
+
+def _process_chunk(pool, process, chunk, stats, progress):
+    """Run one chunk through the pool and wait for it, keeping at most one chunk in flight"""
+    futures = [pool.submit(process, group) for group in chunk]
+    for future in futures:
+        try:
+            sent = future.result()
+            stats.rendered += 1
+            if sent:
+                stats.sent += 1
+            elif not stats.dry_run:
+                stats.errors += 1
+        except Exception as e:
+            stats.errors += 1
+            print(f"✗ Weekly summary error: {e}")
+    stats.users += len(chunk)
+    stats.chunks += 1
+    if progress:
+        progress(stats.snapshot())
@@ -0,0 +1,62 @@
+# backend/tests/conftest.py
+"""
+Fixtures: the Flask app on an in-memory mongomock database.
+
+Background workers (scheduler, outbox, image and report pools) are
+switched off through the environment before app.py is imported, and the
+app runs inside a temporary directory so uploads and reports land there.
+
+Usage (from the backend folder):
+    pip install -r requirements-dev.txt
+    python -m pytest -q
+"""
+import os
+import sys
+
+import pytest
+
+mongomock = pytest.importorskip('mongomock')
+flask_pymongo = pytest.importorskip('flask_pymongo')
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.update({
+    'SCHEDULER_ENABLED': 'False',
+    'OUTBOX_WORKERS': '0',
+    'IMAGE_VARIANT_WORKERS': '0',
+    'REPORT_WORKERS': '0',
+    'COMPRESSION_ENABLED': 'False',
+    'BCRYPT_ROUNDS': '4',
+    'MONGO_DB': 'taskmaster_test'
+})
+
+
+@pytest.fixture(scope='session')
+def app_module(tmp_path_factory):
+    os.chdir(tmp_path_factory.mktemp('app'))
+    flask_pymongo.MongoClient = mongomock.MongoClient
+    import app
+    return app
+
+
+@pytest.fixture
+def db(app_module):
+    for name in app_module.db.list_collection_names():
+        app_module.db[name].delete_many({})
+    app_module.token_cache.clear()
+    return app_module.db
+
+
+@pytest.fixture
+def client(app_module, db):
+    return app_module.app.test_client()
+
+
+@pytest.fixture
+def make_user(app_module, db):
+    """Insert a user and return (user_id, Authorization headers)"""
+    def make(name='Test User'):
+        user_id = db.users.insert_one({'name': name, 'email': f'{name.lower().replace(" ", ".")}@example.com'}).inserted_id
+        token = app_module.generate_token(user_id)
+        return user_id, {'Authorization': f'Bearer {token}'}
+    return make
@@ -0,0 +1,35 @@
+# backend/tests/test_auth.py
+from datetime import datetime, timedelta
+
+import jwt
+
+from config import Config
+
+
+def sign(payload):
+    return jwt.encode(payload, Config.JWT_SECRET_KEY, algorithm='HS256')
+
+
+def test_signed_token_without_exp_is_rejected(client, make_user):
+    user_id, _ = make_user()
+    token = sign({'user_id': str(user_id)})
+
+    response = client.get('/api/tasks', headers={'Authorization': f'Bearer {token}'})
+
+    assert response.status_code == 401
+
+
+def test_signed_token_without_user_id_is_rejected(client):
+    token = sign({'exp': datetime.utcnow() + timedelta(hours=1)})
+
+    response = client.get('/api/tasks', headers={'Authorization': f'Bearer {token}'})
+
+    assert response.status_code == 401
+
+
+def test_valid_token_is_cached(app_module, client, make_user):
+    _, headers = make_user()
+
+    assert client.get('/api/tasks', headers=headers).status_code == 200
+    assert client.get('/api/tasks', headers=headers).status_code == 200
+    assert app_module.token_cache.stats()['hits'] >= 1
@@ -0,0 +1,70 @@
+# backend/tests/test_blob_store.py
+import os
+import threading
+import time
+
+import mongomock
+import pytest
+
+from services.blob_store import BlobStore, file_sha256
+
+
+@pytest.fixture
+def store(tmp_path):
+    return BlobStore(mongomock.MongoClient().db.attachment_blobs, str(tmp_path / 'blobs'))
+
+
+def write(tmp_path, name, data):
+    path = tmp_path / name
+    path.write_bytes(data)
+    return str(path)
+
+
+def test_identical_content_is_stored_once_and_counted(store, tmp_path):
+    sha, _ = store.put_file(write(tmp_path, 'a', b'same'))
+    store.put_file(write(tmp_path, 'b', b'same'))
+
+    assert store.collection.find_one({'_id': sha})['refs'] == 2
+    assert store.release(sha) is False
+    assert store.exists(sha)
+    assert store.release(sha) is True
+    assert not store.exists(sha)
+    assert store.collection.find_one({'_id': sha}) is None
+
+
+def test_reference_taken_during_unlink_keeps_the_file(store, tmp_path):
+    sha, _ = store.put_file(write(tmp_path, 'a', b'data'))
+    # A release has claimed the last reference and is about to unlink
+    store.collection.update_one({'_id': sha}, {'$set': {'refs': 0, 'deleting': True}})
+
+    putter = threading.Thread(target=store.put_file, args=(write(tmp_path, 'b', b'data'),))
+    putter.start()
+    while store.collection.find_one({'_id': sha})['refs'] == 0:
+        time.sleep(0.001)
+    # The release finishes: unlinks, fails to drop the re-referenced record, clears the flag
+    os.remove(store.path_for(sha))
+    assert not store.collection.delete_one({'_id': sha, 'refs': {'$lte': 0}}).deleted_count
+    store.collection.update_one({'_id': sha}, {'$unset': {'deleting': ''}})
+    putter.join(5)
+
+    assert store.exists(sha)
+    assert file_sha256(store.path_for(sha)) == sha
+    assert store.collection.find_one({'_id': sha})['refs'] == 1
+
+
+def test_release_backs_off_when_referenced_again(store, tmp_path, monkeypatch):
+    sha, _ = store.put_file(write(tmp_path, 'a', b'data'))
+    real_remove = os.remove
+
+    def remove_and_race(path):
+        real_remove(path)
+        if path == store.path_for(sha):
+            # Another request references the blob between the unlink and the record delete
+            store.collection.update_one({'_id': sha}, {'$inc': {'refs': 1}})
+
+    monkeypatch.setattr(os, 'remove', remove_and_race)
+    assert store.release(sha) is False
+    monkeypatch.setattr(os, 'remove', real_remove)
+
+    record = store.collection.find_one({'_id': sha})
+    assert record['refs'] == 1 and 'deleting' not in record
@@ -0,0 +1,140 @@
+# backend/tests/test_bulk_tasks.py
+from datetime import datetime
+
+from bson import ObjectId
+
+
+def insert_task(db, user_id, title='Task'):
+    return db.tasks.insert_one({
+        'userId': user_id,
+        'title': title,
+        'status': 'pending',
+        'priority': 'medium',
+        'category': 'work',
+        'dueDate': datetime(2030, 1, 1),
+        'createdAt': datetime.utcnow(),
+        'updatedAt': datetime.utcnow()
+    }).inserted_id
+
+
+def bulk(client, headers, operations, ordered=False):
+    return client.post('/api/tasks/bulk', json={'operations': operations, 'ordered': ordered}, headers=headers)
+
+
+def test_delete_of_someone_elses_task_is_not_found_and_cascades_nothing(client, db, make_user):
+    owner, _ = make_user('Owner')
+    _, intruder_headers = make_user('Intruder')
+    task_id = insert_task(db, owner)
+    db.comments.insert_one({'taskId': task_id, 'text': 'keep me'})
+    db.activity.insert_one({'taskId': task_id, 'action': 'created'})
+
+    response = bulk(client, intruder_headers, [{'op': 'delete', 'id': str(task_id)}])
+
+    assert response.status_code == 207
+    assert response.get_json()['results'][0] == {'op': 'delete', 'status': 'error', 'error': 'Task not found'}
+    assert db.tasks.count_documents({'_id': task_id}) == 1
+    assert db.comments.count_documents({'taskId': task_id}) == 1
+    assert db.activity.count_documents({'taskId': task_id}) == 1
+    assert db.task_tombstones.count_documents({}) == 0
+
+
+def test_update_of_someone_elses_task_is_not_found(client, db, make_user):
+    owner, _ = make_user('Owner')
+    _, intruder_headers = make_user('Intruder')
+    task_id = insert_task(db, owner)
+
+    response = bulk(client, intruder_headers, [{'op': 'update', 'id': str(task_id), 'changes': {'title': 'Mine'}}])
+
+    assert response.get_json()['results'][0]['error'] == 'Task not found'
+    assert db.tasks.find_one({'_id': task_id})['title'] == 'Task'
+
+
+def test_owned_delete_cascades_and_leaves_a_tombstone(client, db, make_user):
+    owner, headers = make_user('Owner')
+    task_id = insert_task(db, owner)
+    db.comments.insert_one({'taskId': task_id, 'text': 'bye'})
+
+    response = bulk(client, headers, [{'op': 'delete', 'id': str(task_id)}])
+
+    assert response.status_code == 200
+    assert db.tasks.count_documents({'_id': task_id}) == 0
+    assert db.comments.count_documents({'taskId': task_id}) == 0
+    assert db.task_tombstones.find_one({'taskId': task_id})['userId'] == owner
+
+
+def test_mixed_batch_only_touches_owned_tasks(client, db, make_user):
+    owner, headers = make_user('Owner')
+    other, _ = make_user('Other')
+    mine = insert_task(db, owner)
+    theirs = insert_task(db, other)
+    missing = ObjectId()
+
+    response = bulk(client, headers, [
+        {'op': 'delete', 'id': str(mine)},
+        {'op': 'delete', 'id': str(theirs)},
+        {'op': 'delete', 'id': str(missing)}
+    ])
+
+    statuses = [r['status'] for r in response.get_json()['results']]
+    assert statuses == ['ok', 'error', 'error']
+    assert response.get_json()['deleted'] == 1
+    assert db.tasks.count_documents({'_id': theirs}) == 1
+    assert [t['taskId'] for t in db.task_tombstones.find()] == [mine]
+
+
+def test_delete_many_is_scoped_to_the_caller(client, db, make_user):
+    owner, headers = make_user('Owner')
+    other, _ = make_user('Other')
+    insert_task(db, owner)
+    theirs = insert_task(db, other)
+
+    response = bulk(client, headers, [{'op': 'deleteMany', 'filter': {'status': 'pending'}}])
+
+    assert response.get_json()['results'][0]['matched'] == 1
+    assert db.tasks.count_documents({'userId': owner}) == 0
+    assert db.tasks.count_documents({'_id': theirs}) == 1
+
+
+def test_wrongly_typed_text_fields_fail_only_their_own_item(client, db, make_user):
+    user_id, headers = make_user()
+    task_id = insert_task(db, user_id)
+    good = {'title': 'ok', 'dueDate': '2030-01-01', 'priority': 'low', 'category': 'work', 'status': 'pending'}
+
+    response = bulk(client, headers, [
+        {'op': 'create', 'task': {**good, 'title': 5}},
+        {'op': 'create', 'task': {**good, 'description': None}},
+        {'op': 'update', 'id': str(task_id), 'changes': {'title': ['x']}},
+        {'op': 'create', 'task': good},
+    ])
+
+    assert response.status_code == 207
+    results = response.get_json()['results']
+    assert [r['status'] for r in results] == ['error', 'error', 'error', 'ok']
+    assert results[0]['error'] == 'title must be a string'
+    assert results[1]['error'] == 'description must be a string'
+    assert db.tasks.count_documents({'userId': user_id}) == 2
+
+
+def test_bulk_writes_keep_the_stats_counters(app_module, client, db, make_user, monkeypatch):
+    monkeypatch.setattr(app_module.Config, 'TASK_STATS_COUNTERS', True)
+    user_id, headers = make_user()
+    first, second, third = (insert_task(db, user_id, str(i)) for i in range(3))
+    client.get('/api/tasks/stats', headers=headers)
+
+    bulk(client, headers, [
+        {'op': 'create', 'task': {'title': 'new', 'dueDate': '2030-01-01', 'priority': 'high',
+                                  'category': 'home', 'status': 'pending'}},
+        {'op': 'update', 'id': str(first), 'changes': {'status': 'completed'}},
+        {'op': 'delete', 'id': str(second)},
+        {'op': 'updateMany', 'filter': {'ids': [str(third)]}, 'changes': {'category': 'home'}},
+        {'op': 'delete', 'id': str(ObjectId())},
+    ])
+
+    maintained = db.task_stats.find_one({'_id': user_id})
+    assert maintained is not None
+    assert app_module.get_task_stats(user_id) == {
+        'total': 3, 'pending': 2, 'inProgress': 0, 'completed': 1,
+        'byStatus': {'pending': 2, 'completed': 1},
+        'byCategory': {'work': 1, 'home': 2},
+        'byPriority': {'medium': 2, 'high': 1}
+    }
@@ -0,0 +1,68 @@
+# backend/tests/test_chunked_upload.py
+import hashlib
+import io
+
+import mongomock
+import pytest
+
+from services.chunked_upload import ChunkedUploads, UploadError
+
+
+@pytest.fixture
+def uploads(tmp_path):
+    return ChunkedUploads(mongomock.MongoClient().db.upload_sessions, str(tmp_path), chunk_size=4, max_size=64)
+
+
+def test_chunks_in_any_order_assemble_the_file(uploads):
+    data = b'0123456789'
+    session = uploads.create('u', 't', 'f.bin', len(data))
+
+    for index in (2, 0, 1):
+        uploads.write_chunk(session, index, io.BytesIO(data[index * 4:(index + 1) * 4]))
+
+    path, checksum = uploads.finish(session, hashlib.sha256(data).hexdigest())
+    with open(path, 'rb') as f:
+        assert f.read() == data
+    assert checksum == hashlib.sha256(data).hexdigest()
+
+
+def test_missing_chunks_are_listed_for_resume(uploads):
+    session = uploads.create('u', 't', 'f.bin', 10)
+    uploads.write_chunk(session, 1, io.BytesIO(b'4567'))
+
+    stored = uploads.get(session['_id'], 'u')
+    assert uploads.describe(stored)['missing'] == [0, 2]
+    with pytest.raises(UploadError):
+        uploads.finish(stored)
+
+
+def test_wrong_length_or_checksum_is_rejected(uploads):
+    session = uploads.create('u', 't', 'f.bin', 10)
+
+    with pytest.raises(UploadError):
+        uploads.write_chunk(session, 2, io.BytesIO(b'89x'))
+    with pytest.raises(UploadError):
+        uploads.write_chunk(session, 0, io.BytesIO(b'0123'), expected_sha256='0' * 64)
+    with pytest.raises(UploadError):
+        uploads.write_chunk(session, 3, io.BytesIO(b''))
+
+
+def test_failed_resend_marks_the_chunk_missing_again(uploads):
+    session = uploads.create('u', 't', 'f.bin', 8)
+    uploads.write_chunk(session, 0, io.BytesIO(b'0123'))
+
+    with pytest.raises(UploadError):
+        uploads.write_chunk(session, 0, io.BytesIO(b'012345'))
+
+    assert uploads.missing_chunks(uploads.get(session['_id'], 'u')) == [0, 1]
+
+
+def test_size_limit_is_enforced(uploads):
+    with pytest.raises(UploadError):
+        uploads.create('u', 't', 'big.bin', 65)
+
+
+@pytest.mark.parametrize('size', [True, 0, -1, 1.5, '10'])
+def test_size_must_be_a_positive_integer(uploads, size):
+    with pytest.raises(UploadError):
+        uploads.create('u', 't', 'f.bin', size)
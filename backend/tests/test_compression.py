@@ -0,0 +1,39 @@
+# backend/tests/test_compression.py
+import gzip
+
+from flask import Flask, Response
+
+from services.compression import Compressor
+
+
+def test_streamed_body_is_not_read_by_the_hook():
+    app = Flask(__name__)
+    compressor = Compressor(app, min_size=1024)
+    produced = []
+
+    def rows():
+        produced.append('header')
+        yield 'Title,Status\r\n'
+        for i in range(3):
+            produced.append(i)
+            yield f'task {i},pending\r\n'
+
+    with app.test_request_context('/api/export/csv', headers={'Accept-Encoding': 'gzip'}):
+        response = compressor.after_request(Response(rows(), mimetype='text/csv'))
+
+    # Nothing was pulled from the generator before the response starts
+    assert produced == []
+    assert response.headers['Content-Encoding'] == 'gzip'
+    body = gzip.decompress(b''.join(response.response))
+    assert body.decode() == 'Title,Status\r\ntask 0,pending\r\ntask 1,pending\r\ntask 2,pending\r\n'
+
+
+def test_small_buffered_body_is_sent_as_is():
+    app = Flask(__name__)
+    compressor = Compressor(app, min_size=1024)
+
+    with app.test_request_context('/api/tasks', headers={'Accept-Encoding': 'gzip'}):
+        response = compressor.after_request(Response('{"ok":true}', mimetype='application/json'))
+
+    assert 'Content-Encoding' not in response.headers
+    assert response.get_data() == b'{"ok":true}'
@@ -0,0 +1,103 @@
+# backend/tests/test_file_serving.py
+import io
+import os
+
+import pytest
+
+from config import Config
+
+DATA = b'%PDF-1.4 attachment bytes'
+
+
+@pytest.fixture
+def attachment(app_module, db, make_user):
+    """A stored blob attached to a task owned by 'Owner'; returns (owner_id, owner headers, url, sha256)"""
+    owner_id, headers = make_user('Owner')
+    task_id = db.tasks.insert_one({'userId': owner_id, 'title': 't', 'attachments': [], 'sharedWith': []}).inserted_id
+    sha256, size = app_module.blob_store.put_stream(io.BytesIO(DATA))
+    entry = app_module.attach_to_task(owner_id, task_id, 'report.pdf', sha256, size)
+    return owner_id, headers, entry['url'], sha256
+
+
+def test_owner_gets_the_file_with_a_private_immutable_cache(client, attachment):
+    _, headers, url, sha256 = attachment
+
+    response = client.get(url, headers=headers)
+
+    assert response.status_code == 200
+    assert response.get_data() == DATA
+    assert response.get_etag() == (sha256, False)
+    assert response.headers['Cache-Control'] == 'private, max-age=31536000, immutable'
+
+
+def test_token_may_be_passed_in_the_url(app_module, client, attachment):
+    owner_id, _, url, _ = attachment
+
+    response = client.get(f'{url}?token={app_module.generate_token(owner_id)}')
+
+    assert response.status_code == 200
+
+
+def test_files_need_a_token_and_a_task_the_user_can_read(client, db, make_user, attachment):
+    owner_id, _, url, _ = attachment
+    member_id, member_headers = make_user('Member')
+    _, stranger_headers = make_user('Stranger')
+
+    assert client.get(url).status_code == 401
+    assert client.get(url, headers=stranger_headers).status_code == 404
+    db.tasks.update_one({'userId': owner_id}, {'$push': {'sharedWith': member_id}})
+    assert client.get(url, headers=member_headers).status_code == 200
+
+
+def test_range_request_gets_a_partial_response(client, attachment):
+    _, headers, url, _ = attachment
+
+    response = client.get(url, headers={**headers, 'Range': 'bytes=0-3'})
+
+    assert response.status_code == 206
+    assert response.get_data() == DATA[:4]
+
+
+def test_x_accel_mode_hands_the_body_to_nginx(app_module, client, attachment, monkeypatch):
+    monkeypatch.setattr(Config, 'FILE_SERVING_MODE', 'x-accel')
+    monkeypatch.setattr(Config, 'X_ACCEL_ROOT', os.getcwd())
+    _, headers, url, sha256 = attachment
+
+    response = client.get(url, headers=headers)
+
+    relative = os.path.relpath(app_module.blob_store.path_for(sha256), os.getcwd()).replace(os.sep, '/')
+    assert response.headers['X-Accel-Redirect'] == f'/protected-files/{relative}'
+    assert response.get_data() == b''
+    assert response.mimetype == 'application/pdf'
+
+
+def test_x_sendfile_mode_sets_the_header(app_module, client, attachment, monkeypatch):
+    monkeypatch.setitem(app_module.app.config, 'USE_X_SENDFILE', True)
+    _, headers, url, sha256 = attachment
+
+    response = client.get(url, headers=headers)
+
+    assert response.headers['X-Sendfile'] == os.path.abspath(app_module.blob_store.path_for(sha256))
+
+
+def test_thumbnails_follow_the_attachment(app_module, client, make_user, attachment):
+    _, headers, _, sha256 = attachment
+    _, stranger_headers = make_user('Stranger')
+    name = f'{sha256}_64.webp'
+    os.makedirs(app_module.thumbnail_dir(sha256), exist_ok=True)
+    with open(os.path.join(app_module.thumbnail_dir(sha256), name), 'wb') as f:
+        f.write(b'webp')
+
+    assert client.get(f'/uploads/thumbs/{name}', headers=headers).get_data() == b'webp'
+    assert client.get(f'/uploads/thumbs/{name}', headers=stranger_headers).status_code == 404
+
+
+def test_profile_photos_are_only_served_to_their_owner(app_module, client, make_user):
+    user_id, headers = make_user('Owner')
+    _, other_headers = make_user('Other')
+    name = f'profile_{user_id}_0123456789abcdef.png'
+    with open(os.path.join(app_module.app.config['PROFILE_UPLOAD_FOLDER'], name), 'wb') as f:
+        f.write(b'png')
+
+    assert client.get(f'/profile_photos/{name}', headers=headers).get_data() == b'png'
+    assert client.get(f'/profile_photos/{name}', headers=other_headers).status_code == 404
@@ -0,0 +1,78 @@
+# backend/tests/test_idempotency.py
+from datetime import datetime, timedelta
+
+NEW_TASK = {
+    'title': 'Write report',
+    'dueDate': '2030-01-01',
+    'priority': 'high',
+    'category': 'work',
+    'status': 'pending'
+}
+
+
+def create(client, headers, key):
+    return client.post('/api/tasks', json=NEW_TASK, headers={**headers, 'Idempotency-Key': key})
+
+
+def test_repeated_key_replays_the_first_response(client, db, make_user):
+    user_id, headers = make_user()
+
+    first = create(client, headers, 'key-1')
+    second = create(client, headers, 'key-1')
+
+    assert first.status_code == second.status_code
+    assert second.headers['Idempotent-Replayed'] == 'true'
+    assert second.get_json() == first.get_json()
+    assert db.tasks.count_documents({'userId': user_id}) == 1
+
+
+def test_key_reused_for_another_endpoint_is_rejected(client, make_user):
+    _, headers = make_user()
+    create(client, headers, 'key-1')
+
+    response = client.post('/api/tasks/bulk', json={'operations': [{'op': 'create', 'task': NEW_TASK}]},
+                           headers={**headers, 'Idempotency-Key': 'key-1'})
+
+    assert response.status_code == 422
+
+
+def test_key_in_progress_is_a_conflict(client, db, make_user):
+    user_id, headers = make_user()
+    db.idempotency_keys.insert_one({
+        '_id': f'{user_id}:key-1', 'request': 'POST /api/tasks', 'status': 'processing',
+        'createdAt': datetime.utcnow(), 'owner': 'other', 'lockedUntil': datetime.utcnow() + timedelta(minutes=1)
+    })
+
+    assert create(client, headers, 'key-1').status_code == 409
+    assert db.tasks.count_documents({}) == 0
+
+
+def test_abandoned_key_is_taken_over_after_its_lease(client, db, make_user):
+    user_id, headers = make_user()
+    db.idempotency_keys.insert_one({
+        '_id': f'{user_id}:key-1', 'request': 'POST /api/tasks', 'status': 'processing',
+        'createdAt': datetime.utcnow() - timedelta(minutes=5), 'owner': 'crashed',
+        'lockedUntil': datetime.utcnow() - timedelta(seconds=1)
+    })
+
+    response = create(client, headers, 'key-1')
+
+    assert response.status_code in (200, 201)
+    record = db.idempotency_keys.find_one({'_id': f'{user_id}:key-1'})
+    assert record['status'] == 'completed'
+    assert create(client, headers, 'key-1').headers['Idempotent-Replayed'] == 'true'
+    assert db.tasks.count_documents({'userId': user_id}) == 1
+
+
+def test_server_error_frees_the_key(app_module, client, db, make_user, monkeypatch):
+    user_id, headers = make_user()
+
+    def fail(*args, **kwargs):
+        raise RuntimeError('database down')
+
+    monkeypatch.setattr(app_module.tasks_collection, 'insert_one', fail)
+    assert create(client, headers, 'key-1').status_code == 500
+    monkeypatch.undo()
+
+    assert db.idempotency_keys.count_documents({}) == 0
+    assert create(client, headers, 'key-1').status_code in (200, 201)
@@ -0,0 +1,37 @@
+# backend/tests/test_image_variants.py
+import os
+
+from services.image_variants import remove_variants
+
+
+def touch(folder, *names):
+    for name in names:
+        (folder / name).write_bytes(b'x')
+
+
+def test_remove_variants_only_removes_rendered_names(tmp_path):
+    touch(tmp_path, 'profile_u.jpg', 'profile_u_32.webp', 'profile_u_32.jpeg',
+          'profile_u_0123456789abcdef.jpg', 'profile_u_0123456789abcdef_32.webp')
+
+    remove_variants(tmp_path, 'profile_u', [32, 64])
+
+    assert sorted(os.listdir(tmp_path)) == [
+        'profile_u.jpg', 'profile_u_0123456789abcdef.jpg', 'profile_u_0123456789abcdef_32.webp'
+    ]
+
+
+def test_replacing_a_legacy_photo_keeps_the_new_one(app_module, db):
+    folder = app_module.app.config['PROFILE_UPLOAD_FOLDER']
+    uid = '0123456789abcdef01234567'
+    new_photo = f'profile_{uid}_1234567890123456.jpg'
+    new_variant = f'profile_{uid}_1234567890123456_64.webp'
+    for name in (f'profile_{uid}.jpg', f'profile_{uid}_64.webp', new_photo, new_variant):
+        with open(os.path.join(folder, name), 'wb') as f:
+            f.write(b'x')
+
+    app_module.remove_profile_photo_files(f'/profile_photos/profile_{uid}.jpg')
+
+    remaining = set(os.listdir(folder))
+    assert {new_photo, new_variant} <= remaining
+    assert f'profile_{uid}.jpg' not in remaining
+    assert f'profile_{uid}_64.webp' not in remaining
@@ -0,0 +1,51 @@
+# backend/tests/test_json_stream.py
+from datetime import datetime
+import json
+
+from bson import ObjectId
+import pytest
+
+from services.json_stream import stream_json
+
+
+def decode(chunks):
+    return json.loads(b''.join(chunks))
+
+
+def test_batches_splice_into_one_document():
+    task_id = ObjectId()
+    items = [{'_id': task_id, 'n': i, 'due': datetime(2026, 5, 1)} for i in range(5)]
+
+    chunks = list(stream_json({'success': True}, 'tasks', iter(items), batch_size=2))
+
+    # Head with the first batch, two more batches, then the closing count
+    assert len(chunks) == 4
+    body = decode(chunks)
+    assert body['success'] is True and body['count'] == 5
+    assert [t['n'] for t in body['tasks']] == [0, 1, 2, 3, 4]
+    assert body['tasks'][0]['_id'] == str(task_id)
+    assert body['tasks'][0]['due'] == '2026-05-01T00:00:00'
+
+
+@pytest.mark.parametrize('envelope', [{}, {'success': True}])
+def test_empty_list(envelope):
+    assert decode(stream_json(envelope, 'tasks', [])) == {**envelope, 'tasks': [], 'count': 0}
+
+
+def test_first_batch_errors_raise_before_streaming_starts():
+    def cursor():
+        yield {'ok': 1}
+        yield {'bad': object()}
+
+    with pytest.raises(TypeError):
+        stream_json({'success': True}, 'tasks', cursor())
+
+
+def test_task_list_encoding_error_is_a_500(app_module, client, db, make_user):
+    user_id, headers = make_user()
+    db.tasks.insert_one({'userId': user_id, 'title': 'bad', 'dueDate': datetime(2026, 5, 1), 'description': b'\x00'})
+
+    response = client.get('/api/tasks', headers=headers)
+
+    assert response.status_code == 500
+    assert response.get_json()['success'] is False
@@ -0,0 +1,89 @@
+# backend/tests/test_leader_scheduler.py
+from datetime import datetime, timedelta
+
+import mongomock
+import pytest
+
+from services.leader_scheduler import LeaderScheduler, period_start
+
+
+@pytest.fixture
+def mongo_db():
+    return mongomock.MongoClient().db
+
+
+def make_scheduler(db, calls, period='daily'):
+    scheduler = LeaderScheduler(db, lease_seconds=60)
+    scheduler.add_cron_job('job', lambda: calls.append(scheduler.instance_id), period=period, hour=8, minute=0)
+    return scheduler
+
+
+def test_only_one_process_holds_the_lease_until_it_expires(mongo_db):
+    first, second = LeaderScheduler(mongo_db), LeaderScheduler(mongo_db)
+
+    assert first._try_acquire() is True
+    assert second._try_acquire() is False
+    assert first._try_acquire() is True  # renewal
+
+    mongo_db.scheduler_leases.update_one({}, {'$set': {'expiresAt': datetime.utcnow() - timedelta(seconds=1)}})
+    assert second._try_acquire() is True
+    assert first._try_acquire() is False
+
+
+def test_a_period_runs_once_across_leaders(mongo_db):
+    calls = []
+    first, second = make_scheduler(mongo_db, calls), make_scheduler(mongo_db, calls)
+    first.is_leader = second.is_leader = True  # e.g. a stalled former leader still firing
+    morning = datetime(2026, 6, 1, 8, 0)
+
+    first._run_job('job', morning)
+    second._run_job('job', morning + timedelta(minutes=5))
+    first._run_job('job', morning + timedelta(days=1))
+
+    assert calls == [first.instance_id, first.instance_id]
+    assert sorted(run['periodKey'] for run in mongo_db.job_runs.find()) == ['2026-06-01', '2026-06-02']
+
+
+def test_non_leader_does_not_run(mongo_db):
+    calls = []
+    scheduler = make_scheduler(mongo_db, calls)
+
+    scheduler._run_job('job', datetime(2026, 6, 1, 8, 0))
+
+    assert calls == [] and mongo_db.job_runs.count_documents({}) == 0
+
+
+def test_failed_run_is_retried_in_the_same_period(mongo_db):
+    calls = []
+    scheduler = make_scheduler(mongo_db, calls)
+    scheduler.is_leader = True
+    scheduler._jobs['job']['func'] = lambda: 1 / 0
+    scheduler._run_job('job', datetime(2026, 6, 1, 8, 0))
+    assert mongo_db.job_runs.find_one()['status'] == 'failed'
+
+    scheduler._jobs['job']['func'] = lambda: calls.append('retry')
+    scheduler._run_job('job', datetime(2026, 6, 1, 9, 0))
+
+    run = mongo_db.job_runs.find_one()
+    assert calls == ['retry']
+    assert (run['status'], run['attempts']) == ('succeeded', 1)
+
+
+def test_weekly_runs_are_keyed_by_iso_week(mongo_db):
+    calls = []
+    scheduler = make_scheduler(mongo_db, calls, period='weekly')
+    scheduler.is_leader = True
+
+    # Monday and Sunday of ISO week 2027-W52, then the Monday after
+    for day in (datetime(2027, 12, 27, 9), datetime(2028, 1, 2, 9), datetime(2028, 1, 3, 9)):
+        scheduler._run_job('job', day)
+
+    assert len(calls) == 2
+    assert sorted(run['periodKey'] for run in mongo_db.job_runs.find()) == ['2027-W52', '2028-W01']
+
+
+def test_period_start():
+    now = datetime(2026, 6, 4, 15, 30)  # a Thursday
+
+    assert period_start('daily', now) == datetime(2026, 6, 4)
+    assert period_start('weekly', now) == datetime(2026, 6, 1)
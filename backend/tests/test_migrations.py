@@ -0,0 +1,78 @@
+# backend/tests/test_migrations.py
+from datetime import datetime
+import importlib.util
+import os
+
+from bson import ObjectId
+import mongomock
+
+MIGRATIONS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'migrations')
+
+
+def load_migration(name):
+    spec = importlib.util.spec_from_file_location(name, os.path.join(MIGRATIONS, f'{name}.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_split_comments_keeps_comments_added_after_deploy():
+    migration = load_migration('split_comments_activity')
+    db = mongomock.MongoClient().db
+    task_id = db.tasks.insert_one({
+        'title': 'Old task',
+        'comments': [
+            {'userId': 'u1', 'userName': 'Ann', 'text': 'first', 'timestamp': '2024-01-01T10:00:00'},
+            {'userId': 'u1', 'userName': 'Ann', 'text': 'second', 'timestamp': '2024-01-02T10:00:00'}
+        ],
+        'activity': [{'action': 'created', 'timestamp': '2024-01-01T09:00:00'}],
+        # A comment added through the new code before the migration ran
+        'recentComments': [{'userId': 'u2', 'userName': 'Bob', 'text': 'new', 'timestamp': '2024-02-01T10:00:00'}],
+        'commentCount': 1
+    }).inserted_id
+    db.comments.insert_one({'taskId': task_id, 'userId': 'u2', 'userName': 'Bob', 'text': 'new',
+                            'timestamp': datetime(2024, 2, 1, 10)})
+
+    migration.migrate_task(db, db.tasks.find_one({'_id': task_id}))
+
+    task = db.tasks.find_one({'_id': task_id})
+    assert task['commentCount'] == 3
+    assert [c['text'] for c in task['recentComments']] == ['first', 'second', 'new']
+    assert 'comments' not in task and 'activity' not in task
+    assert db.comments.count_documents({'taskId': task_id}) == 3
+    assert db.activity.count_documents({'taskId': task_id}) == 1
+
+
+def test_blob_store_migration_keeps_legacy_file_when_task_changed(tmp_path):
+    migration = load_migration('attachments_to_blob_store')
+    db = mongomock.MongoClient().db
+    uploads = tmp_path / 'uploads'
+    uploads.mkdir()
+    (uploads / 'old.txt').write_bytes(b'legacy')
+    store = migration.BlobStore(db.attachment_blobs, str(uploads / 'blobs'))
+    attachments = [{'filename': 'old.txt', 'saved_as': 'old.txt', 'url': '/uploads/old.txt'}]
+    task_id = db.tasks.insert_one({'attachments': attachments}).inserted_id
+    stale = {'_id': task_id, 'attachments': attachments}
+    db.tasks.update_one({'_id': task_id}, {'$push': {'attachments': {'filename': 'new.txt'}}})
+
+    assert migration.convert_task(db, store, str(uploads), stale) == 0
+    assert (uploads / 'old.txt').exists()
+    assert db.attachment_blobs.count_documents({}) == 0
+
+    assert migration.convert_task(db, store, str(uploads), db.tasks.find_one({'_id': task_id})) == 1
+    assert not (uploads / 'old.txt').exists()
+    sha = db.tasks.find_one({'_id': task_id})['attachments'][0]['sha256']
+    assert store.exists(sha)
+
+
+def test_sharedwith_migration_converts_strings_and_dedupes():
+    migration = load_migration('sharedwith_objectids')
+    db = mongomock.MongoClient().db
+    member = ObjectId()
+    task_id = db.tasks.insert_one({'title': 't', 'sharedWith': [str(member), member, 'not-an-id']}).inserted_id
+    untouched = db.tasks.insert_one({'title': 'u', 'sharedWith': [member]}).inserted_id
+
+    assert migration.run_pass(db, batch_size=10, pause=0) == 1
+
+    assert db.tasks.find_one({'_id': task_id})['sharedWith'] == [member, 'not-an-id']
+    assert db.tasks.find_one({'_id': untouched})['sharedWith'] == [member]
@@ -0,0 +1,138 @@
+# backend/tests/test_outbox.py
+from contextlib import contextmanager
+from datetime import timedelta
+import smtplib
+
+import mongomock
+
+from services import outbox as outbox_module
+from services.outbox import EmailOutbox, SharedRateLimiter
+
+
+class FakeSMTP:
+    def __init__(self, refuse=(), disconnect_on=None):
+        self.refuse = set(refuse)
+        self.disconnect_on = disconnect_on
+        self.sent = []
+
+    def send_message(self, msg):
+        if msg['To'] == self.disconnect_on:
+            raise smtplib.SMTPServerDisconnected('Connection unexpectedly closed')
+        if msg['To'] in self.refuse:
+            raise smtplib.SMTPRecipientsRefused({msg['To']: (550, b'No such user')})
+        self.sent.append(msg['To'])
+
+
+class FakePool:
+    def __init__(self, smtp):
+        self.smtp = smtp
+
+    @contextmanager
+    def connection(self):
+        yield self.smtp
+
+
+def make_outbox(smtp):
+    collection = mongomock.MongoClient().db.email_outbox
+    return EmailOutbox(collection, FakePool(smtp), 'noreply@example.com', workers=0), collection
+
+
+def enqueue_and_deliver(outbox, recipients):
+    for recipient in recipients:
+        outbox.enqueue(recipient, 'Subject', 'Body')
+    outbox._deliver(outbox._claim_batch())
+
+
+def test_refused_recipient_only_costs_its_own_message():
+    smtp = FakeSMTP(refuse={'bad@example.com'})
+    outbox, collection = make_outbox(smtp)
+
+    enqueue_and_deliver(outbox, ['a@example.com', 'bad@example.com', 'b@example.com'])
+
+    assert smtp.sent == ['a@example.com', 'b@example.com']
+    bad = collection.find_one({'to': 'bad@example.com'})
+    assert bad['status'] == 'pending' and bad['attempts'] == 1
+    assert collection.count_documents({'status': 'sent'}) == 2
+
+
+def test_dropped_connection_retries_the_rest_of_the_batch():
+    smtp = FakeSMTP(disconnect_on='b@example.com')
+    outbox, collection = make_outbox(smtp)
+
+    enqueue_and_deliver(outbox, ['a@example.com', 'b@example.com', 'c@example.com'])
+
+    assert collection.find_one({'to': 'a@example.com'})['status'] == 'sent'
+    for recipient in ('b@example.com', 'c@example.com'):
+        doc = collection.find_one({'to': recipient})
+        assert doc['status'] == 'pending' and doc['attempts'] == 1
+
+
+def test_message_fails_for_good_after_max_attempts():
+    smtp = FakeSMTP(refuse={'bad@example.com'})
+    outbox, collection = make_outbox(smtp)
+    outbox.max_attempts = 1
+
+    enqueue_and_deliver(outbox, ['bad@example.com'])
+
+    assert collection.find_one({'to': 'bad@example.com'})['status'] == 'failed'
+
+
+def test_failed_sent_write_does_not_send_again():
+    smtp = FakeSMTP()
+    outbox, collection = make_outbox(smtp)
+    outbox.enqueue('a@example.com', 'Subject', 'Body')
+    batch = outbox._claim_batch()
+
+    def mongo_blip(doc):
+        raise ConnectionError('primary stepped down')
+    outbox._mark_sent = mongo_blip
+    outbox._deliver(batch)
+
+    # Still claimed, not rescheduled as a failed attempt
+    doc = collection.find_one({'to': 'a@example.com'})
+    assert smtp.sent == ['a@example.com']
+    assert doc['status'] == 'sending' and doc['attempts'] == 0
+    assert outbox._claim_batch() == []
+
+
+def test_stale_worker_cannot_overwrite_a_reclaimed_message():
+    smtp = FakeSMTP(refuse={'a@example.com'})
+    outbox, collection = make_outbox(smtp)
+    outbox.enqueue('a@example.com', 'Subject', 'Body')
+    stale = outbox._claim_batch()
+    # The first claim expired and another worker took the message over and sent it
+    collection.update_one({}, {'$set': {'lockedUntil': stale[0]['lockedUntil'] - timedelta(minutes=10)}})
+    fresh = outbox._claim_batch()
+    outbox._mark_sent(fresh[0])
+
+    outbox._deliver(stale)
+
+    doc = collection.find_one({'to': 'a@example.com'})
+    assert doc['status'] == 'sent' and doc['attempts'] == 1
+    assert outbox.counters['retried'] == 0
+
+
+def test_shared_rate_limit_holds_across_processes(monkeypatch):
+    collection = mongomock.MongoClient().db.mail_rate_limits
+    # Two limiters on one collection stand in for two gunicorn workers
+    workers = [SharedRateLimiter(collection, 'smtp.example.com:587', rate_per_second=3) for _ in range(2)]
+    clock = {'now': 1000.0}
+    sleeps = []
+    monkeypatch.setattr(outbox_module.time, 'time', lambda: clock['now'])
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        clock['now'] += seconds
+    monkeypatch.setattr(outbox_module.time, 'sleep', sleep)
+
+    for i in range(4):
+        workers[i % 2].acquire()
+
+    # Three sends fit in the first second; the fourth waited for the next window
+    assert sleeps == [1.0]
+
+
+def test_slow_rates_get_longer_windows():
+    limiter = SharedRateLimiter(mongomock.MongoClient().db.limits, 'smtp', rate_per_second=0.25)
+
+    assert (limiter.window, limiter.limit) == (4.0, 1)
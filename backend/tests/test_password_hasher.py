@@ -0,0 +1,87 @@
+# backend/tests/test_password_hasher.py
+import threading
+
+import bcrypt
+import pytest
+
+from services import password_hasher as module
+from services.password_hasher import PasswordHasher, PasswordHasherBusy, hash_rounds
+
+
+@pytest.fixture
+def blocked_bcrypt(monkeypatch):
+    """Make hashpw wait for release; returns (started, release) events"""
+    started, release = threading.Event(), threading.Event()
+    real = bcrypt.hashpw
+
+    def hashpw(*args):
+        started.set()
+        release.wait(5)
+        return real(*args)
+
+    monkeypatch.setattr(module.bcrypt, 'hashpw', hashpw)
+    yield started, release
+    release.set()
+
+
+def test_hash_and_verify():
+    hasher = PasswordHasher(rounds=4, workers=1)
+
+    hashed = hasher.hash('secret')
+
+    assert hash_rounds(hashed) == 4
+    assert hasher.verify('secret', hashed) is True
+    assert hasher.verify('wrong', hashed) is False
+    assert not hasher.needs_rehash(hashed)
+    assert PasswordHasher(rounds=5).needs_rehash(hashed)
+    assert hasher.stats()['hashed'] == 1 and hasher.stats()['verified'] == 2
+
+
+def test_full_queue_rejects_without_waiting(blocked_bcrypt):
+    hasher = PasswordHasher(rounds=4, workers=1, max_queue=0, timeout=5)
+    busy = threading.Thread(target=hasher.hash, args=('first',))
+    started, release = blocked_bcrypt
+    busy.start()
+    started.wait(5)
+
+    with pytest.raises(PasswordHasherBusy):
+        hasher.hash('second')
+
+    release.set()
+    busy.join()
+    assert hasher.stats()['rejected'] == 1
+    # The slot comes back once the running hash finishes
+    assert hasher.verify('x', hasher.hash('x'))
+
+
+def test_slow_hash_times_out(blocked_bcrypt):
+    hasher = PasswordHasher(rounds=4, workers=1, timeout=0.05)
+
+    with pytest.raises(PasswordHasherBusy):
+        hasher.hash('secret')
+
+    assert hasher.stats()['timedOut'] == 1
+
+
+def test_login_upgrades_the_hash_cost(client, db):
+    old = bcrypt.hashpw(b'secret1', bcrypt.gensalt(rounds=5))
+    db.users.insert_one({'name': 'A', 'email': 'a@example.com', 'password': old})
+
+    response = client.post('/api/auth/login', json={'email': 'a@example.com', 'password': 'secret1'})
+
+    assert response.status_code == 200
+    stored = db.users.find_one({'email': 'a@example.com'})['password']
+    assert hash_rounds(stored) == 4 and bcrypt.checkpw(b'secret1', stored)
+
+
+def test_busy_hasher_answers_503(app_module, client, db, monkeypatch):
+    db.users.insert_one({'name': 'A', 'email': 'a@example.com', 'password': b'$2b$04$x'})
+
+    def busy(*args):
+        raise PasswordHasherBusy('full')
+
+    monkeypatch.setattr(app_module.password_hasher, 'verify', busy)
+    response = client.post('/api/auth/login', json={'email': 'a@example.com', 'password': 'secret1'})
+
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '1'
@@ -0,0 +1,67 @@
+# backend/tests/test_reminders.py
+from datetime import datetime
+
+from bson import ObjectId
+import mongomock
+
+from services import reminders
+from services.reminders import build_reminder_email, due_tomorrow_window, iter_due_reminders
+
+
+def test_window_covers_all_of_tomorrow():
+    start, end = due_tomorrow_window(datetime(2026, 5, 31, 22, 15))
+
+    assert start == datetime(2026, 6, 1, 0, 0, 0)
+    assert end == datetime(2026, 6, 1, 23, 59, 59)
+
+
+reminders_pipeline = reminders.due_reminders_pipeline
+
+
+def mongomock_pipeline(start, end):
+    # mongomock has no $substrCP; $substr cuts the same on ASCII text
+    pipeline = reminders_pipeline(start, end)
+    description = pipeline[2]['$group']['tasks']['$push']['description']
+    description['$substr'] = description.pop('$substrCP')
+    return pipeline
+
+
+def test_groups_open_tasks_due_in_the_window_per_user(monkeypatch):
+    monkeypatch.setattr(reminders, 'due_reminders_pipeline', mongomock_pipeline)
+    db = mongomock.MongoClient().db
+    ann, bob, ghost = ObjectId(), ObjectId(), ObjectId()
+    db.users.insert_many([
+        {'_id': ann, 'name': 'Ann', 'email': 'ann@example.com'},
+        {'_id': bob, 'name': 'Bob'}
+    ])
+    start, end = datetime(2026, 6, 1), datetime(2026, 6, 1, 23, 59, 59)
+    db.tasks.insert_many([
+        {'userId': ann, 'title': 'late', 'priority': 'low', 'dueDate': datetime(2026, 6, 1, 18), 'status': 'pending'},
+        {'userId': ann, 'title': 'early', 'priority': 'high', 'dueDate': datetime(2026, 6, 1, 9), 'status': 'in-progress',
+         'description': 'x' * 150},
+        {'userId': ann, 'title': 'done', 'priority': 'low', 'dueDate': datetime(2026, 6, 1, 9), 'status': 'completed'},
+        {'userId': ann, 'title': 'next week', 'priority': 'low', 'dueDate': datetime(2026, 6, 8), 'status': 'pending'},
+        # No email, and no user at all: neither gets a reminder
+        {'userId': bob, 'title': 'bob', 'priority': 'low', 'dueDate': datetime(2026, 6, 1, 9), 'status': 'pending'},
+        {'userId': ghost, 'title': 'ghost', 'priority': 'low', 'dueDate': datetime(2026, 6, 1, 9), 'status': 'pending'}
+    ])
+
+    groups = list(iter_due_reminders(db, start, end))
+
+    assert len(groups) == 1
+    group = groups[0]
+    assert (group['name'], group['email']) == ('Ann', 'ann@example.com')
+    assert [task['title'] for task in group['tasks']] == ['early', 'late']
+    assert len(group['tasks'][0]['description']) == 100
+
+
+def test_reminder_email_lists_each_task():
+    subject, body = build_reminder_email({
+        'name': 'Ann',
+        'tasks': [{'title': 'early', 'priority': 'high', 'description': 'Bring slides'},
+                  {'title': 'late', 'priority': 'low', 'description': ''}]
+    })
+
+    assert 'Due Tomorrow' in subject
+    assert body.startswith('Hi Ann,')
+    assert '• early (Priority: high)\n  Bring slides...\n• late (Priority: low)\n' in body
@@ -0,0 +1,174 @@
+# backend/tests/test_report_jobs.py
+from concurrent.futures import Future
+from datetime import datetime, timedelta
+import os
+
+from bson import ObjectId
+import mongomock
+import pytest
+
+from config import Config
+from services.report_jobs import ReportJobs
+
+
+class ImmediateExecutor:
+    """Runs nothing; each submit returns a future already holding `result` (or raising it)"""
+
+    def __init__(self, result=3):
+        self.result = result
+        self.submitted = []
+
+    def submit(self, func, *args):
+        self.submitted.append(args)
+        future = Future()
+        if isinstance(self.result, Exception):
+            future.set_exception(self.result)
+        else:
+            # The worker would have written the file by now
+            with open(args[-2], 'wb') as f:
+                f.write(b'pdf')
+            future.set_result(self.result)
+        return future
+
+
+@pytest.fixture
+def jobs(tmp_path, monkeypatch):
+    jobs = ReportJobs(mongomock.MongoClient().db.report_jobs, str(tmp_path), 'mongodb://unused', 'db')
+    jobs.executor = ImmediateExecutor()
+    monkeypatch.setattr(jobs, '_executor', lambda: jobs.executor)
+    return jobs
+
+
+def test_unchanged_report_is_a_cache_hit(jobs):
+    user_id = ObjectId()
+
+    first = jobs.start(user_id, 'pdf', {'tasks': 1})
+    again = jobs.start(user_id, 'pdf', {'tasks': 1})
+
+    assert first['_id'] == again['_id']
+    assert again['status'] == 'done' and again['size'] == 3
+    assert len(jobs.executor.submitted) == 1
+    assert jobs.stats()['cacheHits'] == 1 and jobs.stats()['rendered'] == 1
+
+
+def test_a_data_change_renders_again_and_drops_the_old_report(jobs):
+    user_id = ObjectId()
+    old = jobs.start(user_id, 'pdf', {'tasks': 1})
+
+    new = jobs.start(user_id, 'pdf', {'tasks': 2})
+
+    assert new['_id'] != old['_id']
+    assert jobs.collection.count_documents({}) == 1
+    assert not os.path.exists(jobs.path_for(old))
+
+
+def test_missing_file_or_stale_job_is_started_again(jobs):
+    user_id = ObjectId()
+    job = jobs.start(user_id, 'pdf', {})
+    os.remove(jobs.path_for(job))
+    jobs.start(user_id, 'pdf', {})
+    jobs.collection.update_one({'_id': job['_id']}, {'$set': {
+        'status': 'running', 'createdAt': datetime.utcnow() - timedelta(minutes=jobs.stale_minutes + 1)
+    }})
+
+    jobs.start(user_id, 'pdf', {})
+
+    assert len(jobs.executor.submitted) == 3
+
+
+def test_a_failed_render_is_recorded(jobs):
+    jobs.executor.result = RuntimeError('boom')
+
+    job = jobs.start(ObjectId(), 'xlsx', {})
+
+    stored = jobs.collection.find_one({'_id': job['_id']})
+    assert stored['status'] == 'failed' and stored['error'] == 'boom'
+    assert jobs.stats()['failed'] == 1
+
+
+def test_describe_reports_progress(jobs):
+    job = {'_id': 'j', 'format': 'pdf', 'status': 'running', 'done': 250, 'total': 1000,
+           'createdAt': datetime(2026, 5, 1)}
+
+    described = jobs.describe(job)
+
+    assert described['progress'] == 0.25
+    assert jobs.describe({**job, 'status': 'done'})['progress'] == 1.0
+    assert jobs.describe({**job, 'total': None})['progress'] is None
+
+
+def test_cleanup_removes_reports_nobody_fetched(jobs):
+    user_id = ObjectId()
+    kept = jobs.start(user_id, 'pdf', {})
+    dropped = jobs.start(user_id, 'xlsx', {})
+    jobs.collection.update_one({'_id': dropped['_id']}, {'$set': {'lastAccessedAt': datetime(2020, 1, 1)}})
+
+    assert jobs.cleanup() == 1
+    assert os.path.exists(jobs.path_for(kept))
+    assert not os.path.exists(jobs.path_for(dropped))
+
+
+# ---------- routes ----------
+
+def insert_job(app_module, user_id, status, **fields):
+    job = {'_id': str(ObjectId()), 'userId': user_id, 'format': 'pdf', 'status': status,
+           'done': 0, 'total': 10, 'createdAt': datetime.utcnow(), **fields}
+    app_module.report_jobs.collection.insert_one(job)
+    return job
+
+
+def test_format_without_workers_is_unavailable(client, make_user):
+    _, headers = make_user()
+
+    assert client.post('/api/reports', json={'format': 'pdf'}, headers=headers).status_code == 501
+    assert client.post('/api/reports', json={'format': 'doc'}, headers=headers).status_code == 400
+
+
+def test_event_stream_ends_with_the_final_state(app_module, client, make_user):
+    user_id, headers = make_user()
+    job = insert_job(app_module, user_id, 'done', done=10, size=3)
+
+    response = client.get(f"/api/reports/{job['_id']}/events", headers=headers)
+
+    assert response.mimetype == 'text/event-stream'
+    assert response.headers['X-Accel-Buffering'] == 'no'
+    body = response.get_data(as_text=True)
+    assert body.startswith('event: done\n')
+    assert f"/api/reports/{job['_id']}/download" in body
+
+
+def test_event_stream_sends_progress_until_its_deadline(app_module, client, make_user, monkeypatch):
+    monkeypatch.setattr(Config, 'REPORT_EVENTS_SECONDS', 0)
+    user_id, headers = make_user()
+    job = insert_job(app_module, user_id, 'running', done=4)
+
+    body = client.get(f"/api/reports/{job['_id']}/events", headers=headers).get_data(as_text=True)
+
+    assert body.count('event: progress\n') == 1
+    assert '"progress": 0.4' in body
+
+
+def test_reports_belong_to_their_user(app_module, client, make_user):
+    owner, _ = make_user('Owner')
+    _, other_headers = make_user('Other')
+    job = insert_job(app_module, owner, 'done')
+
+    assert client.get(f"/api/reports/{job['_id']}", headers=other_headers).status_code == 404
+    assert client.get(f"/api/reports/{job['_id']}/events", headers=other_headers).status_code == 404
+    assert client.get(f"/api/reports/{job['_id']}/download", headers=other_headers).status_code == 404
+
+
+def test_download_waits_for_the_job_then_serves_the_file(app_module, client, make_user):
+    user_id, headers = make_user()
+    job = insert_job(app_module, user_id, 'running')
+
+    assert client.get(f"/api/reports/{job['_id']}/download", headers=headers).status_code == 409
+
+    app_module.report_jobs.collection.update_one({'_id': job['_id']}, {'$set': {'status': 'done'}})
+    with open(app_module.report_jobs.path_for(job), 'wb') as f:
+        f.write(b'%PDF')
+    response = client.get(f"/api/reports/{job['_id']}/download", headers=headers)
+
+    assert response.status_code == 200
+    assert response.get_data() == b'%PDF'
+    assert response.headers['Content-Disposition'] == 'attachment; filename=tasks_report.pdf'
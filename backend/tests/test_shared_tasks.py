@@ -0,0 +1,55 @@
+# backend/tests/test_shared_tasks.py
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+
+
+def share(db, owner_id, member_id, title, due):
+    return db.tasks.insert_one({
+        'userId': owner_id, 'title': title, 'dueDate': due, 'status': 'pending', 'sharedWith': [member_id]
+    }).inserted_id
+
+
+def test_shared_feed_pages_by_due_date_with_owner_names(client, db, make_user):
+    member, headers = make_user('Member')
+    alice, _ = make_user('Alice')
+    bob, _ = make_user('Bob')
+    due = datetime(2026, 5, 1)
+    expected = [share(db, (alice, bob)[i % 2], member, f'task {i}', due + timedelta(days=i // 2)) for i in range(5)]
+    share(db, alice, ObjectId(), 'not shared with me', due)
+
+    ids, owners, cursor = [], [], None
+    while True:
+        url = '/api/tasks/shared?limit=2' + (f'&cursor={cursor}' if cursor else '')
+        body = client.get(url, headers=headers).get_json()
+        assert len(body['tasks']) <= 2
+        ids += [task['_id'] for task in body['tasks']]
+        owners += [task['sharedBy'] for task in body['tasks']]
+        if not body['hasMore']:
+            break
+        cursor = body['next']
+
+    assert ids == [str(task_id) for task_id in expected]
+    assert owners == ['Alice', 'Bob', 'Alice', 'Bob', 'Alice']
+
+
+def test_shared_feed_rejects_a_bad_cursor(client, make_user):
+    _, headers = make_user()
+
+    assert client.get('/api/tasks/shared?cursor=nope', headers=headers).status_code == 400
+
+
+def test_comment_feed_pages_newest_first(client, db, make_user):
+    user_id, headers = make_user()
+    task_id = db.tasks.insert_one({'userId': user_id, 'title': 't'}).inserted_id
+    start = datetime(2026, 5, 1)
+    db.comments.insert_many([
+        {'taskId': task_id, 'text': str(i), 'timestamp': start + timedelta(minutes=i // 2)} for i in range(5)
+    ])
+
+    first = client.get(f'/api/tasks/{task_id}/comments?limit=3', headers=headers).get_json()
+    second = client.get(f"/api/tasks/{task_id}/comments?limit=3&cursor={first['next']}", headers=headers).get_json()
+
+    texts = [c['text'] for c in first['comments'] + second['comments']]
+    assert sorted(texts) == ['0', '1', '2', '3', '4'] and texts[0] == '4'
+    assert first['hasMore'] is True and second['hasMore'] is False
@@ -0,0 +1,67 @@
+# backend/tests/test_sync.py
+from datetime import datetime, timedelta
+
+from config import Config
+
+
+def sync(client, headers, since=None):
+    url = '/api/sync' if since is None else f'/api/sync?since={since}'
+    return client.get(url, headers=headers).get_json()
+
+
+def insert_task(db, user_id, title, updated_at):
+    return db.tasks.insert_one({'userId': user_id, 'title': title, 'updatedAt': updated_at}).inserted_id
+
+
+def test_first_sync_resets(app_module, client, make_user):
+    _, headers = make_user()
+
+    body = sync(client, headers)
+
+    assert body['reset'] is True and body['token']
+
+
+def test_delta_holds_back_unsettled_changes(app_module, client, db, make_user):
+    user_id, headers = make_user()
+    since = datetime.utcnow() - timedelta(minutes=5)
+    token = app_module.encode_sync_token(since)
+    settled = insert_task(db, user_id, 'settled', datetime.utcnow() - timedelta(minutes=1))
+    insert_task(db, user_id, 'in flight', datetime.utcnow())
+    insert_task(db, user_id, 'before token', since - timedelta(minutes=1))
+
+    body = sync(client, headers, token)
+
+    assert body['reset'] is False
+    assert [t['_id'] for t in body['tasks']] == [str(settled)]
+    # The next token stops where this window ended, so the held-back change comes next time
+    assert app_module.decode_sync_token(body['token']) <= datetime.utcnow() - timedelta(seconds=Config.SYNC_SETTLE_SECONDS)
+
+
+def test_delta_reports_tombstones_for_the_caller_only(app_module, client, db, make_user):
+    user_id, headers = make_user('Me')
+    other, _ = make_user('Other')
+    token = app_module.encode_sync_token(datetime.utcnow() - timedelta(minutes=5))
+    deleted_at = datetime.utcnow() - timedelta(minutes=1)
+    mine = insert_task(db, user_id, 'gone', deleted_at)
+    db.task_tombstones.insert_many([
+        {'taskId': mine, 'userId': user_id, 'deletedAt': deleted_at},
+        {'taskId': insert_task(db, other, 'theirs', deleted_at), 'userId': other, 'deletedAt': deleted_at}
+    ])
+    db.tasks.delete_many({})
+
+    body = sync(client, headers, token)
+
+    assert body['deleted'] == [str(mine)]
+
+
+def test_token_older_than_tombstone_retention_resets(app_module, client, make_user):
+    _, headers = make_user()
+    token = app_module.encode_sync_token(datetime.utcnow() - timedelta(days=Config.TOMBSTONE_RETENTION_DAYS + 1))
+
+    assert sync(client, headers, token)['reset'] is True
+
+
+def test_malformed_token_is_rejected(client, make_user):
+    _, headers = make_user()
+
+    assert client.get('/api/sync?since=not-a-token', headers=headers).status_code == 400
@@ -0,0 +1,65 @@
+# backend/tests/test_task_export.py
+import csv
+from datetime import datetime
+import io
+
+from services.task_export import EXPORT_COLUMNS, stream_csv
+
+
+def read_csv(data):
+    return list(csv.reader(io.StringIO(data.decode('utf-8-sig'))))
+
+
+def test_header_goes_out_before_any_task_is_read():
+    pulled = []
+
+    def tasks():
+        pulled.append(1)
+        yield {'title': 'a'}
+
+    chunks = stream_csv(tasks())
+
+    assert next(chunks) == ('\ufeff' + ','.join(EXPORT_COLUMNS) + '\r\n').encode('utf-8')
+    assert pulled == []
+
+
+def test_rows_are_flushed_in_chunks():
+    tasks = [{'title': f'task {i}', 'description': 'x' * 20, 'dueDate': datetime(2026, 5, 1)} for i in range(10)]
+
+    chunks = list(stream_csv(iter(tasks), chunk_size=100))
+
+    assert len(chunks) > 3
+    assert all(len(chunk) < 200 for chunk in chunks[1:])
+    rows = read_csv(b''.join(chunks))
+    assert [row[0] for row in rows[1:]] == [f'task {i}' for i in range(10)]
+    assert rows[1][2] == '2026-05-01'
+
+
+def test_cells_with_commas_quotes_and_newlines_round_trip():
+    task = {'title': 'a, "b"', 'description': 'line 1\nline 2', 'status': 'pending'}
+
+    rows = read_csv(b''.join(stream_csv([task])))
+
+    assert rows[1][:2] == ['a, "b"', 'line 1\nline 2']
+    assert rows[1][5] == 'pending'
+    assert rows[1][6] == ''
+
+
+def test_export_route_streams_only_the_callers_tasks_by_due_date(client, db, make_user):
+    user_id, headers = make_user()
+    other_id, _ = make_user('Other')
+    db.tasks.insert_many([
+        {'userId': user_id, 'title': 'later', 'dueDate': datetime(2026, 6, 1), 'createdAt': datetime(2026, 4, 1)},
+        {'userId': user_id, 'title': 'sooner', 'dueDate': datetime(2026, 5, 1), 'createdAt': datetime(2026, 4, 1)},
+        {'userId': other_id, 'title': 'not mine', 'dueDate': datetime(2026, 5, 1)},
+    ])
+
+    response = client.get('/api/export/csv', headers=headers)
+
+    assert response.status_code == 200
+    assert response.is_streamed
+    assert response.mimetype == 'text/csv'
+    assert 'tasks_export.csv' in response.headers['Content-Disposition']
+    rows = read_csv(response.get_data())
+    assert rows[0] == EXPORT_COLUMNS
+    assert [row[0] for row in rows[1:]] == ['sooner', 'later']
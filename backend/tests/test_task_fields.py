@@ -0,0 +1,49 @@
+# backend/tests/test_task_fields.py
+from datetime import datetime
+
+
+def insert_task(db, user_id):
+    db.tasks.insert_one({
+        'userId': user_id, 'title': 'Write report', 'description': 'Quarterly',
+        'dueDate': datetime(2026, 5, 1), 'priority': 'high', 'category': 'work', 'status': 'pending',
+        'createdAt': datetime(2026, 4, 1), 'attachments': [{'filename': 'a.pdf'}], 'commentCount': 3
+    })
+
+
+def get_task_keys(client, headers, fields=None):
+    url = '/api/tasks' if fields is None else f'/api/tasks?fields={fields}'
+    body = client.get(url, headers=headers).get_json()
+    return set(body['tasks'][0])
+
+
+def test_default_is_the_summary_fields(client, db, make_user):
+    user_id, headers = make_user()
+    insert_task(db, user_id)
+
+    assert get_task_keys(client, headers) == {
+        '_id', 'title', 'description', 'dueDate', 'priority', 'category', 'status'
+    }
+
+
+def test_named_fields_always_include_the_cursor_field(client, db, make_user):
+    user_id, headers = make_user()
+    insert_task(db, user_id)
+
+    assert get_task_keys(client, headers, 'title,commentCount') == {'_id', 'title', 'commentCount', 'dueDate'}
+
+
+def test_summary_can_be_extended_and_full_returns_everything(client, db, make_user):
+    user_id, headers = make_user()
+    insert_task(db, user_id)
+
+    assert 'attachments' in get_task_keys(client, headers, 'summary,attachments')
+    assert {'userId', 'createdAt', 'attachments', 'commentCount'} <= get_task_keys(client, headers, 'full')
+
+
+def test_unknown_field_is_rejected(client, make_user):
+    _, headers = make_user()
+
+    response = client.get('/api/tasks?fields=title,password', headers=headers)
+
+    assert response.status_code == 400
+    assert response.get_json()['message'] == 'Invalid fields'
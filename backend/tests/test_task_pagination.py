@@ -0,0 +1,50 @@
+# backend/tests/test_task_pagination.py
+from datetime import datetime
+
+from bson import ObjectId
+
+
+def fetch_all(client, headers, limit):
+    """Follow `next` cursors to the end and return the ids page by page"""
+    pages = []
+    url = f'/api/tasks?limit={limit}'
+    while url:
+        body = client.get(url, headers=headers).get_json()
+        pages.append([task['_id'] for task in body['tasks']])
+        assert body['hasMore'] == (body['next'] is not None)
+        url = f"/api/tasks?limit={limit}&cursor={body['next']}" if body['hasMore'] else None
+    return pages
+
+
+def test_pages_walk_null_due_dates_then_dated_tasks_without_gaps(client, db, make_user):
+    user_id, headers = make_user()
+    due = datetime(2026, 5, 1)
+    # Two null due dates and a tie on a date, so both the cross-type seek and the _id tie-break are exercised
+    ids = [ObjectId() for _ in range(5)]
+    db.tasks.insert_many([
+        {'_id': ids[3], 'userId': user_id, 'title': 'tie b', 'dueDate': due},
+        {'_id': ids[0], 'userId': user_id, 'title': 'no date a', 'dueDate': None},
+        {'_id': ids[4], 'userId': user_id, 'title': 'later', 'dueDate': datetime(2026, 6, 1)},
+        {'_id': ids[2], 'userId': user_id, 'title': 'tie a', 'dueDate': due},
+        {'_id': ids[1], 'userId': user_id, 'title': 'no date b', 'dueDate': None}
+    ])
+    db.tasks.insert_one({'userId': ObjectId(), 'title': 'someone else', 'dueDate': None})
+
+    pages = fetch_all(client, headers, limit=2)
+
+    assert pages == [[str(ids[0]), str(ids[1])], [str(ids[2]), str(ids[3])], [str(ids[4])]]
+
+
+def test_cursor_round_trips_null_and_dated_sort_values(app_module):
+    task_id = ObjectId()
+    due = datetime(2026, 5, 1, 9, 30)
+
+    assert app_module.decode_cursor(app_module.encode_cursor(None, task_id)) == (None, task_id)
+    assert app_module.decode_cursor(app_module.encode_cursor(due, task_id)) == (due, task_id)
+
+
+def test_malformed_cursor_and_limit_are_rejected(client, make_user):
+    _, headers = make_user()
+
+    assert client.get('/api/tasks?cursor=not-a-cursor', headers=headers).status_code == 400
+    assert client.get('/api/tasks?limit=ten', headers=headers).status_code == 400
@@ -0,0 +1,57 @@
+# backend/tests/test_task_sharing.py
+from bson import ObjectId
+import pytest
+
+from config import Config
+
+
+def test_share_stores_the_member_as_an_objectid(client, db, make_user):
+    owner, headers = make_user('Owner')
+    member, _ = make_user('Member')
+    task_id = db.tasks.insert_one({'userId': owner, 'title': 't', 'sharedWith': []}).inserted_id
+
+    response = client.post(f'/api/tasks/{task_id}/share', json={'email': 'member@example.com'}, headers=headers)
+
+    assert response.status_code == 200
+    assert db.tasks.find_one({'_id': task_id})['sharedWith'] == [member]
+
+
+def test_only_the_owner_can_share(client, db, make_user):
+    owner, _ = make_user('Owner')
+    _, other_headers = make_user('Other')
+    make_user('Member')
+    task_id = db.tasks.insert_one({'userId': owner, 'title': 't', 'sharedWith': []}).inserted_id
+
+    response = client.post(f'/api/tasks/{task_id}/share', json={'email': 'member@example.com'}, headers=other_headers)
+
+    assert response.status_code == 404
+
+
+def test_legacy_string_members_still_match(client, db, make_user, monkeypatch):
+    monkeypatch.setattr(Config, 'SHARED_WITH_LEGACY_STRINGS', True)
+    owner, _ = make_user('Owner')
+    member, headers = make_user('Member')
+    task_id = db.tasks.insert_one({'userId': owner, 'title': 't', 'sharedWith': [str(member)]}).inserted_id
+
+    shared = client.get('/api/tasks/shared', headers=headers).get_json()['tasks']
+
+    assert [t['_id'] for t in shared] == [str(task_id)]
+    assert client.get(f'/api/tasks/{task_id}/comments', headers=headers).status_code == 200
+
+
+@pytest.mark.parametrize('legacy', [True, False])
+def test_member_match_includes_strings_only_while_legacy_is_on(app_module, monkeypatch, legacy):
+    # mongomock equates ObjectIds with their strings, so the query value itself is checked
+    monkeypatch.setattr(Config, 'SHARED_WITH_LEGACY_STRINGS', legacy)
+    member = ObjectId()
+
+    expected = {'$in': [member, str(member)]} if legacy else member
+    assert app_module.shared_with_match(str(member)) == expected
+
+
+def test_non_member_cannot_read_comments(client, db, make_user):
+    owner, _ = make_user('Owner')
+    _, headers = make_user('Stranger')
+    task_id = db.tasks.insert_one({'userId': owner, 'title': 't', 'sharedWith': [ObjectId()]}).inserted_id
+
+    assert client.get(f'/api/tasks/{task_id}/comments', headers=headers).status_code == 404
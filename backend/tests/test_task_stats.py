@@ -0,0 +1,52 @@
+# backend/tests/test_task_stats.py
+import pytest
+
+from config import Config
+
+
+def new_task(title, status='pending', category='work', priority='medium'):
+    return {'title': title, 'dueDate': '2026-05-01', 'priority': priority, 'category': category, 'status': status}
+
+
+def stats(client, headers):
+    return client.get('/api/tasks/stats', headers=headers).get_json()['stats']
+
+
+@pytest.fixture(params=[False, True], ids=['aggregation', 'counters'])
+def counters_mode(request, monkeypatch):
+    monkeypatch.setattr(Config, 'TASK_STATS_COUNTERS', request.param)
+    return request.param
+
+
+def test_stats_follow_creates_updates_and_deletes(client, db, make_user, counters_mode):
+    _, headers = make_user()
+    first = client.post('/api/tasks', json=new_task('a'), headers=headers).get_json()['task']['_id']
+    # Reading seeds the counters; the writes below must then keep them right
+    assert stats(client, headers)['total'] == 1
+    second = client.post('/api/tasks', json=new_task('b', category='home.garden'), headers=headers).get_json()['task']['_id']
+    client.put(f'/api/tasks/{first}', json={'status': 'completed', 'priority': 'high'}, headers=headers)
+    client.post('/api/tasks', json=new_task('c', status='in-progress'), headers=headers)
+    client.delete(f'/api/tasks/{second}', headers=headers)
+
+    result = stats(client, headers)
+
+    assert (result['total'], result['pending'], result['inProgress'], result['completed']) == (2, 0, 1, 1)
+    assert result['byCategory'] == {'work': 2}
+    assert result['byPriority'] == {'high': 1, 'medium': 1}
+    assert (db.task_stats.count_documents({}) == 1) is counters_mode
+
+
+def test_counters_match_a_fresh_aggregation(app_module, client, make_user, monkeypatch):
+    monkeypatch.setattr(Config, 'TASK_STATS_COUNTERS', True)
+    user_id, headers = make_user()
+    stats(client, headers)
+    ids = [client.post('/api/tasks', json=new_task(str(i), category=f'c{i % 3}'), headers=headers).get_json()['task']['_id']
+           for i in range(6)]
+    for task_id in ids[:2]:
+        client.put(f'/api/tasks/{task_id}', json={'category': 'moved'}, headers=headers)
+    client.delete(f'/api/tasks/{ids[5]}', headers=headers)
+
+    maintained = stats(client, headers)
+    monkeypatch.setattr(Config, 'TASK_STATS_COUNTERS', False)
+
+    assert maintained == app_module.get_task_stats(user_id)
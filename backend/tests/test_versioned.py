@@ -0,0 +1,68 @@
+# backend/tests/test_versioned.py
+from flask import Flask, Response
+
+from services.compression import Compressor
+
+
+def new_task(title):
+    return {'title': title, 'dueDate': '2026-05-01', 'priority': 'medium', 'category': 'work', 'status': 'pending'}
+
+
+def test_unchanged_list_revalidates_with_304(client, make_user):
+    _, headers = make_user()
+    client.post('/api/tasks', json=new_task('a'), headers=headers)
+    first = client.get('/api/tasks', headers=headers)
+    etag = first.headers['ETag']
+
+    again = client.get('/api/tasks', headers={**headers, 'If-None-Match': etag})
+
+    assert first.status_code == 200 and not etag.startswith('W/')
+    assert again.status_code == 304
+    assert again.headers['ETag'] == etag
+    assert again.get_data() == b''
+
+
+def test_a_write_changes_the_tag(client, make_user):
+    _, headers = make_user()
+    etag = client.get('/api/tasks', headers=headers).headers['ETag']
+    client.post('/api/tasks', json=new_task('a'), headers=headers)
+
+    response = client.get('/api/tasks', headers={**headers, 'If-None-Match': etag})
+
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+    assert len(response.get_json()['tasks']) == 1
+
+
+def test_tags_are_per_user(client, make_user):
+    _, alice = make_user('Alice')
+    _, bob = make_user('Bob')
+    etag = client.get('/api/tasks', headers=alice).headers['ETag']
+
+    assert client.get('/api/tasks', headers={**bob, 'If-None-Match': etag}).status_code == 200
+
+
+def test_compressed_tag_revalidates_and_is_echoed(client, make_user):
+    _, headers = make_user()
+    etag = client.get('/api/tasks', headers=headers).headers['ETag']
+    gzip_tag = etag[:-1] + '-gz"'
+
+    response = client.get('/api/tasks', headers={**headers, 'If-None-Match': gzip_tag})
+
+    assert response.status_code == 304
+    assert response.headers['ETag'] == gzip_tag
+    assert 'Accept-Encoding' in response.headers['Vary']
+
+
+def test_compressor_gives_each_encoding_its_own_strong_tag():
+    app = Flask(__name__)
+    compressor = Compressor(app, min_size=10)
+    body = Response('{"tasks": []}' * 20, mimetype='application/json')
+    body.set_etag('abc')
+
+    with app.test_request_context('/api/tasks', headers={'Accept-Encoding': 'gzip'}):
+        response = compressor.after_request(body)
+
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert response.get_etag() == ('abc-gz', False)
+    assert 'Accept-Encoding' in response.headers['Vary']
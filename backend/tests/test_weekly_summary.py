@@ -0,0 +1,82 @@
+# backend/tests/test_weekly_summary.py
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+import mongomock
+import pytest
+
+from services.weekly_summary import (
+    FOCUS_TASKS, render_weekly_summary, run_weekly_summary, supports_top_n, weekly_summary_pipeline
+)
+
+
+@pytest.fixture
+def seeded_db():
+    db = mongomock.MongoClient().db
+    ann, bob = ObjectId(), ObjectId()
+    db.users.insert_many([
+        {'_id': ann, 'name': 'Ann', 'email': 'ann@example.com'},
+        {'_id': bob, 'name': 'Bob', 'email': 'bob@example.com'}
+    ])
+    start = datetime(2026, 6, 1)
+    tasks = [{'userId': ann, 'title': f'open {i}', 'status': 'pending', 'dueDate': start + timedelta(days=9 - i)}
+             for i in range(FOCUS_TASKS + 2)]
+    tasks += [
+        {'userId': ann, 'title': 'done early', 'status': 'completed', 'dueDate': start - timedelta(days=5)},
+        {'userId': ann, 'title': 'working', 'status': 'in-progress', 'dueDate': start + timedelta(days=20)},
+        {'userId': bob, 'title': 'all done', 'status': 'completed', 'dueDate': start}
+    ]
+    db.tasks.insert_many(tasks)
+    return db
+
+
+def test_fallback_pipeline_picks_the_soonest_open_tasks(seeded_db):
+    # mongomock reports 5.0, like a server without $topN
+    assert supports_top_n(seeded_db) is False
+
+    groups = {g['name']: g for g in seeded_db.tasks.aggregate(weekly_summary_pipeline(top_n=False))}
+
+    ann = groups['Ann']
+    assert (ann['total'], ann['completed'], ann['pending'], ann['inProgress']) == (9, 1, 7, 1)
+    assert [t['title'] for t in ann['focus']] == ['open 6', 'open 5', 'open 4', 'open 3', 'open 2']
+    assert groups['Bob']['focus'] == []
+
+
+def test_top_n_pipeline_sorts_open_tasks_first():
+    group = weekly_summary_pipeline(top_n=True)[1]['$group']
+
+    assert group['focus']['$topN']['n'] == FOCUS_TASKS
+    assert group['focus']['$topN']['sortBy'] == {'isDone': 1, 'dueDate': 1}
+
+
+def test_render_lists_focus_tasks_only_with_pending_work():
+    group = {'name': 'Ann', 'total': 2, 'completed': 1, 'pending': 1, 'inProgress': 0,
+             'focus': [{'title': 'Report', 'dueDate': datetime(2026, 6, 3)}]}
+
+    subject, body = render_weekly_summary(group)
+
+    assert 'Weekly' in subject
+    assert '📋 Total Tasks: 2\n✅ Completed: 1\n' in body
+    assert '• Report (Due: 2026-06-03)' in body
+    assert 'focus on' not in render_weekly_summary({**group, 'pending': 0})[1]
+
+
+def test_sent_counts_only_queued_messages(seeded_db):
+    queued = []
+
+    def send(recipient, subject, body):
+        if recipient == 'bob@example.com':
+            return None  # the outbox insert failed
+        queued.append(recipient)
+        return ObjectId()
+
+    result = run_weekly_summary(seeded_db, send, chunk_size=1, workers=2)
+
+    assert queued == ['ann@example.com']
+    assert (result['users'], result['rendered'], result['sent'], result['errors']) == (2, 2, 1, 1)
+
+
+def test_dry_run_renders_without_sending(seeded_db):
+    result = run_weekly_summary(seeded_db, send=None, dry_run=True)
+
+    assert (result['rendered'], result['sent'], result['errors']) == (2, 0, 0)
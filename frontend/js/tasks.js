@@ -19,6 +19,7 @@ document.addEventListener('DOMContentLoaded', function() {
         loadUserInfo();
         loadTasks();
         setupEventListeners();
+        initTaskListPaging();
         loadDependencies();
         initSmartSearch();
         initKeyboardShortcuts();
@@ -104,8 +105,29 @@ function showSection(section, event) {
 
 // ==================== TASK MANAGEMENT ====================
 
-// Load tasks from backend
-// Load tasks from backend - SIMPLIFIED VERSION
+// Page size requested from GET /api/tasks
+const TASKS_PAGE_SIZE = 200;
+
+// Fields the dashboard, analytics and activity views read from the cached list
+const TASK_LIST_FIELDS = 'summary,createdAt,updatedAt,attachments,sharedWith,recentComments,commentCount';
+
+// Fields the shared tasks view renders
+const SHARED_TASK_FIELDS = 'summary,attachments,recentComments,commentCount';
+
+// Fetch one page of tasks; pass the previous page's `next` cursor to continue
+async function fetchTaskPage(cursor = null, filters = {}) {
+    const params = new URLSearchParams({ limit: TASKS_PAGE_SIZE, fields: TASK_LIST_FIELDS, ...filters });
+    if (cursor) params.set('cursor', cursor);
+    return apiRequest(`/tasks?${params.toString()}`);
+}
+
+// Paging state of the task list: the filters in effect and the cursor of the
+// next page (null once the last page has been rendered)
+let taskListFilters = {};
+let taskListCursor = null;
+let taskListLoading = false;
+
+// Load the first page of tasks; later pages are appended by loadMoreTasks
 async function loadTasks() {
     console.log('📥 Loading tasks...');
     
@@ -121,52 +143,127 @@ async function loadTasks() {
             return;
         }
         
-        const response = await apiRequest('/tasks');
-        console.log('📦 Tasks response:', response);
+        // Take the sync token before reading so nothing changed mid-load is missed
+        const sync = await apiRequest('/sync');
         
-        if (response && response.success) {
-            const tasks = response.tasks || [];
-            console.log(`✅ Loaded ${tasks.length} tasks`);
-            
-            localStorage.setItem('tasks', JSON.stringify(tasks));
-            
-            // Update UI - with null checks
-            const totalElement = document.getElementById('totalTasks');
-            if (totalElement) totalElement.textContent = tasks.length;
-            
-            const pendingElement = document.getElementById('pendingTasks');
-            if (pendingElement) pendingElement.textContent = tasks.filter(t => t.status === 'pending').length;
-            
-            const inProgressElement = document.getElementById('inProgressTasks');
-            if (inProgressElement) inProgressElement.textContent = tasks.filter(t => t.status === 'in-progress').length;
-            
-            const completedElement = document.getElementById('completedTasks');
-            if (completedElement) completedElement.textContent = tasks.filter(t => t.status === 'completed').length;
-            
-            // Display tasks
-            displayTasks(tasks);
-            
-            // Display recent tasks
-            displayRecentTasks(tasks.slice(0, 5));
-            
-            if (tasks.length > 0) {
-                showToast(`📊 Loaded ${tasks.length} tasks`, 'success');
-            } else {
-                const container = document.getElementById('tasksContainer');
-                if (container) {
-                    container.innerHTML = '<div class="no-tasks">No tasks found. Click "New Task" to create one!</div>';
-                }
-            }
-        }
+        taskListFilters = {};
+        taskListCursor = null;
+        const response = await fetchTaskPage();
+        console.log('📦 Tasks page:', response);
+        if (!response || !response.success) throw new Error('Failed to load tasks');
+        
+        const tasks = response.tasks || [];
+        taskListCursor = response.hasMore ? response.next : null;
+        
+        console.log(`✅ Loaded ${tasks.length} tasks`);
+        localStorage.setItem('tasks', JSON.stringify(tasks));
+        if (sync && sync.token) localStorage.setItem('syncToken', sync.token);
+        
+        // Counts cover every task, not just the pages loaded so far
+        loadTaskStats();
+        displayTasks(tasks);
+        displayRecentTasks(tasks.slice(0, 5));
+        updateLoadMoreButton();
         
     } catch (error) {
         console.error('❌ Error loading tasks:', error);
+        taskListCursor = null;
+        updateLoadMoreButton();
         const container = document.getElementById('tasksContainer');
         if (container) {
             container.innerHTML = '<div class="no-tasks">Error loading tasks</div>';
         }
     }
 }
+
+// Fetch the next page of the current list and render only its tasks
+async function loadMoreTasks() {
+    if (!taskListCursor || taskListLoading) return;
+    
+    taskListLoading = true;
+    updateLoadMoreButton();
+    try {
+        const response = await fetchTaskPage(taskListCursor, taskListFilters);
+        if (!response || !response.success) throw new Error('Failed to load tasks');
+        
+        let tasks = response.tasks || [];
+        taskListCursor = response.hasMore ? response.next : null;
+        
+        // The unfiltered list is the cached one; delta sync may already have merged some of these
+        if (Object.keys(taskListFilters).length === 0) {
+            const cached = JSON.parse(localStorage.getItem('tasks') || '[]');
+            const known = new Set(cached.map(task => task._id));
+            tasks = tasks.filter(task => !known.has(task._id));
+            localStorage.setItem('tasks', JSON.stringify(cached.concat(tasks)));
+        }
+        
+        appendTasks(tasks);
+    } catch (error) {
+        console.error('❌ Error loading more tasks:', error);
+        showToast('Could not load more tasks', 'error');
+    } finally {
+        taskListLoading = false;
+        updateLoadMoreButton();
+    }
+}
+
+function updateLoadMoreButton() {
+    const button = document.getElementById('loadMoreTasks');
+    if (!button) return;
+    
+    button.style.display = taskListCursor ? '' : 'none';
+    button.disabled = taskListLoading;
+    button.innerHTML = taskListLoading ?
+        '<i class="fas fa-spinner fa-spin"></i> Loading...' :
+        '<i class="fas fa-chevron-down"></i> Load more';
+}
+
+// Load the next page when the "Load more" button scrolls into view
+function initTaskListPaging() {
+    const button = document.getElementById('loadMoreTasks');
+    if (!button || !('IntersectionObserver' in window)) return;
+    
+    new IntersectionObserver(entries => {
+        if (entries.some(entry => entry.isIntersecting)) loadMoreTasks();
+    }, { rootMargin: '200px' }).observe(button);
+}
+
+// Fetch only what changed since the last sync and merge it into the cached list
+async function syncTaskDeltas() {
+    const token = localStorage.getItem('syncToken');
+    if (!token) return loadTasks();
+    
+    try {
+        const params = new URLSearchParams({ since: token, fields: TASK_LIST_FIELDS });
+        const response = await apiRequest(`/sync?${params.toString()}`);
+        
+        if (!response || !response.success || response.reset) {
+            return loadTasks();
+        }
+        
+        const byId = new Map(
+            JSON.parse(localStorage.getItem('tasks') || '[]').map(task => [task._id, task])
+        );
+        (response.deleted || []).forEach(id => byId.delete(id));
+        (response.tasks || []).forEach(task => byId.set(task._id, { ...byId.get(task._id), ...task }));
+        
+        const tasks = Array.from(byId.values()).sort((a, b) =>
+            new Date(a.dueDate) - new Date(b.dueDate) || String(a._id).localeCompare(String(b._id))
+        );
+        
+        localStorage.setItem('tasks', JSON.stringify(tasks));
+        localStorage.setItem('syncToken', response.token);
+        console.log(`🔄 Merged ${response.tasks.length} changed and ${response.deleted.length} deleted tasks`);
+        
+        loadTaskStats();
+        displayTasks(tasks);
+        displayRecentTasks(tasks.slice(0, 5));
+    } catch (error) {
+        console.error('❌ Error syncing task changes:', error);
+        loadTasksFromCache();
+    }
+}
+
 // Load tasks from cache
 function loadTasksFromCache() {
     console.log('📦 Attempting to load tasks from cache');
@@ -199,16 +296,29 @@ function showNoTasksMessage() {
     }
 }
 
-// Update statistics
-// Update statistics
+// Fetch counts for all of the user's tasks; the list itself is loaded page by page
+async function loadTaskStats() {
+    try {
+        const response = await apiRequest('/tasks/stats');
+        if (response && response.success) renderStats(response.stats);
+    } catch (error) {
+        console.error('❌ Error loading task stats:', error);
+    }
+}
+
+// Update statistics from a list of tasks (used for the offline cache)
 function updateStats(tasks) {
     console.log('📊 Updating stats with', tasks.length, 'tasks');
     
-    const total = tasks.length;
-    const pending = tasks.filter(t => t.status === 'pending').length;
-    const inProgress = tasks.filter(t => t.status === 'in-progress').length;
-    const completed = tasks.filter(t => t.status === 'completed').length;
-    
+    renderStats({
+        total: tasks.length,
+        pending: tasks.filter(t => t.status === 'pending').length,
+        inProgress: tasks.filter(t => t.status === 'in-progress').length,
+        completed: tasks.filter(t => t.status === 'completed').length
+    });
+}
+
+function renderStats({ total, pending, inProgress, completed }) {
     const totalElement = document.getElementById('totalTasks');
     const pendingElement = document.getElementById('pendingTasks');
     const inProgressElement = document.getElementById('inProgressTasks');
@@ -259,89 +369,102 @@ function displayTasks(tasks) {
         return;
     }
     
-    container.innerHTML = tasks.map(task => {
-        // Safely access task properties with defaults
-        const taskId = task._id || task.id || '';
-        const title = task.title || 'Untitled';
-        const description = task.description || 'No description provided';
-        const priority = task.priority || 'medium';
-        const category = task.category || 'general';
-        const status = task.status || 'pending';
-        const dueDate = task.dueDate || null;
-        const attachments = task.attachments || [];
-        const comments = task.comments || [];
+    container.innerHTML = tasks.map(renderTaskCard).join('');
+}
+
+// Add tasks below the ones already rendered
+function appendTasks(tasks) {
+    const container = document.getElementById('tasksContainer');
+    if (!container || !tasks || tasks.length === 0) return;
+    
+    container.insertAdjacentHTML('beforeend', tasks.map(renderTaskCard).join(''));
+}
+
+function renderTaskCard(task) {
+    // Safely access task properties with defaults
+    const taskId = task._id || task.id || '';
+    const title = task.title || 'Untitled';
+    const description = task.description || 'No description provided';
+    const priority = task.priority || 'medium';
+    const category = task.category || 'general';
+    const status = task.status || 'pending';
+    const dueDate = task.dueDate || null;
+    const attachments = task.attachments || [];
+    const comments = task.recentComments || [];
+    
+    return `
+    <div class="task-card priority-${priority}" data-task-id="${taskId}">
+        <div class="task-header">
+            <h3>${title}</h3>
+            <div class="task-actions">
+                <button class="btn-reminder" onclick="sendTaskReminder('${taskId}')" title="Send Reminder">
+                    <i class="fas fa-bell"></i>
+                </button>
+                <button onclick="showShareModal('${taskId}')" title="Share Task">
+                    <i class="fas fa-share-alt"></i>
+                </button>
+                <button onclick="showDependencyManager('${taskId}')" title="Task Dependencies">
+                    <i class="fas fa-link"></i>
+                </button>
+                <button onclick="editTask('${taskId}')" title="Edit">
+                    <i class="fas fa-edit"></i>
+                </button>
+                <button class="delete" onclick="showDeleteModal('${taskId}')" title="Delete">
+                    <i class="fas fa-trash"></i>
+                </button>
+            </div>
+        </div>
         
-        return `
-        <div class="task-card priority-${priority}" data-task-id="${taskId}">
-            <div class="task-header">
-                <h3>${title}</h3>
-                <div class="task-actions">
-                    <button class="btn-reminder" onclick="sendTaskReminder('${taskId}')" title="Send Reminder">
-                        <i class="fas fa-bell"></i>
-                    </button>
-                    <button onclick="showShareModal('${taskId}')" title="Share Task">
-                        <i class="fas fa-share-alt"></i>
-                    </button>
-                    <button onclick="showDependencyManager('${taskId}')" title="Task Dependencies">
-                        <i class="fas fa-link"></i>
-                    </button>
-                    <button onclick="editTask('${taskId}')" title="Edit">
-                        <i class="fas fa-edit"></i>
-                    </button>
-                    <button class="delete" onclick="showDeleteModal('${taskId}')" title="Delete">
-                        <i class="fas fa-trash"></i>
+        <div class="task-description">${description}</div>
+        
+        <div class="task-meta">
+            <span class="task-category"><i class="fas fa-tag"></i> ${category}</span>
+            <span class="task-due-date ${isOverdue(dueDate) && status !== 'completed' ? 'overdue' : ''}">
+                <i class="far fa-calendar"></i> ${formatDate(dueDate)}
+            </span>
+        </div>
+        
+        <div class="task-attachments">
+            ${attachments.length > 0 ? attachments.map(att => `
+                <div class="attachment-item">
+                    ${att.thumbnails ?
+                        variantPicture(att.thumbnails, 32, att.url, att.filename, 'attachment-thumb') :
+                        '<i class="fas fa-paperclip"></i>'}
+                    <a href="${storedFileUrl(att.url)}" target="_blank">${att.filename}</a>
+                    <button onclick="deleteAttachment('${taskId}', '${att.saved_as}')">
+                        <i class="fas fa-times"></i>
                     </button>
                 </div>
-            </div>
-            
-            <div class="task-description">${description}</div>
-            
-            <div class="task-meta">
-                <span class="task-category"><i class="fas fa-tag"></i> ${category}</span>
-                <span class="task-due-date ${isOverdue(dueDate) && status !== 'completed' ? 'overdue' : ''}">
-                    <i class="far fa-calendar"></i> ${formatDate(dueDate)}
-                </span>
-            </div>
-            
-            <div class="task-attachments">
-                ${attachments.length > 0 ? attachments.map(att => `
-                    <div class="attachment-item">
-                        <i class="fas fa-paperclip"></i>
-                        <a href="http://localhost:5000${att.url}" target="_blank">${att.filename}</a>
-                        <button onclick="deleteAttachment('${taskId}', '${att.saved_as}')">
-                            <i class="fas fa-times"></i>
-                        </button>
-                    </div>
-                `).join('') : ''}
-                <button class="btn-attachment" onclick="showFilePicker('${taskId}')">
-                    <i class="fas fa-paperclip"></i> Attach File
-                </button>
-            </div>
-            
-            <div class="task-comments">
-                ${comments.length > 0 ? comments.slice(-3).map(comment => `
-                    <div class="comment-item">
-                        <div class="comment-header">
-                            <span class="comment-author">${comment.userName || 'User'}</span>
-                            <span class="comment-date">${formatDateTime(comment.timestamp)}</span>
-                        </div>
-                        <div class="comment-text">${comment.text}</div>
+            `).join('') : ''}
+            <button class="btn-attachment" onclick="showFilePicker('${taskId}')">
+                <i class="fas fa-paperclip"></i> Attach File
+            </button>
+        </div>
+        
+        <div class="task-comments">
+            ${comments.length > 0 ? comments.slice(-3).map(comment => `
+                <div class="comment-item">
+                    <div class="comment-header">
+                        <span class="comment-author">${comment.userName || 'User'}</span>
+                        <span class="comment-date">${formatDateTime(comment.timestamp)}</span>
                     </div>
-                `).join('') : ''}
-                <div class="comment-input-group">
-                    <input type="text" id="comment-${taskId}" placeholder="Add a comment..." onkeypress="if(event.key==='Enter') addComment('${taskId}')">
-                    <button onclick="addComment('${taskId}')"><i class="fas fa-paper-plane"></i></button>
+                    <div class="comment-text">${comment.text}</div>
                 </div>
+            `).join('') : ''}
+            <div class="comment-input-group">
+                <input type="text" id="comment-${taskId}" placeholder="Add a comment..." onkeypress="if(event.key==='Enter') addComment('${taskId}')">
+                <button onclick="addComment('${taskId}')"><i class="fas fa-paper-plane"></i></button>
             </div>
-            
-            <div class="task-progress">
-                <div class="progress-bar">
-                    <div class="progress-fill" style="width: ${getProgressPercentage(status)}%"></div>
-                </div>
-                <div class="progress-text">${status} ${getStatusBadge(status)}</div>
+        </div>
+        
+        <div class="task-progress">
+            <div class="progress-bar">
+                <div class="progress-fill" style="width: ${getProgressPercentage(status)}%"></div>
             </div>
+            <div class="progress-text">${status} ${getStatusBadge(status)}</div>
         </div>
-    `}).join('');
+    </div>
+    `;
 }
 
 // Get progress percentage
@@ -586,12 +709,42 @@ async function filterTasks() {
     const status = document.getElementById('filterStatus').value;
     
     try {
-        const response = await apiRequest(`/tasks${status !== 'all' ? `?status=${status}` : ''}`);
-        if (response && response.tasks) {
-            displayTasks(response.tasks);
-        }
+        taskListFilters = status !== 'all' ? { status } : {};
+        taskListCursor = null;
+        const response = await fetchTaskPage(null, taskListFilters);
+        if (!response || !response.tasks) return;
+        
+        taskListCursor = response.hasMore ? response.next : null;
+        displayTasks(response.tasks);
     } catch (error) {
         console.error('❌ Error filtering tasks:', error);
+    } finally {
+        updateLoadMoreButton();
+    }
+}
+
+// ==================== BULK ACTIONS ====================
+
+// Send a batch of create/update/delete operations in one request
+async function bulkTaskOperations(operations, ordered = true) {
+    return apiRequest('/tasks/bulk', 'POST', { operations, ordered });
+}
+
+async function clearCompletedTasks() {
+    if (!confirm('🧹 Delete all completed tasks?')) return;
+    
+    try {
+        const response = await bulkTaskOperations([
+            { op: 'deleteMany', filter: { status: 'completed' } }
+        ]);
+        
+        if (response.success) {
+            showToast(`🧹 Removed ${response.deleted} completed tasks`, 'success');
+            loadTasks();
+        }
+    } catch (error) {
+        console.error('❌ Error clearing completed tasks:', error);
+        showToast('Failed to clear completed tasks', 'error');
     }
 }
 
@@ -630,6 +783,7 @@ async function loadProfile() {
             
             // Get profile photo
             const profilePhoto = user.profilePhoto || '';
+            const profilePhotoVariants = user.profilePhotoVariants || {};
             
             const profileContainer = document.querySelector('.profile-container');
             if (!profileContainer) return;
@@ -641,7 +795,7 @@ async function loadProfile() {
                     <div class="profile-avatar-wrapper" id="profileAvatarWrapper">
                         <div class="profile-avatar" id="profileAvatar" onclick="triggerPhotoUpload()">
                             ${profilePhoto ? 
-                                `<img src="http://localhost:5000${profilePhoto}" alt="Profile" class="profile-image">` : 
+                                variantPicture(profilePhotoVariants, 120, profilePhoto, 'Profile', 'profile-image') : 
                                 `<i class="fas fa-user-circle"></i>`
                             }
                             <div class="profile-avatar-overlay">
@@ -1207,7 +1361,11 @@ function getMostUsedCategory() {
 // ==================== SHARED TASKS - COMPLETE VERSION ====================
 
 
-async function loadSharedTasks() {
+// Cursor of the next page of shared tasks (null once the last page is in)
+let sharedTasksCursor = null;
+
+// Load the first page of shared tasks, or append the next one
+async function loadSharedTasks(append = false) {
     console.log('📥 Loading shared tasks...');
     
     const container = document.getElementById('sharedTasksContainer');
@@ -1216,20 +1374,36 @@ async function loadSharedTasks() {
         return;
     }
     
-    container.innerHTML = '<div class="loading">Loading shared tasks...</div>';
+    if (!append) {
+        container.innerHTML = '<div class="loading">Loading shared tasks...</div>';
+        sharedTasksCursor = null;
+    } else if (!sharedTasksCursor) {
+        return;
+    }
     
     try {
-        const response = await apiRequest('/tasks/shared');
+        const params = new URLSearchParams({ fields: SHARED_TASK_FIELDS });
+        if (append) params.set('cursor', sharedTasksCursor);
+        const response = await apiRequest(`/tasks/shared?${params.toString()}`);
         console.log('📦 Shared tasks response:', response);
         
         if (!response || !response.success) {
-            container.innerHTML = '<div class="no-tasks">Error loading shared tasks</div>';
+            if (!append) container.innerHTML = '<div class="no-tasks">Error loading shared tasks</div>';
             return;
         }
         
         const tasks = response.tasks || [];
+        sharedTasksCursor = response.hasMore ? response.next : null;
         console.log(`📋 Found ${tasks.length} shared tasks`);
         
+        const loadMore = document.getElementById('loadMoreSharedTasks');
+        if (loadMore) loadMore.style.display = sharedTasksCursor ? '' : 'none';
+        
+        if (append) {
+            container.insertAdjacentHTML('beforeend', tasks.map(renderSharedTaskCard).join(''));
+            return;
+        }
+        
         if (tasks.length === 0) {
             container.innerHTML = '<div class="no-tasks"><i class="fas fa-share-alt"></i><p>No tasks shared with you yet.</p></div>';
             return;
@@ -1239,110 +1413,114 @@ async function loadSharedTasks() {
         console.log('📋 Sample shared task:', tasks[0]);
         
         // Display shared tasks with full details
-        container.innerHTML = tasks.map(task => {
-            // Safely access task properties with defaults
-            const taskId = task._id || task.id || '';
-            const title = task.title || 'Untitled';
-            const description = task.description || 'No description provided';
-            const priority = task.priority || 'medium';
-            const category = task.category || 'general';
-            const status = task.status || 'pending';
-            const dueDate = task.dueDate || null;
-            
-            // Handle arrays safely
-            const attachments = Array.isArray(task.attachments) ? task.attachments : [];
-            const comments = Array.isArray(task.comments) ? task.comments : [];
-            const sharedBy = task.sharedBy || 'Another user';
-            
-            console.log(`📎 Task "${title}" has ${attachments.length} attachments and ${comments.length} comments`);
-            
-            return `
-            <div class="task-card priority-${priority}" data-task-id="${taskId}">
-                <div class="task-header">
-                    <h3>${title}</h3>
-                    <span class="shared-badge">Shared by: ${sharedBy}</span>
-                </div>
-                
-                <div class="task-description">${description}</div>
-                
-                <div class="task-meta">
-                    <span class="task-category"><i class="fas fa-tag"></i> ${category}</span>
-                    <span class="task-due-date ${isOverdue(dueDate) && status !== 'completed' ? 'overdue' : ''}">
-                        <i class="far fa-calendar"></i> Due: ${formatDate(dueDate)}
-                    </span>
-                    <span class="task-status">Status: ${status}</span>
-                </div>
-                
-                <!-- ATTACHMENTS SECTION -->
-                ${attachments.length > 0 ? `
-                    <div class="task-attachments">
-                        <h4><i class="fas fa-paperclip"></i> Attachments (${attachments.length})</h4>
-                        ${attachments.map(att => {
-                            // Handle different attachment formats
-                            const filename = att.filename || att.name || 'file';
-                            const fileUrl = att.url || `/uploads/${att.saved_as || att.filename}`;
-                            const fileSize = att.size || 0;
-                            
-                            return `
-                            <div class="attachment-item">
-                                <i class="fas fa-file"></i>
-                                <a href="http://localhost:5000${fileUrl}" target="_blank" title="${filename}">
-                                    ${filename.length > 30 ? filename.substring(0,30)+'...' : filename}
-                                </a>
-                                ${fileSize ? `<span class="attachment-size">${formatFileSize(fileSize)}</span>` : ''}
-                                <a href="http://localhost:5000${fileUrl}" download class="download-btn" title="Download">
-                                    <i class="fas fa-download"></i>
-                                </a>
-                            </div>
-                        `}).join('')}
-                    </div>
-                ` : ''}
-                
-                <!-- COMMENTS SECTION -->
-                <div class="task-comments">
-                    <h4><i class="fas fa-comments"></i> Comments (${comments.length})</h4>
-                    
-                    <div class="comments-list">
-                        ${comments.length > 0 ? 
-                            comments.slice(-5).map(comment => `
-                                <div class="comment-item">
-                                    <div class="comment-header">
-                                        <span class="comment-author">${comment.userName || 'User'}</span>
-                                        <span class="comment-date">${formatDateTime(comment.timestamp)}</span>
-                                    </div>
-                                    <div class="comment-text">${comment.text}</div>
-                                </div>
-                            `).join('') 
-                            : '<p class="no-comments">No comments yet</p>'
-                        }
-                    </div>
-                    
-                    <!-- Add Comment - SHARED USER CAN COMMENT -->
-                    <div class="comment-input-group">
-                        <input type="text" id="shared-comment-${taskId}" placeholder="Add a comment..." 
-                               onkeypress="if(event.key==='Enter') addSharedComment('${taskId}')">
-                        <button onclick="addSharedComment('${taskId}')">
-                            <i class="fas fa-paper-plane"></i> Comment
-                        </button>
-                    </div>
-                </div>
-                
-                <!-- Progress Bar -->
-                <div class="task-progress">
-                    <div class="progress-bar">
-                        <div class="progress-fill" style="width: ${getProgressPercentage(status)}%"></div>
-                    </div>
-                    <div class="progress-text">${status} ${getStatusBadge(status)}</div>
-                </div>
-            </div>
-        `}).join('');
+        container.innerHTML = tasks.map(renderSharedTaskCard).join('');
         
     } catch (error) {
         console.error('❌ Error loading shared tasks:', error);
-        container.innerHTML = '<div class="no-tasks">Error loading shared tasks</div>';
+        if (!append) container.innerHTML = '<div class="no-tasks">Error loading shared tasks</div>';
     }
 }
 
+function renderSharedTaskCard(task) {
+    // Safely access task properties with defaults
+    const taskId = task._id || task.id || '';
+    const title = task.title || 'Untitled';
+    const description = task.description || 'No description provided';
+    const priority = task.priority || 'medium';
+    const category = task.category || 'general';
+    const status = task.status || 'pending';
+    const dueDate = task.dueDate || null;
+    
+    // Handle arrays safely
+    const attachments = Array.isArray(task.attachments) ? task.attachments : [];
+    const comments = Array.isArray(task.recentComments) ? task.recentComments : [];
+    const commentCount = task.commentCount || comments.length;
+    const sharedBy = task.sharedBy || 'Another user';
+    
+    console.log(`📎 Task "${title}" has ${attachments.length} attachments and ${commentCount} comments`);
+    
+    return `
+    <div class="task-card priority-${priority}" data-task-id="${taskId}">
+        <div class="task-header">
+            <h3>${title}</h3>
+            <span class="shared-badge">Shared by: ${sharedBy}</span>
+        </div>
+        
+        <div class="task-description">${description}</div>
+        
+        <div class="task-meta">
+            <span class="task-category"><i class="fas fa-tag"></i> ${category}</span>
+            <span class="task-due-date ${isOverdue(dueDate) && status !== 'completed' ? 'overdue' : ''}">
+                <i class="far fa-calendar"></i> Due: ${formatDate(dueDate)}
+            </span>
+            <span class="task-status">Status: ${status}</span>
+        </div>
+        
+        <!-- ATTACHMENTS SECTION -->
+        ${attachments.length > 0 ? `
+            <div class="task-attachments">
+                <h4><i class="fas fa-paperclip"></i> Attachments (${attachments.length})</h4>
+                ${attachments.map(att => {
+                    // Handle different attachment formats
+                    const filename = att.filename || att.name || 'file';
+                    const fileUrl = att.url || `/uploads/${att.saved_as || att.filename}`;
+                    const fileSize = att.size || 0;
+                    
+                    return `
+                    <div class="attachment-item">
+                        <i class="fas fa-file"></i>
+                        <a href="${storedFileUrl(fileUrl)}" target="_blank" title="${filename}">
+                            ${filename.length > 30 ? filename.substring(0,30)+'...' : filename}
+                        </a>
+                        ${fileSize ? `<span class="attachment-size">${formatFileSize(fileSize)}</span>` : ''}
+                        <a href="${storedFileUrl(fileUrl)}" download class="download-btn" title="Download">
+                            <i class="fas fa-download"></i>
+                        </a>
+                    </div>
+                `}).join('')}
+            </div>
+        ` : ''}
+        
+        <!-- COMMENTS SECTION -->
+        <div class="task-comments">
+            <h4><i class="fas fa-comments"></i> Comments (${commentCount})</h4>
+            
+            <div class="comments-list">
+                ${comments.length > 0 ? 
+                    comments.slice(-5).map(comment => `
+                        <div class="comment-item">
+                            <div class="comment-header">
+                                <span class="comment-author">${comment.userName || 'User'}</span>
+                                <span class="comment-date">${formatDateTime(comment.timestamp)}</span>
+                            </div>
+                            <div class="comment-text">${comment.text}</div>
+                        </div>
+                    `).join('') 
+                    : '<p class="no-comments">No comments yet</p>'
+                }
+            </div>
+            
+            <!-- Add Comment - SHARED USER CAN COMMENT -->
+            <div class="comment-input-group">
+                <input type="text" id="shared-comment-${taskId}" placeholder="Add a comment..." 
+                       onkeypress="if(event.key==='Enter') addSharedComment('${taskId}')">
+                <button onclick="addSharedComment('${taskId}')">
+                    <i class="fas fa-paper-plane"></i> Comment
+                </button>
+            </div>
+        </div>
+        
+        <!-- Progress Bar -->
+        <div class="task-progress">
+            <div class="progress-bar">
+                <div class="progress-fill" style="width: ${getProgressPercentage(status)}%"></div>
+            </div>
+            <div class="progress-text">${status} ${getStatusBadge(status)}</div>
+        </div>
+    </div>
+    `;
+}
+
 // ==================== ADD COMMENT TO SHARED TASK ====================
 
 async function addSharedComment(taskId) {
@@ -1697,7 +1875,7 @@ function showTaskDetails(taskId) {
                         <span class="detail-label">Attachments:</span>
                         <div class="attachment-list">
                             ${task.attachments.map(att => `
-                                <a href="http://localhost:5000${att.url}" target="_blank" class="attachment-link">
+                                <a href="${storedFileUrl(att.url)}" target="_blank" class="attachment-link">
                                     <i class="fas fa-paperclip"></i> ${att.filename}
                                 </a>
                             `).join('')}
@@ -1705,11 +1883,11 @@ function showTaskDetails(taskId) {
                     </div>
                 ` : ''}
                 
-                ${task.comments && task.comments.length > 0 ? `
+                ${task.recentComments && task.recentComments.length > 0 ? `
                     <div class="detail-row">
                         <span class="detail-label">Comments:</span>
                         <div class="comments-preview">
-                            ${task.comments.slice(-3).map(c => `
+                            ${task.recentComments.slice(-3).map(c => `
                                 <div class="comment-preview">
                                     <strong>${c.userName}:</strong> ${c.text}
                                 </div>
@@ -1743,7 +1921,7 @@ async function sendTaskReminder(taskId) {
         const response = await apiRequest(`/tasks/${taskId}/remind`, 'POST');
         
         if (response.success) {
-            showToast('📧 Reminder sent successfully!', 'success');
+            showToast('📧 Reminder queued for delivery!', 'success');
         }
     } catch (error) {
         console.error('❌ Error sending reminder:', error);
@@ -1766,7 +1944,113 @@ function showFilePicker(taskId) {
     input.click();
 }
 
+// Smallest rendered variant covering `size` CSS px on this screen, WebP with a JPEG fallback
+// Stored files are served behind auth; <img> and <a> cannot send headers, so the token rides in the URL
+function storedFileUrl(path) {
+    const separator = path.includes('?') ? '&' : '?';
+    return `http://localhost:5000${path}${separator}token=${encodeURIComponent(localStorage.getItem('token') || '')}`;
+}
+
+function variantPicture(variants, size, fallbackUrl, alt, className) {
+    const wanted = size * (window.devicePixelRatio || 1);
+    const sizes = Object.keys(variants || {}).map(Number).sort((a, b) => a - b);
+    const chosen = sizes.find(s => s >= wanted) || sizes[sizes.length - 1];
+    if (!chosen) {
+        return `<img src="${storedFileUrl(fallbackUrl)}" alt="${alt}" class="${className}">`;
+    }
+    const variant = variants[chosen];
+    return `<picture>
+        <source srcset="${storedFileUrl(variant.webp)}" type="image/webp">
+        <img src="${storedFileUrl(variant.jpeg)}" alt="${alt}" class="${className}" loading="lazy">
+    </picture>`;
+}
+
+// Files above this go through the resumable chunked upload protocol
+const CHUNKED_UPLOAD_THRESHOLD = 4 * 1024 * 1024;
+const CHUNK_RETRIES = 3;
+
+async function sha256Hex(blob) {
+    if (!window.crypto || !crypto.subtle) return null;
+    const digest = await crypto.subtle.digest('SHA-256', await blob.arrayBuffer());
+    return Array.from(new Uint8Array(digest)).map(b => b.toString(16).padStart(2, '0')).join('');
+}
+
+function uploadSessionKey(taskId, file) {
+    return `upload:${taskId}:${file.name}:${file.size}:${file.lastModified}`;
+}
+
+async function putUploadChunk(uploadId, index, chunk) {
+    const headers = { 'Authorization': `Bearer ${localStorage.getItem('token')}` };
+    const checksum = await sha256Hex(chunk);
+    if (checksum) headers['X-Chunk-SHA256'] = checksum;
+    
+    for (let attempt = 1; ; attempt++) {
+        try {
+            const response = await fetch(`${API_BASE_URL}/uploads/${uploadId}/chunks/${index}`, {
+                method: 'PUT',
+                headers,
+                body: chunk
+            });
+            const result = await response.json();
+            if (response.ok) return result;
+            // Size or checksum errors won't fix themselves on a retry
+            if (response.status < 500 || attempt >= CHUNK_RETRIES) {
+                throw new Error(result.message || 'Chunk rejected');
+            }
+        } catch (error) {
+            if (attempt >= CHUNK_RETRIES || !(error instanceof TypeError)) throw error;
+        }
+        await new Promise(resolve => setTimeout(resolve, 1000 * attempt));
+    }
+}
+
+// Upload in chunks, resuming a session left by an earlier attempt at the same file
+async function uploadTaskAttachmentChunked(taskId, file) {
+    const key = uploadSessionKey(taskId, file);
+    let upload = null;
+    
+    const savedId = localStorage.getItem(key);
+    if (savedId) {
+        try {
+            upload = (await apiRequest(`/uploads/${savedId}`)).upload;
+        } catch (error) {
+            localStorage.removeItem(key);
+        }
+    }
+    if (!upload) {
+        upload = (await apiRequest(`/tasks/${taskId}/uploads`, 'POST', { filename: file.name, size: file.size })).upload;
+        localStorage.setItem(key, upload.uploadId);
+    }
+    
+    let sent = upload.received.length;
+    for (const index of upload.missing) {
+        const start = index * upload.chunkSize;
+        await putUploadChunk(upload.uploadId, index, file.slice(start, start + upload.chunkSize));
+        sent++;
+        console.log(`📤 ${file.name}: ${sent}/${upload.totalChunks} chunks`);
+    }
+    
+    const result = await apiRequest(`/uploads/${upload.uploadId}/complete`, 'POST', {});
+    localStorage.removeItem(key);
+    return result;
+}
+
 async function uploadTaskAttachment(taskId, file) {
+    if (file.size > CHUNKED_UPLOAD_THRESHOLD) {
+        try {
+            showToast('📤 Uploading file...', 'info');
+            const result = await uploadTaskAttachmentChunked(taskId, file);
+            if (result.success) {
+                showToast('✅ File uploaded successfully!', 'success');
+                loadTasks();
+            }
+        } catch (error) {
+            console.error('❌ Upload error:', error);
+            showToast('Upload interrupted, pick the file again to resume: ' + error.message, 'error');
+        }
+        return;
+    }
+    
     const formData = new FormData();
     formData.append('file', file);
     
@@ -1889,33 +2173,46 @@ async function addComment(taskId) {
 
 // ==================== FEATURE 4: EXPORT ====================
 
+// PDF and Excel are rendered server-side as jobs; CSV is streamed directly
+const REPORT_FORMATS = { pdf: 'pdf', excel: 'xlsx', xlsx: 'xlsx' };
+const REPORT_POLL_INTERVAL = 1000;
+
+function authHeaders() {
+    return { 'Authorization': `Bearer ${localStorage.getItem('token')}` };
+}
+
+function downloadBlob(blob, filename) {
+    const url = window.URL.createObjectURL(blob);
+    const a = document.createElement('a');
+    a.href = url;
+    a.download = filename;
+    document.body.appendChild(a);
+    a.click();
+    document.body.removeChild(a);
+    window.URL.revokeObjectURL(url);
+}
+
+function responseFilename(response, fallback) {
+    const disposition = response.headers.get('Content-Disposition');
+    return disposition && disposition.includes('filename=') ?
+        disposition.split('filename=')[1].replace(/"/g, '') :
+        fallback;
+}
+
 async function exportTasks(format) {
+    if (REPORT_FORMATS[format]) {
+        return exportReport(REPORT_FORMATS[format]);
+    }
+    
     try {
         showToast(`📊 Exporting tasks as ${format.toUpperCase()}...`, 'info');
         
-        const token = localStorage.getItem('token');
         const response = await fetch(`${API_BASE_URL}/export/${format}`, {
-            headers: {
-                'Authorization': `Bearer ${token}`
-            }
+            headers: authHeaders()
         });
         
         if (response.ok) {
-            const disposition = response.headers.get('Content-Disposition');
-            const filename = disposition ? 
-                disposition.split('filename=')[1].replace(/"/g, '') : 
-                `tasks_export.${format}`;
-            
-            const blob = await response.blob();
-            const url = window.URL.createObjectURL(blob);
-            const a = document.createElement('a');
-            a.href = url;
-            a.download = filename;
-            document.body.appendChild(a);
-            a.click();
-            document.body.removeChild(a);
-            window.URL.revokeObjectURL(url);
-            
+            downloadBlob(await response.blob(), responseFilename(response, `tasks_export.${format}`));
             showToast(`✅ Tasks exported as ${format.toUpperCase()}!`, 'success');
         } else {
             const error = await response.json();
@@ -1928,34 +2225,97 @@ async function exportTasks(format) {
 }
 
 async function exportToExcel() {
+    return exportReport('xlsx');
+}
+
+// Follow a job's event stream until it finishes; resolves with the final job
+async function followReportEvents(job) {
+    const response = await fetch(`http://localhost:5000${job.eventsUrl}`, {
+        headers: { ...authHeaders(), 'Accept': 'text/event-stream' }
+    });
+    if (!response.ok || !response.body) {
+        throw new Error('Event stream unavailable');
+    }
+    
+    const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+    let buffer = '';
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) {
+            return job;  // Stream timed out server-side; the caller checks the status again
+        }
+        buffer += value;
+        const events = buffer.split('\n\n');
+        buffer = events.pop();
+        for (const raw of events) {
+            const event = (raw.match(/^event: (.*)$/m) || [])[1];
+            const data = (raw.match(/^data: (.*)$/m) || [])[1];
+            if (!event || !data) continue;
+            job = JSON.parse(data);
+            if (event === 'progress' && job.progress !== null) {
+                console.log(`📊 Report ${job.format}: ${Math.round(job.progress * 100)}%`);
+            }
+            if (event === 'done' || event === 'failed') {
+                reader.cancel();
+                return job;
+            }
+        }
+    }
+}
+
+async function pollReport(job) {
+    await new Promise(resolve => setTimeout(resolve, REPORT_POLL_INTERVAL));
+    const result = await apiRequest(job.statusUrl.replace(/^\/api/, ''));
+    return result.job;
+}
+
+async function exportReport(format) {
+    const label = format === 'xlsx' ? 'Excel' : format.toUpperCase();
     try {
-        showToast('📊 Preparing Excel report...', 'info');
+        showToast(`📊 Preparing ${label} report...`, 'info');
         
-        const token = localStorage.getItem('token');
-        const response = await fetch(`${API_BASE_URL}/export/excel`, {
-            headers: {
-                'Authorization': `Bearer ${token}`
-            }
+        // Plain fetch: starting a report is not a change worth queueing offline
+        const response = await fetch(`${API_BASE_URL}/reports`, {
+            method: 'POST',
+            headers: { ...authHeaders(), 'Content-Type': 'application/json' },
+            body: JSON.stringify({ format })
         });
+        const result = await response.json();
+        if (!response.ok) {
+            showToast(result.message || 'Export failed', 'error');
+            return;
+        }
         
-        if (response.ok) {
-            const blob = await response.blob();
-            const url = window.URL.createObjectURL(blob);
-            const a = document.createElement('a');
-            a.href = url;
-            a.download = `tasks_${new Date().toISOString().split('T')[0]}.xlsx`;
-            document.body.appendChild(a);
-            a.click();
-            document.body.removeChild(a);
-            window.URL.revokeObjectURL(url);
-            
-            showToast('✅ Excel report downloaded!', 'success');
-        } else {
+        // An unchanged report comes back already done
+        let job = result.job;
+        let streamFailed = typeof TextDecoderStream === 'undefined';
+        while (job.status === 'queued' || job.status === 'running') {
+            if (!streamFailed) {
+                try {
+                    job = await followReportEvents(job);
+                    continue;
+                } catch (error) {
+                    streamFailed = true;
+                }
+            }
+            job = await pollReport(job);
+        }
+        
+        if (job.status !== 'done') {
+            showToast(`${label} report failed: ${job.error || 'unknown error'}`, 'error');
+            return;
+        }
+        
+        const download = await fetch(`http://localhost:5000${job.downloadUrl}`, { headers: authHeaders() });
+        if (!download.ok) {
             showToast('Export failed', 'error');
+            return;
         }
+        downloadBlob(await download.blob(), responseFilename(download, `tasks_report.${format}`));
+        showToast(`✅ ${label} report downloaded!`, 'success');
     } catch (error) {
         console.error('❌ Export error:', error);
-        showToast('Export failed', 'error');
+        showToast('Export failed: ' + error.message, 'error');
     }
 }
 
@@ -2079,6 +2439,10 @@ function performSmartSearch(query) {
     }
     
     displayTasks(filteredTasks);
+    // Search covers the pages loaded so far; "Load more" only continues the plain list
+    const loadMore = document.getElementById('loadMoreTasks');
+    if (query && loadMore) loadMore.style.display = 'none';
+    else updateLoadMoreButton();
     showToast(`🔍 Found ${filteredTasks.length} tasks`, 'info');
 }
 
@@ -2426,8 +2790,13 @@ function initOfflineSupport() {
     window.addEventListener('online', handleOnline);
     window.addEventListener('offline', handleOffline);
     
-    loadPendingSync();
     updateOnlineStatus();
+    loadPendingSync().then(() => {
+        if (pendingSync.length > 0) {
+            showPendingSyncBadge();
+            syncPendingTasks();
+        }
+    });
 }
 
 function handleOnline() {
@@ -2457,39 +2826,275 @@ function updateOnlineStatus() {
         '<i class="fas fa-wifi-slash"></i>';
 }
 
+// ---------- Offline queue storage (IndexedDB) ----------
+
+const SYNC_DB_NAME = 'taskmaster-offline';
+const SYNC_STORE = 'pendingSync';
+const SYNC_BATCH_SIZE = 50;
+
+let syncDbPromise = null;
+let syncWrites = Promise.resolve();
+let syncInProgress = false;
+
+function openSyncDb() {
+    if (!window.indexedDB) return Promise.resolve(null);
+    if (!syncDbPromise) {
+        syncDbPromise = new Promise(resolve => {
+            const request = indexedDB.open(SYNC_DB_NAME, 1);
+            request.onupgradeneeded = () => {
+                request.result.createObjectStore(SYNC_STORE, { keyPath: 'seq', autoIncrement: true });
+            };
+            request.onsuccess = () => resolve(request.result);
+            request.onerror = () => {
+                console.error('❌ IndexedDB unavailable, offline queue kept in memory:', request.error);
+                resolve(null);
+            };
+        });
+    }
+    return syncDbPromise;
+}
+
+// Run one transaction on the queue store and resolve with the last request's result
+async function withSyncStore(mode, action) {
+    const db = await openSyncDb();
+    if (!db) return null;
+    return new Promise((resolve, reject) => {
+        const tx = db.transaction(SYNC_STORE, mode);
+        const request = action(tx.objectStore(SYNC_STORE));
+        tx.oncomplete = () => resolve(request ? request.result : null);
+        tx.onerror = () => reject(tx.error);
+        tx.onabort = () => reject(tx.error);
+    });
+}
+
+// Writes are chained so an item is stored (and has its seq) before it is updated or removed
+function persistQueue(write) {
+    syncWrites = syncWrites
+        .then(write)
+        .catch(error => console.error('❌ Offline queue write failed:', error));
+    return syncWrites;
+}
+
+function storeQueued(item) {
+    return persistQueue(async () => {
+        if (item.seq === undefined) {
+            const seq = await withSyncStore('readwrite', store => store.add(item));
+            if (seq !== null) item.seq = seq;
+        } else {
+            await withSyncStore('readwrite', store => store.put(item));
+        }
+    });
+}
+
+function removeQueued(items) {
+    pendingSync = pendingSync.filter(item => !items.includes(item));
+    // seq is read inside the chain, after any pending add has assigned it
+    return persistQueue(() => withSyncStore('readwrite', store => {
+        let last = null;
+        items.forEach(item => {
+            if (item.seq !== undefined) last = store.delete(item.seq);
+        });
+        return last;
+    }));
+}
+
+async function loadPendingSync() {
+    try {
+        pendingSync = (await withSyncStore('readonly', store => store.getAll())) || [];
+    } catch (error) {
+        console.error('❌ Could not read offline queue:', error);
+        pendingSync = [];
+    }
+    
+    // Carry over a queue saved by the localStorage-based version
+    const legacy = localStorage.getItem('pendingSync');
+    if (legacy) {
+        JSON.parse(legacy).forEach(item => queueForSync(item));
+        localStorage.removeItem('pendingSync');
+    }
+}
+
+// ---------- Coalescing ----------
+
+// The task a queued item writes to: a server ID, a local ID for offline creates, or null
+function queuedTaskId(item) {
+    if (item.method === 'POST' && item.endpoint === '/tasks') return item.localId;
+    const match = item.endpoint.match(/^\/tasks\/([^/?]+)$/);
+    if (match && (item.method === 'PUT' || item.method === 'DELETE') && match[1] !== 'bulk') {
+        return match[1];
+    }
+    return null;
+}
+
+// Queue a write, folding it into what is already queued for the same task:
+// create + updates -> one create, update + update -> one update,
+// anything + delete -> one delete (or nothing, if the task was never synced)
 function queueForSync(item) {
-    pendingSync.push(item);
-    savePendingSync();
-    showPendingSyncBadge();
+    if (item.method === 'POST' && item.endpoint === '/tasks' && !item.localId) {
+        item.localId = `local-${item.idempotencyKey || newIdempotencyKey()}`;
+    }
+    
+    const taskId = queuedTaskId(item);
+    const queued = taskId ? pendingSync.filter(q => queuedTaskId(q) === taskId) : [];
+    const last = queued[queued.length - 1];
+    
+    if (item.method === 'PUT' && last && last.method !== 'DELETE') {
+        last.data = { ...(last.data || {}), ...(item.data || {}) };
+        if (last.method === 'PUT') {
+            // The merged update is a different request from the one first queued
+            last.idempotencyKey = item.idempotencyKey || newIdempotencyKey();
+        }
+        last.timestamp = item.timestamp;
+        storeQueued(last);
+    } else if (item.method === 'DELETE' && queued.length > 0) {
+        const created = queued.some(q => q.method === 'POST');
+        // Comments or shares queued against a task that will never exist go too
+        const dependents = created ?
+            pendingSync.filter(q => q.endpoint.startsWith(`/tasks/${taskId}/`)) : [];
+        removeQueued(queued.concat(dependents));
+        if (!created) {
+            pendingSync.push(item);
+            storeQueued(item);
+        }
+    } else {
+        pendingSync.push(item);
+        storeQueued(item);
+    }
+    
+    if (pendingSync.length > 0) {
+        showPendingSyncBadge();
+    } else {
+        hidePendingSyncBadge();
+    }
+    return item;
+}
+
+// ---------- Replay ----------
+
+// A run of consecutive task writes from the head of the queue, or the single item there
+function nextSyncBatch() {
+    const batch = [];
+    for (const item of pendingSync) {
+        if (!queuedTaskId(item) || item.endpoint.startsWith('/tasks/local-')) break;
+        batch.push(item);
+        if (batch.length >= SYNC_BATCH_SIZE) break;
+    }
+    return batch.length > 0 ? batch : pendingSync.slice(0, 1);
+}
+
+function toBulkOperation(item) {
+    if (item.method === 'POST') return { op: 'create', task: item.data };
+    const id = queuedTaskId(item);
+    return item.method === 'DELETE' ? { op: 'delete', id } : { op: 'update', id, changes: item.data };
+}
+
+// Stable key for a batch, so retrying the same batch is not applied twice
+function batchIdempotencyKey(batch) {
+    const keys = batch.map(item => item.idempotencyKey || item.timestamp).join('|');
+    let hash = 5381;
+    for (let i = 0; i < keys.length; i++) {
+        hash = ((hash << 5) + hash + keys.charCodeAt(i)) >>> 0;
+    }
+    return `batch-${batch.length}-${hash.toString(36)}-${batch[0].idempotencyKey || ''}`;
 }
 
-function savePendingSync() {
-    localStorage.setItem('pendingSync', JSON.stringify(pendingSync));
+// Point queued writes at the server IDs of tasks that were created offline
+function rewriteLocalIds(idMap) {
+    const localIds = Object.keys(idMap);
+    if (localIds.length === 0) return;
+    const rewrite = text => localIds.reduce((out, localId) => out.split(localId).join(idMap[localId]), text);
+    
+    pendingSync.forEach(item => {
+        const endpoint = rewrite(item.endpoint);
+        const data = item.data ? JSON.parse(rewrite(JSON.stringify(item.data))) : item.data;
+        if (endpoint !== item.endpoint || JSON.stringify(data) !== JSON.stringify(item.data)) {
+            item.endpoint = endpoint;
+            item.data = data;
+            storeQueued(item);
+        }
+    });
+}
+
+// Replay one batch (bypassing the offline wrapper so nothing is queued twice);
+// resolves with the items that are finished, i.e. applied or rejected for good
+async function replaySyncBatch(batch) {
+    if (batch.length === 1 && !queuedTaskId(batch[0])) {
+        const item = batch[0];
+        await originalApiRequest(item.endpoint, item.method, item.data, idempotencyHeaders(item.idempotencyKey));
+        return batch;
+    }
+    const result = await originalApiRequest('/tasks/bulk', 'POST',
+        { operations: batch.map(toBulkOperation), ordered: true },
+        idempotencyHeaders(batchIdempotencyKey(batch)));
+    
+    const idMap = {};
+    const finished = [];
+    batch.forEach((item, index) => {
+        const entry = (result.results || [])[index];
+        // Skipped items come after a failed one in the ordered batch and are tried again
+        if (!entry || entry.status === 'skipped') return;
+        if (entry.status === 'error') {
+            console.error('Sync item failed:', entry);
+        } else if (item.localId && entry.id) {
+            idMap[item.localId] = entry.id;
+        }
+        finished.push(item);
+    });
+    // Persisted before the batch is removed, so a reload in between can't orphan dependents
+    rewriteLocalIds(idMap);
+    return finished;
 }
 
-function loadPendingSync() {
-    const saved = localStorage.getItem('pendingSync');
-    pendingSync = saved ? JSON.parse(saved) : [];
+// Network errors, 5xx, 408/409/429 and unreadable responses may succeed later
+function isTransientSyncError(error) {
+    if (error instanceof TypeError || !error.status) return true;
+    return error.status >= 500 || [408, 409, 429].includes(error.status);
 }
 
+// Replay the queue in order, one batch at a time; a transient failure stops
+// the replay and leaves the rest queued for the next reconnect
 async function syncPendingTasks() {
-    if (!isOnline || pendingSync.length === 0) return;
+    if (!isOnline || syncInProgress || pendingSync.length === 0) return;
+    syncInProgress = true;
     
-    showToast(`🔄 Syncing ${pendingSync.length} pending changes...`, 'info');
+    const total = pendingSync.length;
+    showToast(`🔄 Syncing ${total} pending changes...`, 'info');
     
-    const syncPromises = pendingSync.map(item => 
-        apiRequest(item.endpoint, item.method, item.data)
-            .catch(error => console.error('Sync failed:', error))
-    );
+    let interrupted = false;
+    try {
+        while (pendingSync.length > 0 && isOnline) {
+            const batch = nextSyncBatch();
+            let finished;
+            try {
+                finished = await replaySyncBatch(batch);
+            } catch (error) {
+                if (isTransientSyncError(error)) {
+                    interrupted = true;
+                    break;
+                }
+                // Rejected with a 4xx: replaying it again can't succeed
+                console.error('Sync failed, dropping change:', error);
+                finished = batch;
+            }
+            if (finished.length === 0) {
+                interrupted = true;
+                break;
+            }
+            await removeQueued(finished);
+        }
+    } finally {
+        syncInProgress = false;
+    }
     
-    await Promise.all(syncPromises);
+    if (interrupted || pendingSync.length > 0) {
+        showPendingSyncBadge();
+        showToast(`⚠️ ${pendingSync.length} changes still waiting to sync`, 'warning');
+        return;
+    }
     
-    pendingSync = [];
-    savePendingSync();
     hidePendingSyncBadge();
-    
     showToast('✅ All changes synced!', 'success');
-    loadTasks();
+    syncTaskDeltas();
 }
 
 function showPendingSyncBadge() {
@@ -2654,20 +3259,47 @@ function updateCategoryDistribution(tasks) {
 }
 
 // Override apiRequest for offline support
+function newIdempotencyKey() {
+    if (window.crypto && crypto.randomUUID) {
+        return crypto.randomUUID();
+    }
+    return `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}`;
+}
+
+function idempotencyHeaders(key) {
+    return key ? { 'Idempotency-Key': key } : {};
+}
+
+// Offline creates get a local ID so later edits can be folded into the queued create
+function offlineResult(item) {
+    const result = { success: true, offline: true };
+    if (item.localId) {
+        result.task = { ...(item.data || {}), _id: item.localId };
+    }
+    return result;
+}
+
 const originalApiRequest = window.apiRequest;
-window.apiRequest = async function(endpoint, method = 'GET', data = null) {
-    if (!isOnline && method !== 'GET') {
-        queueForSync({ endpoint, method, data, timestamp: new Date().toISOString() });
+window.apiRequest = async function(endpoint, method = 'GET', data = null, extraHeaders = {}) {
+    if (method === 'GET') {
+        return originalApiRequest(endpoint, method, data, extraHeaders);
+    }
+    
+    // One key per logical write, reused if the request has to be queued and replayed
+    const idempotencyKey = extraHeaders['Idempotency-Key'] || newIdempotencyKey();
+    const headers = { ...extraHeaders, ...idempotencyHeaders(idempotencyKey) };
+    
+    if (!isOnline) {
+        const item = queueForSync({ endpoint, method, data, idempotencyKey, timestamp: new Date().toISOString() });
         showToast('📴 Change saved locally. Will sync when online.', 'info');
-        return { success: true, offline: true };
+        return offlineResult(item);
     }
     
     try {
-        return await originalApiRequest(endpoint, method, data);
+        return await originalApiRequest(endpoint, method, data, headers);
     } catch (error) {
         if (!isOnline) {
-            queueForSync({ endpoint, method, data, timestamp: new Date().toISOString() });
-            return { success: true, offline: true };
+            return offlineResult(queueForSync({ endpoint, method, data, idempotencyKey, timestamp: new Date().toISOString() }));
         }
         throw error;
     }
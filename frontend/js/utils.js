@@ -80,6 +80,9 @@ function clearUserData() {
     localStorage.removeItem('user');
     localStorage.removeItem('token');
     localStorage.removeItem('theme');
+    // Task cache and its sync token belong to the signed-out user
+    localStorage.removeItem('tasks');
+    localStorage.removeItem('syncToken');
 }
 
 // Check if user is authenticated
@@ -95,11 +98,12 @@ function requireAuth() {
 }
 
 // Make API request with authentication
-async function apiRequest(endpoint, method = 'GET', data = null) {
+async function apiRequest(endpoint, method = 'GET', data = null, extraHeaders = {}) {
     const token = localStorage.getItem('token');
     
     const headers = {
-        'Content-Type': 'application/json'
+        'Content-Type': 'application/json',
+        ...extraHeaders
     };
     
     if (token) {
@@ -124,7 +128,9 @@ async function apiRequest(endpoint, method = 'GET', data = null) {
         console.log('📦 Response:', result);
         
         if (!response.ok) {
-            throw new Error(result.message || 'Something went wrong');
+            const error = new Error(result.message || 'Something went wrong');
+            error.status = response.status;
+            throw error;
         }
         
         return result;